@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Compression Benchmark
+Measures size, compression/decompression time and peak memory of the
+supported encodings and their parameters on a pflanzenschutz.sqlite.
+
+A manual tool for choosing COMPRESSION_PROFILES: it is not run by the tests
+or CI, and its results are not applied automatically. --profile measures
+the current profiles themselves instead of the parameter grid.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import brotli
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from helpers.compression import (
+    BROTLI_MODES, CHUNK_SIZE, COMPRESSION_PROFILES,
+    compress_brotli, compress_zip, compress_zstd, zstandard
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_scenarios(args: argparse.Namespace) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Build the list of (encoding, label, parameters) to measure.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Scenarios in run order
+    """
+    scenarios = []
+    
+    if args.profile:
+        for name in args.profile:
+            for encoding, params in COMPRESSION_PROFILES[name].items():
+                if encoding == 'zstd' and zstandard is None:
+                    logger.warning("zstandard not installed, skipping zstd")
+                    continue
+                label = ' '.join(f'{key}={value}' for key, value in params.items())
+                scenarios.append((encoding, f'{name}: {encoding} {label}', dict(params)))
+        return scenarios
+        
+    for quality, lgwin, mode in itertools.product(args.brotli_quality, args.brotli_lgwin, args.brotli_mode):
+        scenarios.append((
+            'brotli',
+            f'brotli q={quality} lgwin={lgwin} mode={mode}',
+            {'quality': quality, 'lgwin': lgwin, 'mode': mode}
+        ))
+        
+    for level in args.zip_level:
+        scenarios.append(('zip', f'zip level={level}', {'compresslevel': level}))
+        
+    if zstandard is not None:
+        for level, long_distance in itertools.product(args.zstd_level, args.zstd_long):
+            scenarios.append((
+                'zstd',
+                f'zstd level={level} long={long_distance}',
+                {'level': level, 'long_distance': long_distance}
+            ))
+    elif args.zstd_level:
+        logger.warning("zstandard not installed, skipping zstd")
+        
+    return scenarios
+
+
+def _measure(func, *args) -> Tuple[float, int]:
+    """
+    Run func in this (fresh) worker process.
+    
+    Returns:
+        Tuple of (seconds, peak RSS growth in bytes)
+    """
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux
+    return elapsed, (peak - baseline) * 1024
+
+
+def _compress(encoding: str, input_file: str, output_file: str, params: Dict[str, Any]):
+    """Compress input_file with one encoding."""
+    if encoding == 'brotli':
+        compress_brotli(input_file, output_file, **params)
+    elif encoding == 'zip':
+        compress_zip(input_file, output_file, **params)
+    else:
+        compress_zstd(input_file, output_file, **params)
+
+
+def _decompress(encoding: str, input_file: str):
+    """Decompress input_file in CHUNK_SIZE blocks, discarding the output."""
+    if encoding == 'brotli':
+        decompressor = brotli.Decompressor()
+        with open(input_file, 'rb') as f_in:
+            for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+                decompressor.process(chunk)
+    elif encoding == 'zip':
+        with zipfile.ZipFile(input_file) as zf, zf.open(zf.namelist()[0]) as f_in:
+            while f_in.read(CHUNK_SIZE):
+                pass
+    else:
+        decompressor = zstandard.ZstdDecompressor(max_window_size=2 ** 31)
+        with open(input_file, 'rb') as f_in, decompressor.stream_reader(f_in) as reader:
+            while reader.read(CHUNK_SIZE):
+                pass
+
+
+def run_scenario(
+    encoding: str,
+    params: Dict[str, Any],
+    input_file: str,
+    work_dir: str,
+    context: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Measure one scenario.
+    
+    Compression and decompression each run in a freshly spawned process,
+    so peak memory is measured without allocations of earlier runs.
+    
+    Args:
+        encoding: 'brotli', 'zip' or 'zstd'
+        params: Encoder parameters
+        input_file: Path to database
+        work_dir: Directory for the compressed file
+        context: multiprocessing context (default: spawn)
+        
+    Returns:
+        Dictionary with size, times and peak memory
+    """
+    context = context or multiprocessing.get_context('spawn')
+    output_file = str(Path(work_dir) / f'benchmark.{encoding}')
+    
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        compress_seconds, compress_peak = executor.submit(
+            _measure, _compress, encoding, input_file, output_file, params
+        ).result()
+        
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        decompress_seconds, decompress_peak = executor.submit(
+            _measure, _decompress, encoding, output_file
+        ).result()
+        
+    size = Path(output_file).stat().st_size
+    Path(output_file).unlink()
+    
+    return {
+        'encoding': encoding,
+        'params': params,
+        'size': size,
+        'ratio': round(size / Path(input_file).stat().st_size, 4),
+        'compress_seconds': round(compress_seconds, 3),
+        'decompress_seconds': round(decompress_seconds, 3),
+        'compress_peak_mb': round(compress_peak / 1024 / 1024, 1),
+        'decompress_peak_mb': round(decompress_peak / 1024 / 1024, 1)
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark compression encodings and parameters on a database file'
+    )
+    parser.add_argument('database', help='Path to pflanzenschutz.sqlite')
+    parser.add_argument('--brotli-quality', type=int, nargs='*', default=[5, 9, 11], help='Brotli qualities')
+    parser.add_argument('--brotli-lgwin', type=int, nargs='*', default=[22, 24], help='Brotli window sizes (log2)')
+    parser.add_argument(
+        '--brotli-mode', nargs='*', choices=sorted(BROTLI_MODES), default=['generic'], help='Brotli modes'
+    )
+    parser.add_argument('--zip-level', type=int, nargs='*', default=[1, 6, 9], help='Deflate levels')
+    parser.add_argument('--zstd-level', type=int, nargs='*', default=[3, 19, 22], help='zstd levels')
+    parser.add_argument(
+        '--zstd-long', type=lambda value: value.lower() == 'true', nargs='*', default=[False, True],
+        help='zstd long-distance matching settings (true/false)'
+    )
+    parser.add_argument(
+        '--profile', nargs='*', choices=sorted(COMPRESSION_PROFILES), default=[],
+        help='Measure these compression profiles instead of the parameter lists'
+    )
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for encoding, label, params in build_scenarios(args):
+            print(f"Running {label}", file=sys.stderr)
+            result = run_scenario(encoding, params, args.database, work_dir)
+            result['scenario'] = label
+            results.append(result)
+            
+    if args.json:
+        print(json.dumps({'profiles': COMPRESSION_PROFILES, 'results': results}, indent=2))
+    else:
+        print(
+            f"{'scenario':<44} {'size':>12} {'ratio':>7} {'comp s':>8} {'decomp s':>9} "
+            f"{'comp MB':>8} {'decomp MB':>10}"
+        )
+        for row in results:
+            print(
+                f"{row['scenario']:<44} {row['size']:>12,} {row['ratio']:>7.3f} {row['compress_seconds']:>8.3f} "
+                f"{row['decompress_seconds']:>9.3f} {row['compress_peak_mb']:>8.1f} {row['decompress_peak_mb']:>10.1f}"
+            )
+            
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+HTTP Client Benchmark
+Compares the requests and httpx backends against a local mock ORDS server.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Any
+from urllib.parse import urlparse, parse_qs
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from helpers.http_client import HTTPClient
+from helpers.async_http_client import AsyncHTTPClient
+
+logger = logging.getLogger(__name__)
+
+# Row counts of the largest endpoints (public/data/bvl/manifest.json)
+DEFAULT_SIZES = {
+    'mittel': 2088,
+    'awg': 29391,
+    'awg_kultur': 40501,
+    'awg_schadorg': 44665,
+    'awg_aufwand': 37748,
+    'awg_wartezeit': 16328,
+    'wirkstoff': 479,
+    'mittel_vertrieb': 1726,
+}
+
+
+class MockORDSHandler(BaseHTTPRequestHandler):
+    """Serves /<endpoint>?limit=&offset= pages like the BVL ORDS API."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = url.path.rstrip('/').rsplit('/', 1)[-1]
+        query = parse_qs(url.query)
+        limit = int(query.get('limit', ['25'])[0])
+        offset = int(query.get('offset', ['0'])[0])
+        total = self.server.sizes.get(name)
+        
+        if total is None:
+            self.send_error(404)
+            return
+            
+        time.sleep(self.server.latency)
+        
+        end = min(offset + limit, total)
+        items = [
+            {'id': i, 'kennr': f'{i:06d}-00', 'text': 'x' * 80}
+            for i in range(offset, end)
+        ]
+        body = json.dumps({
+            'items': items,
+            'hasMore': end < total,
+            'limit': limit,
+            'offset': offset,
+            'count': len(items)
+        }).encode('utf-8')
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+        with self.server.lock:
+            self.server.request_count += 1
+            
+    def log_message(self, format, *args):
+        pass
+
+
+class MockORDSServer(ThreadingHTTPServer):
+    """Threaded mock server with a listen backlog large enough for bursts."""
+    
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_mock_server(sizes: Dict[str, int], latency: float) -> ThreadingHTTPServer:
+    """
+    Start mock ORDS server on a free localhost port.
+    
+    Args:
+        sizes: Number of rows per endpoint
+        latency: Artificial server latency per request in seconds
+        
+    Returns:
+        Running server (serving in a daemon thread)
+    """
+    server = MockORDSServer(('127.0.0.1', 0), MockORDSHandler)
+    server.sizes = sizes
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_requests(base_url: str, endpoints: List[str], workers: int, max_in_flight: int) -> int:
+    """Fetch all endpoints with HTTPClient in a thread pool."""
+    client = HTTPClient(base_url, max_in_flight=max_in_flight)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(client.fetch_paginated, endpoints))
+    finally:
+        client.close()
+    return sum(len(records) for records in results)
+
+
+async def _run_httpx(base_url: str, endpoints: List[str], workers: int, max_in_flight: int, http2: bool) -> int:
+    """Fetch all endpoints concurrently with one AsyncHTTPClient."""
+    semaphore = asyncio.Semaphore(workers)
+    async with AsyncHTTPClient(
+        base_url,
+        max_in_flight=max_in_flight,
+        http2=http2,
+        max_connections=workers * max_in_flight
+    ) as client:
+        
+        async def download(path: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await client.fetch_paginated(path)
+                
+        results = await asyncio.gather(*(download(path) for path in endpoints))
+    return sum(len(records) for records in results)
+
+
+def run_httpx(base_url: str, endpoints: List[str], workers: int, max_in_flight: int, http2: bool) -> int:
+    """Fetch all endpoints with AsyncHTTPClient from one event loop."""
+    return asyncio.run(_run_httpx(base_url, endpoints, workers, max_in_flight, http2))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark HTTP backends against a local mock ORDS server'
+    )
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request in seconds')
+    parser.add_argument('--scale', type=float, default=0.25, help='Scale factor for endpoint row counts')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent endpoints')
+    parser.add_argument('--max-in-flight', type=int, default=4, help='Concurrent pages per endpoint')
+    parser.add_argument('--http2', action='store_true', help='Request HTTP/2 (mock server speaks HTTP/1.1 only)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    
+    sizes = {name: max(1, int(count * args.scale)) for name, count in DEFAULT_SIZES.items()}
+    endpoints = list(sizes)
+    server = start_mock_server(sizes, args.latency)
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/ords/psm/api-v1/'
+    
+    scenarios = [
+        ('requests serial', lambda: run_requests(base_url, endpoints, 1, 1)),
+        (f'requests workers={args.workers} in-flight={args.max_in_flight}',
+         lambda: run_requests(base_url, endpoints, args.workers, args.max_in_flight)),
+        (f'httpx workers={args.workers} in-flight={args.max_in_flight}',
+         lambda: run_httpx(base_url, endpoints, args.workers, args.max_in_flight, args.http2)),
+    ]
+    
+    results = []
+    try:
+        for name, scenario in scenarios:
+            server.request_count = 0
+            start = time.perf_counter()
+            records = scenario()
+            elapsed = time.perf_counter() - start
+            results.append({
+                'scenario': name,
+                'seconds': round(elapsed, 3),
+                'records': records,
+                'requests': server.request_count
+            })
+    finally:
+        server.shutdown()
+        
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'scenario':<40} {'seconds':>9} {'records':>9} {'requests':>9}")
+        for row in results:
+            print(f"{row['scenario']:<40} {row['seconds']:>9.3f} {row['records']:>9} {row['requests']:>9}")
+            
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
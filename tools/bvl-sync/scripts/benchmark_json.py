@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+JSON Codec Benchmark
+Measures the JSON work of one build (decoding the API pages and encoding
+payload_json for every row) with the json module and with orjson as the
+decoding backend. Payloads are encoded with the json module either way.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_http import DEFAULT_SIZES
+from helpers import json_codec
+from helpers.transformers import ROW_MAPPERS
+
+# Rows per API page
+PAGE_SIZE = 1000
+
+
+def build_pages(sizes: Dict[str, int], seed: int = 0) -> Dict[str, List[bytes]]:
+    """
+    Build encoded ORDS pages of synthetic records per endpoint.
+    
+    Records carry every field of the endpoint's column spec, with German
+    text, integers and decimal values like the real API.
+    
+    Args:
+        sizes: Number of rows per endpoint
+        seed: Random seed
+        
+    Returns:
+        Endpoint name -> list of encoded pages
+    """
+    rng = random.Random(seed)
+    pages = {}
+    
+    for name, total in sizes.items():
+        fields = ROW_MAPPERS[name].fields
+        records = []
+        for i in range(total):
+            record = {}
+            for field in fields:
+                roll = rng.random()
+                if roll < 0.2:
+                    record[field] = None
+                elif roll < 0.4:
+                    record[field] = rng.randint(0, 100000)
+                elif roll < 0.5:
+                    record[field] = round(rng.uniform(0.01, 500), 2)
+                else:
+                    record[field] = f"{field} Größe {i} " + 'ä' * rng.randint(0, 40)
+            records.append(record)
+            
+        pages[name] = [
+            json.dumps({
+                'items': records[offset:offset + PAGE_SIZE],
+                'hasMore': offset + PAGE_SIZE < total,
+                'limit': PAGE_SIZE,
+                'offset': offset
+            }).encode('utf-8')
+            for offset in range(0, total, PAGE_SIZE)
+        ]
+        
+    return pages
+
+
+def run_backend(pages: Dict[str, List[bytes]], repeat: int) -> Dict[str, float]:
+    """
+    Decode all pages and encode a payload per record with the active backend.
+    
+    Args:
+        pages: Encoded pages per endpoint
+        repeat: Number of runs (the fastest is reported)
+        
+    Returns:
+        Dictionary with decode and encode seconds
+    """
+    best = {'decode_seconds': float('inf'), 'encode_seconds': float('inf')}
+    
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decoded = [json_codec.loads(page) for endpoint_pages in pages.values() for page in endpoint_pages]
+        decode_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for page in decoded:
+            for record in page['items']:
+                json_codec.dumps(record)
+        encode_seconds = time.perf_counter() - start
+        
+        best['decode_seconds'] = min(best['decode_seconds'], decode_seconds)
+        best['encode_seconds'] = min(best['encode_seconds'], encode_seconds)
+        
+    return best
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark the JSON codec backends on a synthetic build'
+    )
+    parser.add_argument('--scale', type=float, default=1.0, help='Scale factor for endpoint row counts')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per backend')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    
+    sizes = {name: max(1, int(count * args.scale)) for name, count in DEFAULT_SIZES.items()}
+    pages = build_pages(sizes)
+    
+    fast_backend = json_codec.orjson
+    backends = {'json': None}
+    if fast_backend is not None:
+        backends['orjson'] = fast_backend
+    else:
+        print("orjson not installed, measuring the json module only", file=sys.stderr)
+        
+    results: List[Dict[str, Any]] = []
+    try:
+        for backend, module in backends.items():
+            json_codec.orjson = module
+            result = run_backend(pages, args.repeat)
+            result['backend'] = backend
+            result['total_seconds'] = result['decode_seconds'] + result['encode_seconds']
+            results.append(result)
+    finally:
+        json_codec.orjson = fast_backend
+        
+    baseline = results[0]['total_seconds']
+    for result in results:
+        result['speedup'] = round(baseline / result['total_seconds'], 2)
+        
+    if args.json:
+        print(json.dumps({'rows': sum(sizes.values()), 'results': results}, indent=2))
+    else:
+        print(f"{sum(sizes.values()):,} rows")
+        print(f"{'backend':<8} {'decode s':>9} {'encode s':>9} {'total s':>8} {'speedup':>8}")
+        for row in results:
+            print(
+                f"{row['backend']:<8} {row['decode_seconds']:>9.3f} {row['encode_seconds']:>9.3f} "
+                f"{row['total_seconds']:>8.3f} {row['speedup']:>7.2f}x"
+            )
+            
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,26 +5,39 @@ Main ETL pipeline for fetching and processing BVL plant protection data.
 """
 
 import argparse
+import itertools
+import json
 import logging
+import os
 import sys
+import time
 import yaml
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Callable, Optional
 
 # Add scripts directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from helpers.http_client import HTTPClient
+from helpers.http_client import HTTPClient, RequestStats, LATENCY_BUCKETS
+from helpers.async_http_client import ThreadedAsyncHTTPClient
+from helpers.http_cache import ResponseCache
 from helpers.database import DatabaseManager
-from helpers.transformers import get_mapper
+from helpers.transformers import RowMapper, get_mapper, get_row_mapper, slim_payload
 from helpers.load_static_lookups import (
     load_static_lookups,
     enrich_tables_with_lookups,
     load_bio_enrichments
 )
-from helpers.compression import compress_database
-from helpers.manifest import generate_manifest
+from helpers.compression import brotli_size, compress_database, compress_chunks, CHUNK_DIR, COMPRESSION_PROFILES
+from helpers.delta import decompress_brotli, create_delta
+from helpers.packages import create_packages
+from helpers.stages import StagedRunner, DEFAULT_QUEUE_SIZE
+from helpers.profiler import StageProfiler, peak_rss_mb
+from helpers.metrics import MetricFamily, PeriodicWriter, read_sample, write_textfile
+from helpers.tracing import Tracer
+from helpers.manifest import generate_manifest, calculate_sha256, calculate_content_hashes
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +46,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Exit code when the BVL data has not changed since the previous build
+EXIT_NO_CHANGE = 3
+
+# Default seconds between metrics textfile updates during a run
+DEFAULT_METRICS_INTERVAL = 30
+
+# Timestamp of the ZIP entry in reproducible builds
+REPRODUCIBLE_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+# Run metadata that only goes to the manifest in reproducible builds
+RUN_META_KEYS = ('lastSyncIso', 'lastSyncChanges')
+
 
 class ETLPipeline:
     """Main ETL pipeline for BVL data."""
@@ -43,7 +68,26 @@ class ETLPipeline:
         enrichments_config_path: str,
         schema_path: str,
         output_dir: str,
-        skip_raw: bool = False
+        skip_raw: bool = False,
+        workers: int = 1,
+        max_in_flight: int = 1,
+        http_backend: str = 'requests',
+        http2: bool = False,
+        bulk_load: bool = False,
+        force_rebuild: bool = False,
+        http_cache_dir: Optional[str] = None,
+        http_cache_max_mb: int = 512,
+        incremental: bool = False,
+        reproducible: bool = False,
+        chunk_size_mb: int = 0,
+        zstd_options: Optional[Dict[str, Any]] = None,
+        compression_profile: str = 'default',
+        table_groups: bool = False,
+        slim_payload: bool = False,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        metrics_file: Optional[str] = None,
+        metrics_interval: float = DEFAULT_METRICS_INTERVAL,
+        trace_file: Optional[str] = None
     ):
         """
         Initialize ETL pipeline.
@@ -54,12 +98,66 @@ class ETLPipeline:
             schema_path: Path to SQL schema
             output_dir: Output directory for database
             skip_raw: Skip raw data download
+            workers: Number of endpoints fetched concurrently (1 = serial)
+            max_in_flight: Number of page requests kept in flight per endpoint
+            http_backend: 'requests' (a session per thread) or 'httpx' (one
+                asyncio event loop with a shared connection pool)
+            http2: Use HTTP/2 multiplexing with the httpx backend
+            bulk_load: Load with write-optimized PRAGMAs and create indexes
+                and views after the data load
+            force_rebuild: Rebuild even if the BVL stand date is unchanged
+            http_cache_dir: Directory of the persistent HTTP response cache
+                (None disables caching)
+            http_cache_max_mb: Size cap of the response cache in MB
+            incremental: Update an existing database in place, writing only
+                new or changed rows and deleting withdrawn ones
+            reproducible: Produce byte-identical artifacts for identical data
+                (no wall-clock values in the database, rows in key order)
+            chunk_size_mb: Also publish the database as content-addressed
+                Brotli chunks of this size in MB (0 disables chunking)
+            zstd_options: Also publish a zstd artifact with these settings
+                (level, long_distance, dictionary); None disables zstd
+            compression_profile: Encoder settings from COMPRESSION_PROFILES
+                ('dev', 'default' or 'release')
+            table_groups: Also publish one database per table group
+                (table_groups in the endpoints config)
+            slim_payload: Store only the fields not promoted to columns in
+                payload_json; <table>_payload views rebuild the full payload
+            queue_size: Maximum number of pages buffered between the fetch,
+                map and write stages
+            metrics_file: Prometheus textfile to write the run's metrics to
+                (None disables metrics)
+            metrics_interval: Seconds between textfile updates during the run
+            trace_file: Chrome trace JSON file to write the run's timeline to
+                (None disables tracing)
         """
         self.config_path = config_path
         self.enrichments_config_path = enrichments_config_path
         self.schema_path = schema_path
         self.output_dir = Path(output_dir)
         self.skip_raw = skip_raw
+        self.workers = max(1, workers)
+        self.max_in_flight = max(1, max_in_flight)
+        self.http_backend = http_backend
+        self.http2 = http2
+        self.bulk_load = bulk_load
+        self.force_rebuild = force_rebuild
+        self.incremental = incremental
+        self.reproducible = reproducible
+        self.chunk_size_mb = max(0, chunk_size_mb)
+        self.zstd_options = zstd_options
+        self.compression_profile = compression_profile
+        self.table_groups = table_groups
+        self.slim_payload = slim_payload
+        self.payload_columns: Dict[str, set] = {}
+        self.queue_size = max(1, queue_size)
+        self.metrics_path = Path(metrics_file) if metrics_file else None
+        self.metrics_interval = metrics_interval
+        self.artifacts: Dict[str, int] = {}
+        self._run_started: Optional[float] = None
+        self._last_success: Optional[float] = None
+        self.trace_path = Path(trace_file) if trace_file else None
+        self.tracer = Tracer(enabled=self.trace_path is not None)
         
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -74,64 +172,404 @@ class ETLPipeline:
         # Initialize components
         self.db_path = self.output_dir / "pflanzenschutz.sqlite"
         self.db_manager = DatabaseManager(str(self.db_path))
-        self.http_client = HTTPClient(self.config['base_url'])
+        self.row_hash_path = self.output_dir / "pflanzenschutz.sqlite-rowhash"
+        self.http_cache = None
+        if http_cache_dir:
+            self.http_cache = ResponseCache(http_cache_dir, max_bytes=http_cache_max_mb * 1024 * 1024)
+        self.request_stats = RequestStats()
+        if http_backend == 'httpx':
+            # All fetcher threads share the connection pool of one event loop
+            self.http_client = ThreadedAsyncHTTPClient(
+                self.config['base_url'],
+                max_in_flight=self.max_in_flight,
+                http2=self.http2,
+                max_connections=self.workers * self.max_in_flight,
+                cache=self.http_cache,
+                request_stats=self.request_stats
+            )
+        else:
+            self.http_client = HTTPClient(
+                self.config['base_url'],
+                max_in_flight=self.max_in_flight,
+                cache=self.http_cache,
+                request_stats=self.request_stats,
+                tracer=self.tracer
+            )
+        self.profiler = StageProfiler(tracer=self.tracer)
         
         # Stats
         self.stats = {
             'start_time': None,
             'end_time': None,
             'endpoints': {},
-            'errors': []
+            'errors': [],
+            'http_cache': self.http_cache.stats if self.http_cache else None
         }
         
+    def get_previous_api_stand(self) -> Optional[str]:
+        """
+        Get the API stand date of the previous successful build.
+        
+        Returns:
+            Stand from the previous manifest or bvl_meta, or None if unknown
+        """
+        manifest_path = self.output_dir / "manifest.json"
+        
+        if manifest_path.exists():
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    api_stand = json.load(f).get('api_stand')
+                if api_stand:
+                    return api_stand
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read previous manifest: {e}")
+                
+        if self.db_path.exists() and self.db_manager.table_exists('bvl_meta'):
+            return self.db_manager.get_meta('apiStand')
+            
+        return None
+        
+    def is_data_unchanged(self) -> bool:
+        """
+        Pre-flight check: compare the current BVL stand with the previous build.
+        
+        Returns:
+            True if the stand date matches the previous build
+        """
+        previous_stand = self.get_previous_api_stand()
+        
+        if not previous_stand:
+            logger.info("No previous API stand recorded, running full build")
+            return False
+            
+        # A fresh cache entry may predate a new stand, so always ask BVL
+        data = self.http_client.get('stand', revalidate=True)
+        items = data.get('items', []) if data else []
+        
+        if not items:
+            logger.warning("Could not fetch API stand, running full build")
+            return False
+            
+        current_stand = get_mapper('stand')(items[0])['stand']
+        logger.info(f"API stand: current={current_stand}, previous={previous_stand}")
+        
+        return current_stand == previous_stand
+        
     def init_database(self):
         """Initialize database with schema."""
         logger.info("Initializing database schema")
-        self.db_manager.init_schema(self.schema_path)
+        self.db_manager.init_schema(self.schema_path, defer_indexes=self.bulk_load)
         
+        if self.bulk_load:
+            self.db_manager.enable_bulk_load()
+            
+        if self.incremental:
+            self.db_manager.attach_row_hashes(str(self.row_hash_path))
+        elif self.row_hash_path.exists():
+            # A full build rewrites every row, so stored hashes are stale
+            logger.info(f"Removing stale row hashes {self.row_hash_path}")
+            self.row_hash_path.unlink()
+            
         # Set initial metadata
         self.db_manager.set_meta('dataSource', 'BVL PSM API')
         self.db_manager.set_meta('dataSourceType', 'api-v1')
         
-    def fetch_endpoint_data(self, endpoint: Dict[str, Any]) -> int:
+    def remove_database(self):
+        """Delete the database left by a previous build."""
+        self.db_manager.disconnect()
+        
+        if self.db_path.exists():
+            logger.info(f"Removing previous database {self.db_path}")
+            self.db_path.unlink()
+            
+    @contextmanager
+    def _endpoint_stage(self, endpoint: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Profile the processing of one endpoint.
+        
+        The stage gets the endpoint's status and row count from the stats and
+        its request counters.
+        
+        Args:
+            endpoint: Endpoint configuration
+            
+        Yields:
+            Details of the stage
+        """
+        with self.profiler.stage(f"endpoint:{endpoint['name']}") as stage:
+            try:
+                yield stage
+            finally:
+                result = self.stats['endpoints'].get(endpoint['name'], {})
+                stage['status'] = result.get('status', 'error')
+                stage['rows'] = result.get('count', 0)
+                stage.update(self.request_stats.for_path(endpoint['path']))
+                
+    def _endpoint_mapper(self, endpoint: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], Any]]:
         """
-        Fetch data for a single endpoint.
+        Get the mapper used to store an endpoint's records.
+        
+        Full builds insert rows straight from the row mapper, slim and
+        incremental builds work on record dicts. Records an error in the
+        stats if the endpoint has no mapper.
         
         Args:
             endpoint: Endpoint configuration
             
         Returns:
-            Number of records fetched
+            Row mapper, record mapper or None
+        """
+        name = endpoint['name']
+        
+        if self.slim_payload or self.incremental:
+            mapper = get_mapper(name, sort_keys=self.reproducible)
+        else:
+            mapper = get_row_mapper(name, sort_keys=self.reproducible)
+            
+        if not mapper:
+            logger.error(f"No mapper found for {name}")
+            self.stats['endpoints'][name] = {
+                'count': 0,
+                'status': 'error',
+                'error': 'No mapper found'
+            }
+            return None
+            
+        if self.slim_payload:
+            mapper = self._slim_mapper(endpoint['table'], mapper)
+            
+        return mapper
+        
+    def _write_endpoint(
+        self,
+        endpoint: Dict[str, Any],
+        mapper: Callable[[Dict[str, Any]], Any],
+        batches: Iterable[List[Any]]
+    ) -> int:
+        """
+        Insert (or sync) the mapped pages of an endpoint and record its stats.
+        
+        Args:
+            endpoint: Endpoint configuration
+            mapper: Mapper that produced the batches
+            batches: Iterable of mapped record (or row) lists
+            
+        Returns:
+            Number of records inserted
         """
         name = endpoint['name']
-        path = endpoint['path']
         table = endpoint['table']
         
-        logger.info(f"Fetching data for endpoint: {name}")
+        if self.tracer.enabled:
+            batches = self._trace_inserts(name, batches)
+            
+        if self.incremental:
+            changes = self.db_manager.sync_record_batches(
+                table,
+                self.get_key_columns(endpoint),
+                batches
+            )
+            count = changes['inserted'] + changes['updated'] + changes['unchanged']
+            self.stats['endpoints'][name] = {
+                'count': count,
+                'status': 'success',
+                'inserted': changes['inserted'],
+                'updated': changes['updated'],
+                'deleted': changes['deleted']
+            }
+            return count
+            
+        if isinstance(mapper, RowMapper):
+            count = self.db_manager.insert_row_batches(table, mapper.columns, batches)
+        else:
+            count = self.db_manager.insert_record_batches(table, batches)
+            
+        logger.info(f"Inserted {count} records into {table}")
         
-        try:
-            # Fetch records
-            records = self.http_client.fetch_paginated(path)
-            
-            if not records:
-                logger.warning(f"No records fetched for {name}")
-                self.stats['endpoints'][name] = {
-                    'count': 0,
-                    'status': 'empty'
-                }
-                return 0
-                
-            # Transform records
-            mapper = get_mapper(name)
-            if not mapper:
-                logger.error(f"No mapper found for {name}")
-                self.stats['endpoints'][name] = {
-                    'count': 0,
-                    'status': 'error',
-                    'error': 'No mapper found'
-                }
-                return 0
+        self.stats['endpoints'][name] = {
+            'count': count,
+            'status': 'success'
+        }
+        
+        return count
+        
+    def _trace_inserts(self, name: str, batches: Iterable[List[Any]]) -> Iterator[List[Any]]:
+        """
+        Trace the writer's work on each batch as an insert span.
+        
+        A span lasts while the batch is handed out, i.e. until the writer
+        asks for the next one, so waiting for pages is not part of it.
+        
+        Args:
+            name: Endpoint name
+            batches: Iterable of mapped record (or row) lists
+            
+        Yields:
+            The batches
+        """
+        for batch in batches:
+            with self.tracer.span('insert', 'db', endpoint=name, rows=len(batch)):
+                yield batch
                 
+    def _endpoint_failed(self, name: str, error: Exception):
+        """
+        Record a failed endpoint in the stats.
+        
+        Args:
+            name: Endpoint name
+            error: Exception raised while fetching, mapping or inserting
+        """
+        logger.error(f"Failed to fetch {name}: {error}")
+        self.stats['endpoints'][name] = {
+            'count': 0,
+            'status': 'error',
+            'error': str(error)
+        }
+        self.stats['errors'].append(f"{name}: {str(error)}")
+        
+    def get_key_columns(self, endpoint: Dict[str, Any]) -> List[str]:
+        """
+        Get the columns identifying a row of an endpoint's table.
+        
+        Uses `primary_key` from endpoints.yaml when it names the table's key
+        columns, otherwise the PRIMARY KEY of the table itself (which is what
+        INSERT OR REPLACE resolves rows by).
+        
+        Args:
+            endpoint: Endpoint configuration
+            
+        Returns:
+            Key column names
+        """
+        configured = endpoint.get('primary_key') or []
+        if isinstance(configured, str):
+            configured = [configured]
+            
+        table_key = self.db_manager.get_primary_key(endpoint['table'])
+        
+        if table_key and set(configured) != set(table_key):
+            logger.warning(
+                f"primary_key {configured} of {endpoint['name']} does not match "
+                f"{endpoint['table']} key {table_key}, using the table key"
+            )
+            return table_key
+            
+        return list(configured) or table_key
+        
+    def _slim_mapper(
+        self,
+        table: str,
+        mapper: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Wrap a mapper so it stores slim payloads.
+        
+        The fields left out of payload_json are collected per table for the
+        payload views.
+        
+        Args:
+            table: Target table
+            mapper: Record mapper of the endpoint
+            
+        Returns:
+            Mapper producing slim payloads
+        """
+        affinities = self.db_manager.get_column_affinities(table)
+        promoted = self.payload_columns.setdefault(table, set())
+        
+        def map_slim(record: Dict[str, Any]) -> Dict[str, Any]:
+            mapped = mapper(record)
+            promoted.update(slim_payload(mapped, record, affinities, sort_keys=self.reproducible))
+            return mapped
+            
+        return map_slim
+        
+    def create_payload_views(self):
+        """
+        Create the views rebuilding the full payload of slimmed tables.
+        
+        The promoted fields are kept in bvl_meta (payloadColumns), so tables
+        not fetched in this run keep their views. Payload savings are logged
+        and kept in stats['payload'], with the Brotli-compressed payload
+        sizes (at the 'dev' settings) as an estimate of the saving in the
+        compressed artifacts.
+        """
+        if not self.slim_payload:
+            return
+            
+        columns = json.loads(self.db_manager.get_meta('payloadColumns') or '{}')
+        for table, fields in self.payload_columns.items():
+            columns[table] = sorted(set(columns.get(table, [])) | fields)
+            
+        self.db_manager.set_meta('payloadColumns', json.dumps(columns, sort_keys=True, separators=(',', ':')))
+        sizes = self.db_manager.create_payload_views(columns)
+        
+        stored = sum(slim for slim, _ in sizes.values())
+        full = sum(full for _, full in sizes.values())
+        for table, (slim, table_full) in sorted(sizes.items()):
+            logger.debug(f"payload_json of {table}: {table_full:,} -> {slim:,} bytes")
+        logger.info(f"Slim payload_json: {full:,} -> {stored:,} bytes in {len(sizes)} tables")
+        
+        settings = COMPRESSION_PROFILES['dev']['brotli']
+        compressed = {}
+        for key, suffix in (('stored', ''), ('full', '_payload')):
+            payloads = (
+                payload.encode('utf-8')
+                for table in sorted(sizes)
+                for payload in self.db_manager.iter_payloads(f"{table}{suffix}")
+            )
+            compressed[key] = brotli_size(payloads, **settings)
+            
+        self.stats['payload'] = {
+            'full_bytes': full,
+            'stored_bytes': stored,
+            'full_compressed_bytes': compressed['full'],
+            'stored_compressed_bytes': compressed['stored']
+        }
+        
+    def log_payload_savings(self, compression_results: Dict[str, Any]):
+        """
+        Log what slim payloads saved in the database and its .br artifact.
+        
+        The database saving is the payload bytes left out, the .br saving
+        is estimated from the Brotli-compressed payloads.
+        
+        Args:
+            compression_results: Result of compress_database()
+        """
+        payload = self.stats.get('payload')
+        if not payload:
+            return
+            
+        saved = payload['full_bytes'] - payload['stored_bytes']
+        saved_compressed = payload['full_compressed_bytes'] - payload['stored_compressed_bytes']
+        database = compression_results['original_size']
+        message = (
+            f"Slim payload savings: database {database:,} bytes "
+            f"({saved:,} bytes less than with full payloads)"
+        )
+        if 'brotli_size' in compression_results:
+            message += f", .sqlite.br {compression_results['brotli_size']:,} bytes (~{saved_compressed:,} bytes less)"
+        logger.info(message)
+        
+    def _map_page(
+        self,
+        name: str,
+        mapper: Callable[[Dict[str, Any]], Any],
+        records: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """
+        Map one raw API page, skipping records that fail to map.
+        
+        Args:
+            name: Endpoint name (for logging)
+            mapper: Record or row mapper of the endpoint
+            records: Raw records
+            
+        Returns:
+            Mapped records (or rows)
+        """
+        with self.tracer.span('map', 'etl', endpoint=name) as span:
             mapped_records = []
             for record in records:
                 try:
@@ -140,40 +578,97 @@ class ETLPipeline:
                 except Exception as e:
                     logger.error(f"Failed to map record in {name}: {e}")
                     continue
-                    
-            # Insert into database
-            count = self.db_manager.insert_records(table, mapped_records)
-            
-            logger.info(f"Inserted {count} records into {table}")
-            
-            self.stats['endpoints'][name] = {
-                'count': count,
-                'status': 'success'
-            }
-            
-            return count
-            
-        except Exception as e:
-            logger.error(f"Failed to fetch {name}: {e}")
-            self.stats['endpoints'][name] = {
-                'count': 0,
-                'status': 'error',
-                'error': str(e)
-            }
-            self.stats['errors'].append(f"{name}: {str(e)}")
-            return 0
-            
+            span['rows'] = len(mapped_records)
+        return mapped_records
+        
     def fetch_all_endpoints(self):
         """Fetch data from all configured endpoints."""
         logger.info("Fetching data from all endpoints")
         
-        endpoints = self.config.get('endpoints', [])
+        self._fetch_endpoints_staged(self.config.get('endpoints', []))
         
-        for endpoint in endpoints:
-            self.fetch_endpoint_data(endpoint)
+    def _fetch_endpoints_staged(self, endpoints: List[Dict[str, Any]]):
+        """
+        Run fetch, map and insert as concurrent stages.
+        
+        `workers` fetcher threads download endpoints in config order, a
+        mapper thread maps their pages and this thread writes them, connected
+        by queues of at most `queue_size` pages. A full queue stalls the
+        stage feeding it, so a slow writer throttles the downloads. This
+        thread stays the only user of the SQLite connection, and results are
+        written in config order, so the stats match a serial run. Errors of
+        any stage are recorded for the endpoint in the stats, and the rows
+        already written for it are rolled back. Per-stage
+        throughput is stored in stats['throughput'].
+        
+        Args:
+            endpoints: Endpoint configurations
+        """
+        logger.info(
+            f"Fetching {len(endpoints)} endpoints with {self.workers} workers "
+            f"(queue size {self.queue_size})"
+        )
+        
+        # Mappers are resolved here, as slim mappers read the table schema
+        mappers = [self._endpoint_mapper(endpoint) for endpoint in endpoints]
+        
+        def fetch(index: int) -> Iterator[List[Dict[str, Any]]]:
+            if not mappers[index]:
+                return iter(())
+            pages = self.http_client.iter_pages(endpoints[index]['path'], strict=self.incremental)
+            return (page for page in pages if page)
+            
+        def map_page(index: int, records: List[Dict[str, Any]]) -> List[Any]:
+            return self._map_page(endpoints[index]['name'], mappers[index], records)
+            
+        runner = StagedRunner(
+            list(range(len(endpoints))),
+            fetch,
+            map_page,
+            workers=self.workers,
+            queue_size=self.queue_size
+        )
+        
+        for index, batches in runner:
+            endpoint = endpoints[index]
+            name = endpoint['name']
+            if not mappers[index]:
+                continue
+                
+            logger.info(f"Processing data for endpoint: {name}")
+            with self._endpoint_stage(endpoint) as stage:
+                try:
+                    first = next(batches, None)
+                    if first is None:
+                        logger.warning(f"No records fetched for {name}")
+                        self.stats['endpoints'][name] = {
+                            'count': 0,
+                            'status': 'empty'
+                        }
+                    else:
+                        self._write_endpoint(endpoint, mappers[index], itertools.chain([first], batches))
+                except Exception as e:
+                    self._endpoint_failed(name, e)
+                    
+                counters = runner.key_stats(index)
+                stage['fetch_seconds'] = counters['fetch']['busy_seconds']
+                stage['map_seconds'] = counters['map']['busy_seconds']
+                stage['insert_seconds'] = counters['write']['busy_seconds']
+                
+        self.stats['throughput'] = runner.stats()
+        for stage, counters in self.stats['throughput'].items():
+            logger.info(
+                f"Stage {stage}: {counters['rows']} rows in {counters['busy_seconds']}s busy, "
+                f"{counters['blocked_seconds']}s blocked, {counters['idle_seconds']}s idle"
+            )
             
-    def load_static_data(self):
-        """Load static lookup data."""
+    def load_static_data(self) -> int:
+        """
+        Load static lookup data.
+        
+        Returns:
+            Number of rows loaded
+        """
         logger.info("Loading static lookup data")
         counts = load_static_lookups(self.db_manager, self.config)
         
@@ -183,12 +678,14 @@ class ETLPipeline:
                 'status': 'success'
             }
             
+        return sum(counts.values())
+        
     def enrich_data(self):
         """Enrich data with lookups and bio information."""
         logger.info("Enriching data")
         
         # Enrich with lookups
-        enrich_tables_with_lookups(self.db_manager)
+        enrich_tables_with_lookups(self.db_manager, tracer=self.tracer)
         
         # Load bio enrichments
         load_bio_enrichments(self.db_manager, self.enrichments_config)
@@ -229,10 +726,25 @@ class ETLPipeline:
                 table_counts[table] = self.db_manager.get_table_count(table)
                 
         # Update metadata
-        import json
-        self.db_manager.set_meta('lastSyncIso', datetime.utcnow().isoformat() + 'Z')
         self.db_manager.set_meta('lastSyncCounts', json.dumps(table_counts))
         
+        if self.reproducible:
+            placeholders = ', '.join('?' for _ in RUN_META_KEYS)
+            self.db_manager.execute_update(f"DELETE FROM bvl_meta WHERE key IN ({placeholders})", RUN_META_KEYS)
+        else:
+            self.db_manager.set_meta('lastSyncIso', datetime.utcnow().isoformat() + 'Z')
+            
+        if self.incremental and not self.reproducible:
+            changes = {
+                endpoint['table']: {
+                    key: self.stats['endpoints'][endpoint['name']][key]
+                    for key in ('inserted', 'updated', 'deleted')
+                }
+                for endpoint in self.config.get('endpoints', [])
+                if 'inserted' in self.stats['endpoints'].get(endpoint['name'], {})
+            }
+            self.db_manager.set_meta('lastSyncChanges', json.dumps(changes))
+            
         # Get API stand date
         stand_results = self.db_manager.execute_query("SELECT stand FROM bvl_stand LIMIT 1")
         if stand_results:
@@ -240,18 +752,319 @@ class ETLPipeline:
             
         return table_counts
         
+    def restore_previous_build(self) -> Optional[Dict[str, str]]:
+        """
+        Decompress the previously published database before it is overwritten.
+        
+        Returns:
+            Dictionary with path, content hash and deltas of the previous
+            build, or None if there is none
+        """
+        brotli_path = self.output_dir / f"{self.db_path.name}.br"
+        manifest_path = self.output_dir / "manifest.json"
+        
+        if not brotli_path.exists() or not manifest_path.exists():
+            return None
+            
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read previous manifest: {e}")
+            return None
+            
+        previous_sha256 = next(
+            (entry['sha256'] for entry in manifest.get('files', []) if entry.get('name') == brotli_path.name),
+            None
+        )
+        
+        # Only use the file the previous manifest describes
+        if not previous_sha256 or calculate_sha256(str(brotli_path)) != previous_sha256:
+            logger.info("Previous build does not match its manifest, skipping delta")
+            return None
+            
+        previous_path = self.output_dir / f"{self.db_path.name}-previous"
+        if not decompress_brotli(str(brotli_path), str(previous_path)):
+            return None
+            
+        return {
+            'path': str(previous_path),
+            'hash': calculate_content_hashes(str(previous_path))[0],
+            'deltas': manifest.get('deltas', [])
+        }
+        
+    def create_deltas(
+        self,
+        previous: Optional[Dict[str, str]],
+        compression_results: dict,
+        content_hash: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Create the SQL changeset from the previous build to the new one.
+        
+        Deltas of earlier builds are removed; a delta is only kept if it is
+        smaller than half of the full Brotli download. If the data has not
+        changed, the deltas of the previous build still apply and are kept.
+        
+        Args:
+            previous: Result of restore_previous_build()
+            compression_results: Result of compress_database()
+            content_hash: Content hash of the new build
+            
+        Returns:
+            Delta descriptions for the manifest
+        """
+        if previous and content_hash == previous['hash']:
+            return [
+                {
+                    'path': str(self.output_dir / delta['name']),
+                    'from_hash': delta['from_hash'],
+                    'to_hash': delta['to_hash']
+                }
+                for delta in previous['deltas']
+                if (self.output_dir / delta['name']).exists()
+            ]
+            
+        for stale in self.output_dir.glob(f"{self.db_path.name}.delta-*.sql.br"):
+            stale.unlink()
+            
+        if not previous or 'brotli' not in compression_results:
+            return []
+            
+        delta_path = self.output_dir / f"{self.db_path.name}.delta-{previous['hash'][:16]}.sql.br"
+        delta = create_delta(previous['path'], str(self.db_path), str(delta_path))
+        
+        if not delta:
+            return []
+            
+        if delta['size'] * 2 >= compression_results['brotli_size']:
+            logger.info(f"Delta ({delta['size']:,} bytes) not worth it, removing")
+            delta_path.unlink()
+            return []
+            
+        return [{
+            'path': delta['path'],
+            'from_hash': previous['hash'],
+            'to_hash': content_hash
+        }]
+        
+    def create_chunks(self) -> Optional[Dict[str, Any]]:
+        """
+        Publish the database as content-addressed Brotli chunks.
+        
+        Chunks that did not change since the previous build keep their file
+        and are not compressed again. Chunk files referenced by neither the
+        previous nor the new manifest are removed, so clients still
+        downloading the previous build can finish.
+        
+        Returns:
+            Result of compress_chunks(), or None if chunking is disabled
+        """
+        if not self.chunk_size_mb:
+            return None
+            
+        chunk_dir = self.output_dir / CHUNK_DIR
+        keep = set()
+        manifest_path = self.output_dir / "manifest.json"
+        if manifest_path.exists():
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                keep.update(chunk['name'] for chunk in manifest.get('chunks', {}).get('files', []))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read previous manifest: {e}")
+                
+        settings = COMPRESSION_PROFILES[self.compression_profile]['brotli']
+        chunks = compress_chunks(
+            str(self.db_path),
+            str(chunk_dir),
+            chunk_size=self.chunk_size_mb * 1024 * 1024,
+            quality=settings['quality'],
+            lgwin=settings['lgwin']
+        )
+        keep.update(chunk['name'] for chunk in chunks['chunks'])
+        
+        for stale in chunk_dir.glob('*.br'):
+            if stale.name not in keep:
+                stale.unlink()
+                
+        return chunks
+        
+    def create_table_group_packages(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Publish one Brotli-compressed database per table group.
+        
+        Packages of groups that no longer exist are removed.
+        
+        Returns:
+            Result of create_packages(), or None if packages are disabled
+        """
+        if not self.table_groups:
+            return None
+            
+        settings = COMPRESSION_PROFILES[self.compression_profile]['brotli']
+        packages = create_packages(
+            str(self.db_path),
+            str(self.output_dir),
+            self.config.get('table_groups', {}),
+            quality=settings['quality'],
+            lgwin=settings['lgwin']
+        )
+        
+        current = {Path(package['brotli']['path']).name for package in packages}
+        for stale in self.output_dir.glob(f"{self.db_path.stem}-*{self.db_path.suffix}.br"):
+            if stale.name not in current:
+                stale.unlink()
+                
+        return packages
+        
+    def normalize_database(self):
+        """
+        Remove build-dependent values before a reproducible build is written.
+        
+        updated_at is set to the BVL stand date and all tables are rewritten
+        in primary key order.
+        """
+        stand = self.db_manager.get_meta('apiStand')
+        logger.info(f"Normalizing database for reproducible build (stand {stand})")
+        
+        self.db_manager.normalize_column('updated_at', stand)
+        self.db_manager.reorder_tables()
+        
+    def vacuum_reproducible(self):
+        """Replace the database with a freshly written VACUUM INTO copy."""
+        vacuum_path = self.output_dir / f"{self.db_path.name}-vacuum"
+        vacuum_path.unlink(missing_ok=True)
+        
+        self.db_manager.vacuum_into(str(vacuum_path))
+        self.db_manager.disconnect()
+        os.replace(vacuum_path, self.db_path)
+        self.db_manager.connect()
+        
+    def record_sync_log(self):
+        """
+        Write this sync and the stages timed so far to bvl_sync_log and
+        bvl_sync_stage.
+        
+        Runs just before VACUUM, as later stages work on the sealed file;
+        the manifest (build.stages) has all stages. Skipped in reproducible
+        builds, which keep wall-clock values out of the database.
+        """
+        if self.reproducible:
+            return
+            
+        end_dt = datetime.utcnow()
+        start_dt = datetime.fromisoformat(self.stats['start_time'].rstrip('Z'))
+        
+        self.db_manager.write_sync_log(
+            {
+                'sync_start': self.stats['start_time'],
+                'sync_end': end_dt.isoformat() + 'Z',
+                'duration_seconds': (end_dt - start_dt).total_seconds(),
+                'status': 'error' if self.stats['errors'] else 'success',
+                'error_message': '; '.join(self.stats['errors']) or None,
+                'records_processed': sum(result['count'] for result in self.stats['endpoints'].values())
+            },
+            self.profiler.stages
+        )
+        
+    def record_artifacts(
+        self,
+        compression_results: dict,
+        packages: Optional[List[Dict[str, Any]]],
+        deltas: List[Dict[str, Any]]
+    ):
+        """
+        Keep the file sizes of the published artifacts for the metrics.
+        
+        Args:
+            compression_results: Result of compress_database()
+            packages: Result of create_table_group_packages()
+            deltas: Result of create_deltas()
+        """
+        self.artifacts[self.db_path.name] = compression_results['original_size']
+        for encoding in ('brotli', 'zip', 'zstd'):
+            if encoding in compression_results:
+                self.artifacts[Path(compression_results[encoding]).name] = compression_results[f'{encoding}_size']
+                
+        for package in packages or []:
+            self.artifacts[Path(package['brotli']['path']).name] = package['brotli']['size']
+        for delta in deltas:
+            self.artifacts[Path(delta['path']).name] = Path(delta['path']).stat().st_size
+            
     def compress_and_manifest(self, table_counts: dict):
         """Compress database and generate manifest."""
         logger.info("Compressing database")
         
-        # Vacuum first
-        self.db_manager.vacuum()
+        # Keep the previous build for the delta before it is overwritten
+        with self.profiler.stage('restore_previous'):
+            previous = self.restore_previous_build()
+            
+        if self.reproducible:
+            with self.profiler.stage('normalize'):
+                self.normalize_database()
+                
+        if self.bulk_load:
+            with self.profiler.stage('optimize'):
+                self.db_manager.disable_bulk_load()
+                self.db_manager.optimize()
+                
+        # Last write before the database is sealed
+        self.record_sync_log()
         
+        # Vacuum first
+        with self.profiler.stage('vacuum'):
+            if self.reproducible:
+                self.vacuum_reproducible()
+            else:
+                self.db_manager.vacuum()
+                
         # Compress
-        compression_results = compress_database(
-            str(self.db_path),
-            str(self.output_dir)
-        )
+        compress_start = time.perf_counter()
+        with self.profiler.stage('compress') as stage:
+            compression_results = compress_database(
+                str(self.db_path),
+                str(self.output_dir),
+                zip_date_time=REPRODUCIBLE_ZIP_DATE if self.reproducible else None,
+                zstd_options=self.zstd_options,
+                profile=self.compression_profile
+            )
+            stage['bytes'] = compression_results['original_size']
+            stage['children_peak_rss_mb'] = peak_rss_mb(children=True)
+            
+        self.log_payload_savings(compression_results)
+        
+        # Encodings run in parallel worker processes, so each gets its own
+        # worker time (and trace track), counted from the stage start
+        for encoding in ('brotli', 'zip', 'zstd'):
+            if f'{encoding}_seconds' in compression_results:
+                self.profiler.add(
+                    f'compress:{encoding}',
+                    compression_results[f'{encoding}_seconds'],
+                    start=compress_start,
+                    track=f'compress {encoding}',
+                    bytes=compression_results[f'{encoding}_size'],
+                    ratio=round(compression_results[f'{encoding}_size'] / compression_results['original_size'], 4)
+                )
+                
+        with self.profiler.stage('chunks'):
+            chunks = self.create_chunks()
+        with self.profiler.stage('packages'):
+            packages = self.create_table_group_packages()
+            
+        with self.profiler.stage('hash'):
+            content_hashes = calculate_content_hashes(str(self.db_path))
+        logger.info(f"Content hash: {content_hashes[0]}")
+        
+        # Delta patch from the previous build
+        try:
+            with self.profiler.stage('delta'):
+                deltas = self.create_deltas(previous, compression_results, content_hashes[0])
+        finally:
+            if previous:
+                Path(previous['path']).unlink(missing_ok=True)
+                
+        self.record_artifacts(compression_results, packages, deltas)
         
         # Generate manifest
         end_dt = datetime.utcnow()
@@ -262,47 +1075,234 @@ class ETLPipeline:
             'end_time': end_dt.isoformat() + 'Z',
             'duration_seconds': (end_dt - start_dt).total_seconds(),
             'api_version': 'v1',
-            'runner': 'github-actions'
+            'runner': 'github-actions',
+            'compression_profile': self.compression_profile,
+            'stages': self.profiler.stages
         }
         
+        # Only a clean build may serve as baseline for the pre-flight check
+        if not self.stats['errors']:
+            build_info['api_stand'] = self.db_manager.get_meta('apiStand')
+        
         manifest_path = generate_manifest(
             str(self.db_path),
             str(self.output_dir),
             compression_results,
             table_counts,
-            build_info
+            build_info,
+            deltas=deltas,
+            content_hashes=content_hashes,
+            chunks=chunks,
+            packages=packages
         )
         
         logger.info(f"Manifest generated: {manifest_path}")
         
-    def run(self):
+    def collect_metrics(self, exit_code: Optional[int] = None) -> List[MetricFamily]:
+        """
+        Collect the metrics of the run so far.
+        
+        Safe to call from the metrics thread while the run is in progress:
+        the stats are only read from copies.
+        
+        Args:
+            exit_code: Exit code of the finished run (None while running)
+            
+        Returns:
+            Metric families for the textfile
+        """
+        running = MetricFamily('bvl_sync_running', 'gauge', 'Whether a sync run is in progress')
+        running.add(int(exit_code is None))
+        
+        run_start = MetricFamily('bvl_sync_run_start_timestamp_seconds', 'gauge', 'Start time of the last sync run')
+        if self._run_started is not None:
+            run_start.add(self._run_started)
+            
+        exit_family = MetricFamily('bvl_sync_exit_code', 'gauge', 'Exit code of the last finished sync run')
+        last_success = MetricFamily(
+            'bvl_sync_last_success_timestamp_seconds', 'gauge',
+            'End time of the last sync run that succeeded or found the data unchanged'
+        )
+        if exit_code is not None:
+            exit_family.add(exit_code)
+            if exit_code in (0, EXIT_NO_CHANGE):
+                self._last_success = time.time()
+        if self._last_success is not None:
+            last_success.add(self._last_success)
+            
+        errors = MetricFamily('bvl_sync_errors', 'gauge', 'Errors recorded in the current or last sync run')
+        errors.add(len(self.stats['errors']))
+        
+        # Requests per endpoint
+        paths = {endpoint['path']: endpoint['name'] for endpoint in self.config['endpoints']}
+        latency = MetricFamily('bvl_sync_fetch_latency_seconds', 'histogram', 'Latency of API requests per endpoint')
+        responses = MetricFamily('bvl_sync_http_responses', 'counter', 'API responses per endpoint and HTTP status')
+        request_families = {
+            field: MetricFamily(f'bvl_sync_http_{name}', 'counter', help_text)
+            for field, name, help_text in (
+                ('requests', 'requests', 'API requests sent per endpoint'),
+                ('retries', 'retries', 'API requests retried per endpoint'),
+                ('errors', 'errors', 'Failed API requests per endpoint'),
+                ('cache_hits', 'cache_hits', 'API responses served from the response cache per endpoint'),
+                ('not_modified', 'not_modified', 'API responses revalidated with 304 Not Modified per endpoint'),
+                ('bytes', 'response_bytes', 'Bytes of API response bodies received per endpoint')
+            )
+        }
+        for path, recorded in self.request_stats.snapshot().items():
+            endpoint = paths.get(path, path)
+            for field, family in request_families.items():
+                family.add(recorded['counts'][field], endpoint=endpoint)
+            for status, count in sorted(recorded['statuses'].items(), key=lambda item: str(item[0])):
+                responses.add(count, endpoint=endpoint, status=status if status is not None else 'error')
+            if recorded['latency']:
+                latency.add_histogram(
+                    LATENCY_BUCKETS,
+                    recorded['latency']['counts'],
+                    recorded['latency']['sum'],
+                    endpoint=endpoint
+                )
+                
+        # Rows per endpoint
+        rows = {
+            change: MetricFamily(f'bvl_sync_rows_{change}', 'counter', f'Rows {change} per endpoint')
+            for change in ('inserted', 'updated', 'deleted')
+        }
+        for name, result in list(self.stats['endpoints'].items()):
+            rows['inserted'].add(result.get('inserted', result.get('count', 0)), endpoint=name)
+            for change in ('updated', 'deleted'):
+                if change in result:
+                    rows[change].add(result[change], endpoint=name)
+                    
+        stage_duration = MetricFamily('bvl_sync_stage_duration_seconds', 'gauge', 'Duration of each build stage')
+        for stage, seconds in {record['stage']: record['duration_seconds'] for record in list(self.profiler.stages)}.items():
+            stage_duration.add(seconds, stage=stage)
+            
+        artifact_size = MetricFamily('bvl_sync_artifact_size_bytes', 'gauge', 'Size of each published artifact')
+        compression_ratio = MetricFamily(
+            'bvl_sync_compression_ratio', 'gauge', 'Compressed size divided by database size per encoding'
+        )
+        artifacts = dict(self.artifacts)
+        for name, size in artifacts.items():
+            artifact_size.add(size, file=name)
+        database_size = artifacts.get(self.db_path.name)
+        if database_size:
+            for encoding, suffix in (('brotli', '.br'), ('zip', '.zip'), ('zstd', '.zst')):
+                size = artifacts.get(self.db_path.name + suffix)
+                if size is not None:
+                    compression_ratio.add(round(size / database_size, 4), encoding=encoding)
+                    
+        return [
+            running, run_start, exit_family, last_success, errors,
+            latency, responses, *request_families.values(),
+            *rows.values(), stage_duration, artifact_size, compression_ratio
+        ]
+        
+    def write_metrics(self, exit_code: Optional[int] = None):
+        """
+        Replace the metrics textfile with the metrics of the run so far.
+        
+        Args:
+            exit_code: Exit code of the finished run (None while running)
+        """
+        write_textfile(str(self.metrics_path), self.collect_metrics(exit_code))
+        
+    def run(self) -> int:
+        """
+        Run the complete ETL pipeline, writing the metrics textfile and the
+        trace if enabled.
+        
+        The textfile is updated every metrics_interval seconds during the run
+        and once more at the end. The trace is written at the end, also for
+        failed runs.
+        
+        Returns:
+            Exit code (0 success, 1 errors, EXIT_NO_CHANGE unchanged data)
+        """
+        self._run_started = time.time()
+        
+        writer = None
+        if self.metrics_path:
+            # A failed run keeps the previous success time
+            self._last_success = read_sample(str(self.metrics_path), 'bvl_sync_last_success_timestamp_seconds')
+            writer = PeriodicWriter(self.metrics_interval, self.write_metrics)
+            writer.start()
+            
+        exit_code = 1
+        try:
+            exit_code = self._run()
+            return exit_code
+        finally:
+            if writer:
+                writer.stop()
+                try:
+                    self.write_metrics(exit_code)
+                    logger.info(f"Metrics written to {self.metrics_path}")
+                except OSError as e:
+                    logger.error(f"Failed to write metrics to {self.metrics_path}: {e}")
+                    
+            if self.trace_path:
+                try:
+                    self.tracer.write(str(self.trace_path))
+                except OSError as e:
+                    logger.error(f"Failed to write trace to {self.trace_path}: {e}")
+                    
+    def _run(self) -> int:
         """Run the complete ETL pipeline."""
         logger.info("Starting ETL pipeline")
         start_dt = datetime.utcnow()
         self.stats['start_time'] = start_dt.isoformat() + 'Z'
         
         try:
+            # Skip the build when BVL has not published new data
+            if not self.skip_raw and not self.force_rebuild and self.is_data_unchanged():
+                logger.info("BVL data unchanged since previous build, nothing to do")
+                return EXIT_NO_CHANGE
+                
+            # A reproducible build starts from an empty file, so no earlier
+            # write history ends up in the database header
+            if self.reproducible and not self.incremental:
+                self.remove_database()
+                
             # Initialize database
-            self.init_database()
-            
+            with self.profiler.stage('init'):
+                self.init_database()
+                
             # Load static data first
-            self.load_static_data()
-            
+            with self.profiler.stage('static_load') as stage:
+                stage['rows'] = self.load_static_data()
+                
             # Fetch API data
             if not self.skip_raw:
-                self.fetch_all_endpoints()
+                with self.profiler.stage('fetch') as stage:
+                    self.fetch_all_endpoints()
+                    stage['rows'] = sum(
+                        result['count'] for name, result in self.stats['endpoints'].items()
+                        if not name.startswith('static_')
+                    )
+                    stage.update(self.request_stats.totals())
             else:
                 logger.info("Skipping raw data fetch (--skip-raw)")
                 
+            # Build indexes and views on the loaded tables
+            with self.profiler.stage('deferred_schema'):
+                self.db_manager.create_deferred_schema()
+            with self.profiler.stage('payload_views'):
+                self.create_payload_views()
+                
             # Enrich data
-            self.enrich_data()
-            
+            with self.profiler.stage('enrich'):
+                self.enrich_data()
+                
             # Validate
-            table_counts = self.validate_database()
-            
+            with self.profiler.stage('validate'):
+                table_counts = self.validate_database()
+                
             # Compress and manifest
             self.compress_and_manifest(table_counts)
             
+            for stage in self.profiler.summary():
+                logger.info(f"Slowest stage {stage['stage']}: {stage['duration_seconds']}s")
+                
             end_dt = datetime.utcnow()
             self.stats['end_time'] = end_dt.isoformat() + 'Z'
             
@@ -324,6 +1324,8 @@ class ETLPipeline:
         finally:
             self.db_manager.disconnect()
             self.http_client.close()
+            if self.http_cache:
+                self.http_cache.close()
             
 
 def main():
@@ -356,6 +1358,131 @@ def main():
         action='store_true',
         help='Skip fetching raw data from API'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of endpoints fetched concurrently (default: 1 = serial)'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f'Pages buffered between the fetch, map and write stages (default: {DEFAULT_QUEUE_SIZE})'
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=1,
+        help='Number of page requests kept in flight per endpoint (default: 1)'
+    )
+    parser.add_argument(
+        '--http-client',
+        choices=['requests', 'httpx'],
+        default='requests',
+        help='HTTP backend: requests (threads) or httpx (asyncio, shared connection pool)'
+    )
+    parser.add_argument(
+        '--http2',
+        action='store_true',
+        help='Enable HTTP/2 multiplexing (httpx backend only)'
+    )
+    parser.add_argument(
+        '--bulk-load',
+        action='store_true',
+        help='Use write-optimized PRAGMAs and create indexes/views after loading'
+    )
+    parser.add_argument(
+        '--force-rebuild',
+        action='store_true',
+        default=os.environ.get('FORCE_REBUILD', '').lower() == 'true',
+        help='Rebuild even if the BVL stand date is unchanged (env: FORCE_REBUILD=true)'
+    )
+    parser.add_argument(
+        '--http-cache',
+        default=None,
+        help='Directory for a persistent HTTP response cache (ETag/Last-Modified revalidation)'
+    )
+    parser.add_argument(
+        '--http-cache-max-mb',
+        type=int,
+        default=512,
+        help='Size cap of the HTTP response cache in MB (default: 512)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Update an existing database in place (write changed rows, delete withdrawn rows)'
+    )
+    parser.add_argument(
+        '--reproducible',
+        action='store_true',
+        help='Byte-reproducible build: no timestamps in the database, rows in primary key order'
+    )
+    parser.add_argument(
+        '--chunk-size-mb',
+        type=int,
+        default=0,
+        help='Also publish the database as content-addressed Brotli chunks of this size in MB (default: 0 = off)'
+    )
+    parser.add_argument(
+        '--compression-profile',
+        choices=sorted(COMPRESSION_PROFILES),
+        default='default',
+        help='Encoder settings: dev (fast), default, release (smallest files)'
+    )
+    parser.add_argument(
+        '--table-groups',
+        action='store_true',
+        help='Also publish one database per table group (table_groups in the endpoints config)'
+    )
+    parser.add_argument(
+        '--slim-payload',
+        action='store_true',
+        help='Store only fields not promoted to columns in payload_json (views <table>_payload rebuild it)'
+    )
+    parser.add_argument(
+        '--zstd',
+        action='store_true',
+        help='Also publish a zstd-compressed database (.sqlite.zst)'
+    )
+    parser.add_argument(
+        '--zstd-level',
+        type=int,
+        default=None,
+        help='zstd compression level (default: from the compression profile)'
+    )
+    parser.add_argument(
+        '--zstd-long',
+        action='store_true',
+        default=None,
+        help='Enable zstd long-distance matching with a 128 MiB window (default: from the compression profile)'
+    )
+    parser.add_argument(
+        '--zstd-dict',
+        choices=['pages', 'tables'],
+        default=None,
+        help='Train a zstd dictionary on database pages, or on pages sampled per table'
+    )
+    parser.add_argument(
+        '--metrics-file',
+        default=None,
+        help='Write a Prometheus textfile (e.g. for the node-exporter textfile collector)'
+    )
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=DEFAULT_METRICS_INTERVAL,
+        help=f'Seconds between metrics textfile updates during the run (default: {DEFAULT_METRICS_INTERVAL})'
+    )
+    parser.add_argument(
+        '--trace',
+        nargs='?',
+        const='bvl-trace.json',
+        default=None,
+        metavar='FILE',
+        help='Write a Chrome/Perfetto trace of HTTP requests, mapping, inserts, SQL and stages (default file: bvl-trace.json)'
+    )
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -373,7 +1500,30 @@ def main():
         args.enrichments_config,
         args.schema,
         args.output_dir,
-        args.skip_raw
+        args.skip_raw,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        http_backend=args.http_client,
+        http2=args.http2,
+        bulk_load=args.bulk_load,
+        force_rebuild=args.force_rebuild,
+        http_cache_dir=args.http_cache,
+        http_cache_max_mb=args.http_cache_max_mb,
+        incremental=args.incremental,
+        reproducible=args.reproducible,
+        chunk_size_mb=args.chunk_size_mb,
+        zstd_options={
+            'level': args.zstd_level,
+            'long_distance': args.zstd_long,
+            'dictionary': args.zstd_dict
+        } if args.zstd else None,
+        compression_profile=args.compression_profile,
+        table_groups=args.table_groups,
+        slim_payload=args.slim_payload,
+        queue_size=args.queue_size,
+        metrics_file=args.metrics_file,
+        metrics_interval=args.metrics_interval,
+        trace_file=args.trace
     )
     
     return pipeline.run()
@@ -0,0 +1,428 @@
+"""
+Async HTTP Client for BVL API
+asyncio counterpart of HTTPClient built on httpx. All requests share one
+connection pool with keep-alive and, if enabled, HTTP/2 multiplexing.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+from .http_cache import ResponseCache
+from .http_client import RequestStats
+from .json_codec import loads
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncHTTPClient:
+    """Async HTTP client for fetching data from BVL API with pagination support."""
+    
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 30,
+        max_retries: int = 3,
+        retry_delay: int = 2,
+        max_in_flight: int = 1,
+        http2: bool = False,
+        max_connections: int = 20,
+        cache: Optional[ResponseCache] = None,
+        transport: Optional[Any] = None,
+        request_stats: Optional[RequestStats] = None
+    ):
+        """
+        Initialize async HTTP client.
+        
+        Args:
+            base_url: Base URL for API (should end with /)
+            timeout: Request timeout in seconds
+            max_retries: Maximum number of retry attempts
+            retry_delay: Delay between retries in seconds
+            max_in_flight: Default number of page requests kept in flight
+                by fetch_paginated (1 = strictly sequential)
+            http2: Negotiate HTTP/2 (requires the h2 package and HTTPS)
+            max_connections: Size of the shared connection pool
+            cache: Optional persistent response cache
+            transport: Optional httpx transport (used by tests)
+            request_stats: Counters to record requests in (default: new)
+        """
+        if httpx is None:
+            raise ImportError("AsyncHTTPClient requires httpx: pip install 'httpx[http2]'")
+            
+        self.base_url = base_url.rstrip('/') + '/'
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_in_flight = max(1, max_in_flight)
+        self.cache = cache
+        self.request_stats = request_stats or RequestStats()
+        self.client = httpx.AsyncClient(
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            transport=transport
+        )
+        
+    def _build_url(self, path: str) -> str:
+        """
+        Build full URL from base URL and path.
+        
+        Args:
+            path: Relative path (without leading slash)
+            
+        Returns:
+            Full URL
+        """
+        return self.base_url + path.lstrip('/')
+        
+    async def get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        retry_count: int = 0,
+        revalidate: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send GET request to API endpoint.
+        
+        Args:
+            path: Endpoint path (relative, without leading slash)
+            params: Query parameters
+            retry_count: Current retry attempt number
+            revalidate: Ask the server even if the cached response is still
+                fresh (conditional request, so an unchanged response costs
+                a 304)
+                
+        Returns:
+            JSON response as dictionary, or None on error
+        """
+        url = self._build_url(path)
+        
+        # Serve from or revalidate against the response cache
+        cache_key = None
+        cached = None
+        headers = None
+        if self.cache:
+            cache_key = self.cache.make_key(url, params)
+            cached = self.cache.lookup(cache_key)
+            if cached and cached.is_fresh() and not revalidate:
+                logger.debug(f"Cache hit for {cache_key}")
+                self.request_stats.add(path, cache_hits=1)
+                return loads(cached.body)
+            if cached:
+                headers = cached.conditional_headers()
+                
+        try:
+            logger.debug(f"GET {url} with params: {params}")
+            self.request_stats.add(path, requests=1)
+            response = None
+            start = time.perf_counter()
+            try:
+                response = await self.client.get(url, params=params, headers=headers)
+            finally:
+                self.request_stats.observe(
+                    path,
+                    time.perf_counter() - start,
+                    response.status_code if response is not None else None
+                )
+            self.request_stats.add(path, bytes=len(response.content))
+            
+            # Handle HTTP 304 Not Modified
+            if response.status_code == 304:
+                if not cached:
+                    raise httpx.HTTPStatusError(
+                        f"304 Not Modified without a cached response for {url}",
+                        request=response.request,
+                        response=response
+                    )
+                logger.debug(f"Not modified: {cache_key}")
+                self.request_stats.add(path, not_modified=1)
+                return loads(self.cache.revalidated(cached, response.headers))
+                
+            # Handle HTTP 204 No Content
+            if response.status_code == 204:
+                logger.warning(f"No content returned from {url}")
+                return {"items": []}
+                
+            response.raise_for_status()
+            
+            # Try to parse JSON
+            try:
+                data = loads(response.content)
+                if self.cache:
+                    self.cache.store(cache_key, response.headers, response.content)
+                return data
+            except ValueError as e:
+                logger.error(f"Failed to parse JSON from {url}: {e}")
+                return None
+                
+        except httpx.HTTPError as e:
+            logger.error(f"Request failed for {url}: {e}")
+            self.request_stats.add(path, errors=1)
+            
+            # Retry logic
+            if retry_count < self.max_retries:
+                wait_time = self.retry_delay * (2 ** retry_count)  # Exponential backoff
+                logger.info(f"Retrying in {wait_time} seconds... (attempt {retry_count + 1}/{self.max_retries})")
+                self.request_stats.add(path, retries=1)
+                await asyncio.sleep(wait_time)
+                return await self.get(path, params, retry_count + 1, revalidate)
+            else:
+                logger.error(f"Max retries exceeded for {url}")
+                return None
+                
+    async def iter_pages(
+        self,
+        path: str,
+        page_size: int = 1000,
+        max_pages: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        strict: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield the records of a paginated endpoint page by page.
+        
+        Up to max_in_flight offsets are requested ahead of the page being
+        consumed. Pages are yielded in offset order; once a short or empty
+        page is seen no new offsets are issued.
+        
+        Args:
+            path: Endpoint path (relative, without leading slash)
+            page_size: Number of records per page
+            max_pages: Maximum number of pages to fetch (None for all)
+            max_in_flight: Number of page requests kept in flight
+                (None uses the client default)
+            strict: Raise RuntimeError when a page cannot be fetched instead
+                of treating it as the end of the data
+                
+        Yields:
+            List of records of each non-empty page, in offset order
+        """
+        if max_in_flight is None:
+            max_in_flight = self.max_in_flight
+        max_in_flight = max(1, max_in_flight)
+        
+        total = 0
+        pending = deque()
+        next_page = 0
+        
+        try:
+            while True:
+                # Top up the window
+                while len(pending) < max_in_flight and not (max_pages and next_page >= max_pages):
+                    offset = next_page * page_size
+                    params = {
+                        'limit': page_size,
+                        'offset': offset
+                    }
+                    logger.info(f"Fetching page {next_page + 1} from {path} (offset={offset}, limit={page_size})")
+                    task = asyncio.ensure_future(self.get(path, params))
+                    pending.append((next_page, offset, task))
+                    next_page += 1
+                    
+                if not pending:
+                    logger.info(f"Reached max pages limit ({max_pages})")
+                    break
+                    
+                page_num, offset, task = pending.popleft()
+                data = await task
+                
+                if not data:
+                    if strict:
+                        raise RuntimeError(f"Failed to fetch page {page_num + 1} of {path}")
+                    logger.warning(f"No data returned for page {page_num + 1}")
+                    break
+                    
+                items = data.get('items', [])
+                
+                if not items:
+                    logger.info(f"No more items found at offset {offset}")
+                    break
+                    
+                total += len(items)
+                logger.info(f"Fetched {len(items)} records (total: {total})")
+                yield items
+                
+                if len(items) < page_size:
+                    logger.info(f"Received fewer records than page size, assuming end of data")
+                    break
+        finally:
+            # Drop prefetched offsets beyond the end of the data, also when
+            # the consumer stops early
+            for _, _, task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*(task for _, _, task in pending), return_exceptions=True)
+                
+        logger.info(f"Completed fetching {path}: {total} total records")
+        
+    async def fetch_paginated(
+        self,
+        path: str,
+        page_size: int = 1000,
+        max_pages: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        strict: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch all records from paginated endpoint.
+        
+        Args:
+            path: Endpoint path (relative, without leading slash)
+            page_size: Number of records per page
+            max_pages: Maximum number of pages to fetch (None for all)
+            max_in_flight: Number of page requests kept in flight
+                (None uses the client default)
+            strict: Raise RuntimeError when a page cannot be fetched instead
+                of treating it as the end of the data
+                
+        Returns:
+            List of all records from all pages
+        """
+        all_records = []
+        async for items in self.iter_pages(path, page_size, max_pages, max_in_flight, strict):
+            all_records.extend(items)
+        return all_records
+        
+    async def aclose(self):
+        """Close the connection pool."""
+        await self.client.aclose()
+        
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+        
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.aclose()
+
+
+class ThreadedAsyncHTTPClient:
+    """
+    Blocking facade of AsyncHTTPClient for threaded callers.
+    
+    The async client and its connection pool live on an event loop in a
+    background thread. get(), iter_pages() and fetch_paginated() can be
+    called from any thread (e.g. the fetcher threads of the staged runner);
+    their requests all run on that one loop and share the pool. iter_pages()
+    fetches a page only when the caller asks for it, so a blocked caller
+    also stops the downloads.
+    """
+    
+    def __init__(self, base_url: str, **kwargs: Any):
+        """
+        Initialize client and start the event loop thread.
+        
+        Args:
+            base_url: Base URL for API (should end with /)
+            **kwargs: Options of AsyncHTTPClient
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='bvl-httpx', daemon=True)
+        self._thread.start()
+        try:
+            self.client = self._call(self._create(base_url, kwargs))
+        except Exception:
+            self._stop_loop()
+            raise
+        self.request_stats = self.client.request_stats
+        
+    @staticmethod
+    async def _create(base_url: str, kwargs: Dict[str, Any]) -> AsyncHTTPClient:
+        """Create the async client on the event loop."""
+        return AsyncHTTPClient(base_url, **kwargs)
+        
+    def _call(self, coroutine) -> Any:
+        """Run a coroutine on the event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+        
+    def get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        revalidate: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send GET request to API endpoint.
+        
+        Args:
+            path: Endpoint path (relative, without leading slash)
+            params: Query parameters
+            revalidate: Ask the server even if the cached response is fresh
+            
+        Returns:
+            JSON response as dictionary, or None on error
+        """
+        return self._call(self.client.get(path, params, revalidate=revalidate))
+        
+    def iter_pages(
+        self,
+        path: str,
+        page_size: int = 1000,
+        max_pages: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        strict: bool = False
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the records of a paginated endpoint page by page.
+        
+        See AsyncHTTPClient.iter_pages().
+        
+        Yields:
+            List of records of each non-empty page, in offset order
+        """
+        pages = self.client.iter_pages(path, page_size, max_pages, max_in_flight, strict)
+        
+        try:
+            while True:
+                try:
+                    yield self._call(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Cancels prefetched pages, also when the consumer stops early
+            if self._loop.is_running():
+                self._call(pages.aclose())
+                
+    def fetch_paginated(
+        self,
+        path: str,
+        page_size: int = 1000,
+        max_pages: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        strict: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch all records from paginated endpoint.
+        
+        See AsyncHTTPClient.fetch_paginated().
+        
+        Returns:
+            List of all records from all pages
+        """
+        return self._call(self.client.fetch_paginated(path, page_size, max_pages, max_in_flight, strict))
+        
+    def close(self):
+        """Close the connection pool and stop the event loop thread."""
+        if not self._loop.is_running():
+            return
+        self._call(self.client.aclose())
+        self._stop_loop()
+        
+    def _stop_loop(self):
+        """Stop the event loop thread and close the loop."""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
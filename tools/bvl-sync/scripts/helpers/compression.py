@@ -4,88 +4,461 @@ Compression utilities for database files.
 
 import brotli
 import gzip
+import hashlib
+import os
+import shutil
+import sys
+import time
+import sqlite3
 import zipfile
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
 
-def compress_brotli(input_file: str, output_file: str = None, quality: int = 11) -> str:
+# Read size for streaming compression and hashing
+CHUNK_SIZE = 1024 * 1024
+
+# Size of content-addressed database chunks (a multiple of the SQLite page size)
+DEFAULT_DB_CHUNK_SIZE = 2 * 1024 * 1024
+
+# Subdirectory of the output directory holding the chunk files
+CHUNK_DIR = 'chunks'
+
+# Window size used for zstd long-distance matching (128 MiB, the largest
+# window decoders accept without extra configuration)
+ZSTD_LONG_WINDOW_LOG = 27
+
+# Default zstd dictionary size (the zstd CLI default)
+ZSTD_DICT_SIZE = 112640
+
+# Maximum number of pages used as dictionary training samples
+ZSTD_DICT_MAX_SAMPLES = 20000
+
+# Named encoder settings: 'dev' for fast local iteration, 'default' as
+# before, 'release' for the smallest downloads
+COMPRESSION_PROFILES = {
+    'dev': {
+        'brotli': {'quality': 5, 'lgwin': 22},
+        'zip': {'compresslevel': 1},
+        'zstd': {'level': 3, 'long_distance': False}
+    },
+    'default': {
+        'brotli': {'quality': 11, 'lgwin': 22},
+        'zip': {'compresslevel': 9},
+        'zstd': {'level': 19, 'long_distance': False}
+    },
+    'release': {
+        'brotli': {'quality': 11, 'lgwin': 24},
+        'zip': {'compresslevel': 9},
+        'zstd': {'level': 22, 'long_distance': True}
+    }
+}
+
+# Brotli modes by name
+BROTLI_MODES = {
+    'generic': brotli.MODE_GENERIC,
+    'text': brotli.MODE_TEXT,
+    'font': brotli.MODE_FONT
+}
+
+
+class _HashingWriter:
+    """File wrapper that counts and hashes everything written to it."""
+    
+    def __init__(self, f_out):
+        self.f_out = f_out
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        
+    def write(self, data: bytes):
+        self.f_out.write(data)
+        self.size += len(data)
+        self.sha256.update(data)
+
+
+def hash_file(file_path: str) -> Tuple[int, str]:
+    """
+    Calculate size and SHA256 hash of a file in fixed-size chunks.
+    
+    Args:
+        file_path: Path to file
+        
+    Returns:
+        Tuple of (size in bytes, hex digest)
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+            size += len(chunk)
+            
+    return size, sha256.hexdigest()
+
+
+def compress_brotli(
+    input_file: str,
+    output_file: str = None,
+    quality: int = 11,
+    lgwin: int = 22,
+    mode: str = 'generic'
+) -> Dict[str, Any]:
     """
     Compress file using Brotli.
     
+    The input is streamed through the compressor in CHUNK_SIZE blocks, so
+    memory use does not grow with the file. Sizes and SHA256 hashes of
+    input and output are computed in the same pass. The output is identical
+    to a one-shot brotli.compress().
+    
     Args:
         input_file: Path to input file
         output_file: Path to output file (default: input_file + .br)
         quality: Brotli compression quality (0-11, default 11)
+        lgwin: Base 2 logarithm of the window size (10-24, default 22)
+        mode: Input type hint: 'generic', 'text' or 'font'
         
     Returns:
-        Path to compressed file
+        Dictionary with path, size, sha256, input_size and input_sha256
     """
     if output_file is None:
         output_file = input_file + '.br'
         
-    logger.info(f"Compressing {input_file} to {output_file} with Brotli (quality={quality})")
+    logger.info(f"Compressing {input_file} to {output_file} with Brotli (quality={quality}, lgwin={lgwin}, mode={mode})")
     
-    with open(input_file, 'rb') as f_in:
-        data = f_in.read()
+    compressor = brotli.Compressor(mode=BROTLI_MODES[mode], quality=quality, lgwin=lgwin)
+    input_hash = hashlib.sha256()
+    input_size = 0
+    
+    with open(input_file, 'rb') as f_in, open(output_file, 'wb') as f_out:
+        writer = _HashingWriter(f_out)
         
-    compressed = brotli.compress(data, quality=quality)
+        for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+            input_hash.update(chunk)
+            input_size += len(chunk)
+            writer.write(compressor.process(chunk))
+            
+        writer.write(compressor.finish())
+        
+    ratio = (1 - writer.size / input_size) * 100 if input_size else 0.0
+    
+    logger.info(f"Brotli compression: {input_size:,} -> {writer.size:,} bytes ({ratio:.1f}% reduction)")
     
-    with open(output_file, 'wb') as f_out:
-        f_out.write(compressed)
+    return {
+        'path': output_file,
+        'size': writer.size,
+        'sha256': writer.sha256.hexdigest(),
+        'input_size': input_size,
+        'input_sha256': input_hash.hexdigest()
+    }
+
+
+def brotli_size(chunks: Iterable[bytes], quality: int = 11, lgwin: int = 22) -> int:
+    """
+    Get the Brotli-compressed size of a byte stream without storing it.
+    
+    Args:
+        chunks: Iterable of input blocks
+        quality: Brotli compression quality (0-11, default 11)
+        lgwin: Base 2 logarithm of the window size (10-24, default 22)
         
-    original_size = len(data)
-    compressed_size = len(compressed)
-    ratio = (1 - compressed_size / original_size) * 100
+    Returns:
+        Compressed size in bytes
+    """
+    compressor = brotli.Compressor(quality=quality, lgwin=lgwin)
+    size = 0
+    for chunk in chunks:
+        size += len(compressor.process(chunk))
+    return size + len(compressor.finish())
+
+
+def _zip_entry(name: str, date_time: tuple, compresslevel: int) -> zipfile.ZipInfo:
+    """
+    Create a Deflate archive entry with a fixed timestamp and mode 0644.
     
-    logger.info(f"Brotli compression: {original_size:,} -> {compressed_size:,} bytes ({ratio:.1f}% reduction)")
+    ZipFile.open() compresses an entry given as ZipInfo at the level stored
+    in it, not at the archive's compresslevel. Python 3.13 made that field
+    public as compress_level; older versions only have the private
+    _compresslevel, which ZipFile.write() sets the same way.
     
-    return output_file
+    Args:
+        name: Entry name
+        date_time: Modification time (year, month, day, hour, minute, second)
+        compresslevel: Deflate level (0-9)
+        
+    Returns:
+        Archive entry
+    """
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    info.external_attr = 0o644 << 16
+    info.compress_type = zipfile.ZIP_DEFLATED
+    if sys.version_info >= (3, 13):
+        info.compress_level = compresslevel
+    else:
+        info._compresslevel = compresslevel
+    return info
 
 
-def compress_zip(input_file: str, output_file: str = None) -> str:
+def compress_zip(
+    input_file: str,
+    output_file: str = None,
+    date_time: tuple = None,
+    compresslevel: int = 9
+) -> Dict[str, Any]:
     """
     Compress file using ZIP.
     
+    zipfile streams the input in small blocks. It seeks back to patch the
+    local header after the data is written, so the output hash is computed
+    by reading the (much smaller) archive back.
+    
     Args:
         input_file: Path to input file
         output_file: Path to output file (default: input_file + .zip)
+        date_time: Fixed modification time (year, month, day, hour, minute,
+            second) for the archive entry instead of the file's mtime
+        compresslevel: Deflate level (0-9, default 9)
         
     Returns:
-        Path to compressed file
+        Dictionary with path, size and sha256
     """
     if output_file is None:
         output_file = input_file + '.zip'
         
-    logger.info(f"Compressing {input_file} to {output_file} with ZIP")
+    logger.info(f"Compressing {input_file} to {output_file} with ZIP (level={compresslevel})")
     
     input_path = Path(input_file)
-    
-    with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
-        zf.write(input_file, input_path.name)
-        
     original_size = input_path.stat().st_size
-    compressed_size = Path(output_file).stat().st_size
-    ratio = (1 - compressed_size / original_size) * 100
+    
+    with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        if date_time is None:
+            zf.write(input_file, input_path.name)
+        else:
+            # Fixed timestamp and permissions instead of the file's metadata
+            info = _zip_entry(input_path.name, date_time, compresslevel)
+            info.file_size = original_size
+            with open(input_file, 'rb') as f_in, zf.open(info, 'w') as f_out:
+                shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+                
+    compressed_size, sha256 = hash_file(output_file)
+    ratio = (1 - compressed_size / original_size) * 100 if original_size else 0.0
     
     logger.info(f"ZIP compression: {original_size:,} -> {compressed_size:,} bytes ({ratio:.1f}% reduction)")
     
-    return output_file
+    return {
+        'path': output_file,
+        'size': compressed_size,
+        'sha256': sha256
+    }
 
 
-def compress_database(db_path: str, output_dir: str = None) -> dict:
+def compress_zstd(
+    input_file: str,
+    output_file: str = None,
+    level: int = 19,
+    long_distance: bool = False,
+    dictionary: Optional[bytes] = None
+) -> Dict[str, Any]:
     """
-    Compress database with both Brotli and ZIP.
+    Compress file using Zstandard.
+    
+    The input is streamed through the compressor; the frame records the
+    content size and a checksum. Sizes and SHA256 hashes of the output are
+    computed in the same pass.
+    
+    Args:
+        input_file: Path to input file
+        output_file: Path to output file (default: input_file + .zst)
+        level: Compression level (1-22, default 19)
+        long_distance: Enable long-distance matching with a 128 MiB window
+        dictionary: Optional trained dictionary (see train_zstd_dictionary)
+        
+    Returns:
+        Dictionary with path, size and sha256
+    """
+    if zstandard is None:
+        raise ImportError("zstd compression requires zstandard: pip install zstandard")
+        
+    if output_file is None:
+        output_file = input_file + '.zst'
+        
+    logger.info(
+        f"Compressing {input_file} to {output_file} with zstd "
+        f"(level={level}, long={long_distance}, dictionary={dictionary is not None})"
+    )
+    
+    input_size = Path(input_file).stat().st_size
+    options = {'enable_ldm': True, 'window_log': ZSTD_LONG_WINDOW_LOG} if long_distance else {}
+    params = zstandard.ZstdCompressionParameters.from_level(
+        level,
+        source_size=input_size,
+        write_content_size=True,
+        write_checksum=True,
+        **options
+    )
+    compressor = zstandard.ZstdCompressor(
+        compression_params=params,
+        dict_data=zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+    )
+    
+    with open(input_file, 'rb') as f_in, open(output_file, 'wb') as f_out:
+        writer = _HashingWriter(f_out)
+        compressor.copy_stream(f_in, writer, size=input_size, read_size=CHUNK_SIZE)
+        
+    ratio = (1 - writer.size / input_size) * 100 if input_size else 0.0
+    
+    logger.info(f"zstd compression: {input_size:,} -> {writer.size:,} bytes ({ratio:.1f}% reduction)")
+    
+    return {
+        'path': output_file,
+        'size': writer.size,
+        'sha256': writer.sha256.hexdigest()
+    }
+
+
+def train_zstd_dictionary(
+    db_path: str,
+    source: str = 'pages',
+    dict_size: int = ZSTD_DICT_SIZE,
+    level: int = 19
+) -> bytes:
+    """
+    Train a zstd dictionary on the pages of a SQLite database.
+    
+    With source 'pages', samples are spread evenly over the whole file.
+    With source 'tables', the same number of pages is sampled from every
+    table and index (via the dbstat virtual table), so small tables are
+    represented as well as the large ones. Sample selection is
+    deterministic, so identical databases give identical dictionaries.
+    
+    Args:
+        db_path: Path to SQLite database
+        source: 'pages' or 'tables'
+        dict_size: Maximum dictionary size in bytes
+        level: Compression level the dictionary is tuned for
+        
+    Returns:
+        Dictionary content
+    """
+    if zstandard is None:
+        raise ImportError("zstd dictionaries require zstandard: pip install zstandard")
+        
+    if source not in ('pages', 'tables'):
+        raise ValueError(f"Unknown dictionary source: {source}")
+        
+    page_size, page_count = _page_layout(db_path)
+    
+    if source == 'tables':
+        pages = _table_sample_pages(db_path, ZSTD_DICT_MAX_SAMPLES)
+    else:
+        step = max(1, page_count // ZSTD_DICT_MAX_SAMPLES)
+        pages = list(range(1, page_count + 1, step))
+        
+    samples = []
+    with open(db_path, 'rb') as f_in:
+        for page in pages:
+            f_in.seek((page - 1) * page_size)
+            samples.append(f_in.read(page_size))
+            
+    logger.info(f"Training zstd dictionary on {len(samples)} pages ({source})")
+    
+    dictionary = zstandard.train_dictionary(dict_size, samples, level=level, threads=1)
+    return dictionary.as_bytes()
+
+
+def _page_layout(db_path: str) -> Tuple[int, int]:
+    """
+    Read page size and page count of a SQLite database.
+    
+    Args:
+        db_path: Path to SQLite database
+        
+    Returns:
+        Tuple of (page size, page count)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        conn.close()
+    return page_size, page_count
+
+
+def _table_sample_pages(db_path: str, max_samples: int) -> List[int]:
+    """
+    Pick an equal share of sample pages from every table and index.
+    
+    Args:
+        db_path: Path to SQLite database
+        max_samples: Maximum total number of pages
+        
+    Returns:
+        Page numbers in ascending order
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        by_table: Dict[str, List[int]] = {}
+        for name, pageno in conn.execute("SELECT name, pageno FROM dbstat ORDER BY name, pageno"):
+            by_table.setdefault(name, []).append(pageno)
+    finally:
+        conn.close()
+        
+    per_table = max(1, max_samples // max(1, len(by_table)))
+    pages = []
+    for table_pages in by_table.values():
+        step = max(1, len(table_pages) // per_table)
+        pages.extend(table_pages[::step][:per_table])
+        
+    return sorted(pages)
+
+
+def compress_database(
+    db_path: str,
+    output_dir: str = None,
+    zip_date_time: tuple = None,
+    processes: Optional[int] = None,
+    zstd_options: Optional[Dict[str, Any]] = None,
+    profile: str = 'default'
+) -> dict:
+    """
+    Compress database with Brotli and ZIP, and optionally zstd.
+    
+    Each encoding runs in its own worker process and hashes its output on
+    the fly, so the stage takes about as long as the slowest encoder. A
+    zstd dictionary is trained before the workers start and written next
+    to the database as <name>.zst-dict.
     
     Args:
         db_path: Path to database file
         output_dir: Output directory (default: same as db_path)
+        zip_date_time: Fixed modification time for the ZIP entry
+            (for reproducible archives)
+        processes: Number of worker processes (default: one per encoding,
+            1 = compress serially in this process)
+        zstd_options: Enable zstd with these settings: level,
+            long_distance and dictionary (None, 'pages' or 'tables');
+            settings left out or None come from the profile
+        profile: Name of the encoder settings in COMPRESSION_PROFILES
         
     Returns:
-        Dictionary with compression results
+        Dictionary with compression results (paths, sizes and sha256 of
+        the original and each encoding, and of the zstd dictionary)
     """
+    if profile not in COMPRESSION_PROFILES:
+        raise ValueError(f"Unknown compression profile: {profile}")
+        
+    settings = COMPRESSION_PROFILES[profile]
     db_path_obj = Path(db_path)
     
     if output_dir is None:
@@ -96,20 +469,209 @@ def compress_database(db_path: str, output_dir: str = None) -> dict:
         'original_size': db_path_obj.stat().st_size
     }
     
-    # Brotli compression
-    try:
-        brotli_file = compress_brotli(db_path, f"{output_dir}/{db_path_obj.name}.br")
-        results['brotli'] = brotli_file
-        results['brotli_size'] = Path(brotli_file).stat().st_size
-    except Exception as e:
-        logger.error(f"Brotli compression failed: {e}")
+    jobs = {
+        'brotli': (compress_brotli, (
+            db_path,
+            f"{output_dir}/{db_path_obj.name}.br",
+            settings['brotli']['quality'],
+            settings['brotli']['lgwin']
+        )),
+        'zip': (compress_zip, (
+            db_path,
+            f"{output_dir}/{db_path_obj.name}.zip",
+            zip_date_time,
+            settings['zip']['compresslevel']
+        ))
+    }
+    
+    if zstd_options is not None:
+        zstd_options = dict(
+            settings['zstd'],
+            **{key: value for key, value in zstd_options.items() if value is not None}
+        )
+        dictionary = None
+        dict_path = Path(f"{output_dir}/{db_path_obj.name}.zst-dict")
+        dict_path.unlink(missing_ok=True)
         
-    # ZIP compression
-    try:
-        zip_file = compress_zip(db_path, f"{output_dir}/{db_path_obj.name}.zip")
-        results['zip'] = zip_file
-        results['zip_size'] = Path(zip_file).stat().st_size
-    except Exception as e:
-        logger.error(f"ZIP compression failed: {e}")
+        if zstd_options.get('dictionary'):
+            try:
+                dictionary = train_zstd_dictionary(
+                    db_path,
+                    zstd_options['dictionary'],
+                    level=zstd_options['level']
+                )
+            except Exception as e:
+                logger.error(f"zstd dictionary training failed, compressing without: {e}")
+                
+        if dictionary:
+            dict_path.write_bytes(dictionary)
+            results['zstd_dict'] = str(dict_path)
+            results['zstd_dict_size'] = len(dictionary)
+            results['zstd_dict_sha256'] = hashlib.sha256(dictionary).hexdigest()
+            
+        if zstd_options.get('long_distance'):
+            results['zstd_window_log'] = ZSTD_LONG_WINDOW_LOG
+            
+        jobs['zstd'] = (compress_zstd, (
+            db_path,
+            f"{output_dir}/{db_path_obj.name}.zst",
+            zstd_options['level'],
+            zstd_options['long_distance'],
+            dictionary
+        ))
         
+    if processes == 1:
+        outcomes = {encoding: _run_job(func, args) for encoding, (func, args) in jobs.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=processes or len(jobs)) as executor:
+            futures = {
+                encoding: executor.submit(_run_job, func, args)
+                for encoding, (func, args) in jobs.items()
+            }
+            outcomes = {encoding: future.result() for encoding, future in futures.items()}
+            
+    for encoding, (result, error) in outcomes.items():
+        if error:
+            logger.error(f"{encoding} compression failed: {error}")
+            continue
+            
+        results[encoding] = result['path']
+        results[f'{encoding}_size'] = result['size']
+        results[f'{encoding}_sha256'] = result['sha256']
+        results[f'{encoding}_seconds'] = round(result['seconds'], 3)
+        if 'input_sha256' in result:
+            results['original_sha256'] = result['input_sha256']
+            
     return results
+
+
+def compress_chunks(
+    input_file: str,
+    chunk_dir: str,
+    chunk_size: int = DEFAULT_DB_CHUNK_SIZE,
+    quality: int = 11,
+    lgwin: int = 22,
+    processes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Split file into fixed-size chunks and compress each chunk with Brotli.
+    
+    Chunks are named by the SHA256 of their uncompressed content and the
+    encoder settings (<sha256>-q<quality>w<lgwin>.br). Chunks already
+    present in chunk_dir (e.g. from the previous build) are reused without
+    compressing them again, but only if they were made with the same
+    settings. Missing chunks are compressed in parallel worker processes.
+    
+    Args:
+        input_file: Path to input file
+        chunk_dir: Directory for the chunk files
+        chunk_size: Uncompressed chunk size in bytes
+        quality: Brotli compression quality (0-11, default 11)
+        lgwin: Base 2 logarithm of the window size (10-24, default 22)
+        processes: Number of worker processes (None = CPU count,
+            1 = compress serially in this process)
+            
+    Returns:
+        Dictionary with chunk_size, size and sha256 of the whole file, the
+        number of reused chunks and the chunk list in file order
+    """
+    chunk_path = Path(chunk_dir)
+    chunk_path.mkdir(parents=True, exist_ok=True)
+    
+    chunks = []
+    file_hash = hashlib.sha256()
+    offset = 0
+    
+    with open(input_file, 'rb') as f_in:
+        for data in iter(lambda: f_in.read(chunk_size), b''):
+            file_hash.update(data)
+            sha256 = hashlib.sha256(data).hexdigest()
+            chunks.append({
+                'name': f"{sha256}-q{quality}w{lgwin}.br",
+                'offset': offset,
+                'size': len(data),
+                'sha256': sha256
+            })
+            offset += len(data)
+            
+    # Identical chunks share one file
+    missing = {}
+    for chunk in chunks:
+        if not (chunk_path / chunk['name']).exists():
+            missing.setdefault(chunk['name'], chunk)
+            
+    jobs = [
+        (input_file, chunk['offset'], chunk['size'], str(chunk_path / name), quality, lgwin)
+        for name, chunk in missing.items()
+    ]
+    
+    if processes == 1 or len(jobs) <= 1:
+        for job in jobs:
+            _compress_chunk(*job)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            list(executor.map(_compress_chunk, *zip(*jobs)))
+            
+    for chunk in chunks:
+        chunk['compressed_size'] = (chunk_path / chunk['name']).stat().st_size
+        
+    reused = len({chunk['name'] for chunk in chunks}) - len(missing)
+    compressed_size = sum(chunk['compressed_size'] for chunk in chunks)
+    
+    logger.info(
+        f"Chunked Brotli: {offset:,} -> {compressed_size:,} bytes in {len(chunks)} chunks "
+        f"({reused} reused, {len(missing)} compressed)"
+    )
+    
+    return {
+        'chunk_size': chunk_size,
+        'size': offset,
+        'sha256': file_hash.hexdigest(),
+        'reused': reused,
+        'chunks': chunks
+    }
+
+
+def _compress_chunk(input_file: str, offset: int, size: int, output_file: str, quality: int, lgwin: int):
+    """
+    Compress one byte range of a file into its own Brotli file.
+    
+    The output is written to a temporary name first, so an interrupted
+    build never leaves a truncated chunk that would later be reused.
+    
+    Args:
+        input_file: Path to input file
+        offset: Start of the range
+        size: Length of the range
+        output_file: Path to chunk file
+        quality: Brotli compression quality
+        lgwin: Base 2 logarithm of the window size
+    """
+    with open(input_file, 'rb') as f_in:
+        f_in.seek(offset)
+        data = f_in.read(size)
+        
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'wb') as f_out:
+        f_out.write(brotli.compress(data, quality=quality, lgwin=lgwin))
+    os.replace(tmp_file, output_file)
+
+
+def _run_job(func: Callable, args: tuple) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Run one compression job, returning errors instead of raising.
+    
+    Args:
+        func: Compression function
+        args: Positional arguments
+        
+    Returns:
+        Tuple of (result with the job's seconds added, error message)
+    """
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    except Exception as e:
+        return None, str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result, None
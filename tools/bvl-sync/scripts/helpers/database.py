@@ -3,13 +3,49 @@ Database Manager for SQLite operations
 Handles schema initialization, record insertion, and data queries.
 """
 
+import hashlib
+import json
+import re
 import sqlite3
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Schema statements that can be created after the data load
+DEFERRED_STATEMENT_RE = re.compile(
+    r'^\s*(?:--[^\n]*\n\s*)*CREATE\s+(?:UNIQUE\s+INDEX|INDEX|VIEW)\b',
+    re.IGNORECASE
+)
+
+# Write-speed settings for throwaway builds
+BULK_LOAD_PRAGMAS = [
+    'journal_mode = MEMORY',
+    'synchronous = OFF',
+    'cache_size = -131072',
+    'temp_store = MEMORY'
+]
+
+# SQLite defaults restored after the bulk load
+DEFAULT_PRAGMAS = [
+    'journal_mode = DELETE',
+    'synchronous = FULL',
+    'cache_size = -2000',
+    'temp_store = DEFAULT'
+]
+
+# Per-row content hashes, kept in an attached sidecar database so they are
+# never shipped with the published file
+ROW_HASH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rowhash.row_hash (
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    row_hash TEXT NOT NULL,
+    PRIMARY KEY (table_name, row_key)
+) WITHOUT ROWID
+"""
+
 
 class DatabaseManager:
     """Manages SQLite database operations."""
@@ -23,6 +59,8 @@ class DatabaseManager:
         """
         self.db_path = db_path
         self.conn = None
+        self._insert_statements: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        self._deferred_schema: List[str] = []
         
     def connect(self):
         """Connect to database."""
@@ -38,12 +76,14 @@ class DatabaseManager:
             self.conn = None
             logger.info("Disconnected from database")
             
-    def init_schema(self, schema_path: str):
+    def init_schema(self, schema_path: str, defer_indexes: bool = False):
         """
         Initialize database schema from SQL file.
         
         Args:
             schema_path: Path to SQL schema file
+            defer_indexes: Only create tables now; CREATE INDEX and CREATE VIEW
+                statements are kept for create_deferred_schema()
         """
         self.connect()
         
@@ -51,11 +91,62 @@ class DatabaseManager:
         with open(schema_path, 'r', encoding='utf-8') as f:
             schema_sql = f.read()
             
+        if defer_indexes:
+            immediate = []
+            for statement in split_sql_statements(schema_sql):
+                if DEFERRED_STATEMENT_RE.match(statement):
+                    self._deferred_schema.append(statement)
+                else:
+                    immediate.append(statement)
+            schema_sql = '\n'.join(immediate)
+            logger.info(f"Deferring {len(self._deferred_schema)} index/view statements until after the data load")
+            
         # Execute schema creation
         self.conn.executescript(schema_sql)
         self.conn.commit()
         logger.info("Schema initialized successfully")
         
+    def create_deferred_schema(self):
+        """Create the indexes and views held back by init_schema(defer_indexes=True)."""
+        if not self._deferred_schema:
+            return
+            
+        self.connect()
+        
+        logger.info(f"Creating {len(self._deferred_schema)} deferred indexes and views")
+        self.conn.executescript('\n'.join(self._deferred_schema))
+        self.conn.commit()
+        self._deferred_schema = []
+        
+    def enable_bulk_load(self):
+        """
+        Tune the connection for a throwaway build.
+        Trades crash safety for write speed; a failed build is simply rerun.
+        """
+        self.connect()
+        self.conn.commit()
+        
+        logger.info("Enabling bulk load PRAGMAs")
+        for pragma in BULK_LOAD_PRAGMAS:
+            self.conn.execute(f"PRAGMA {pragma}")
+            
+    def disable_bulk_load(self):
+        """Restore the default durability settings after a bulk load."""
+        self.connect()
+        self.conn.commit()
+        
+        logger.info("Restoring default PRAGMAs")
+        for pragma in DEFAULT_PRAGMAS:
+            self.conn.execute(f"PRAGMA {pragma}")
+            
+    def optimize(self):
+        """Gather query planner statistics."""
+        self.connect()
+        logger.info("Running ANALYZE and PRAGMA optimize")
+        self.conn.execute("ANALYZE")
+        self.conn.execute("PRAGMA optimize")
+        self.conn.commit()
+        
     def insert_record(self, table: str, record: Dict[str, Any]) -> bool:
         """
         Insert a single record into table.
@@ -70,23 +161,102 @@ class DatabaseManager:
         if not record:
             return False
             
-        self.connect()
+        return self.insert_row(table, tuple(record), tuple(record.values()))
+        
+    def insert_row(self, table: str, columns: Tuple[str, ...], row: Tuple[Any, ...]) -> bool:
+        """
+        Insert a single row of column values into table.
         
-        # Build INSERT statement
-        columns = list(record.keys())
-        placeholders = ['?' for _ in columns]
-        values = [record[col] for col in columns]
+        Args:
+            table: Table name
+            columns: Column names in value order
+            row: Column values
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        self.connect()
         
-        sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
+        sql = self._insert_sql(table, columns)
         
         try:
-            self.conn.execute(sql, values)
+            self.conn.execute(sql, row)
             return True
         except sqlite3.Error as e:
             logger.error(f"Failed to insert record into {table}: {e}")
-            logger.debug(f"Record: {record}")
+            logger.debug(f"Record: {dict(zip(columns, row))}")
             return False
             
+    def _insert_sql(self, table: str, columns: Tuple[str, ...]) -> str:
+        """
+        Get the cached INSERT statement for a table and column signature.
+        
+        Args:
+            table: Table name
+            columns: Column names in value order
+            
+        Returns:
+            INSERT OR REPLACE statement with one placeholder per column
+        """
+        key = (table, columns)
+        sql = self._insert_statements.get(key)
+        
+        if sql is None:
+            placeholders = ', '.join('?' for _ in columns)
+            sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+            self._insert_statements[key] = sql
+            
+        return sql
+        
+    def _insert_group(self, table: str, columns: Tuple[str, ...], records: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Insert records sharing one column signature with executemany.
+        
+        Args:
+            table: Table name
+            columns: Column names shared by all records
+            records: Records whose keys equal columns (in order)
+            
+        Returns:
+            Tuple of (success count, error count)
+        """
+        return self._insert_rows(table, columns, [tuple(record.values()) for record in records])
+        
+    def _insert_rows(self, table: str, columns: Tuple[str, ...], rows: List[Tuple[Any, ...]]) -> Tuple[int, int]:
+        """
+        Insert rows of column values with executemany.
+        
+        The batch runs inside a savepoint. If it fails, the savepoint is rolled
+        back and the batch is retried row by row, so only the offending rows
+        are counted as errors.
+        
+        Args:
+            table: Table name
+            columns: Column names in value order
+            rows: Column values per row
+            
+        Returns:
+            Tuple of (success count, error count)
+        """
+        sql = self._insert_sql(table, columns)
+        
+        self.conn.execute("SAVEPOINT bulk_insert")
+        try:
+            self.conn.executemany(sql, rows)
+            self.conn.execute("RELEASE bulk_insert")
+            return len(rows), 0
+        except sqlite3.Error as e:
+            self.conn.execute("ROLLBACK TO bulk_insert")
+            self.conn.execute("RELEASE bulk_insert")
+            logger.warning(f"Bulk insert into {table} failed ({e}), retrying {len(rows)} records one by one")
+            
+        success_count = 0
+        for row in rows:
+            if self.insert_row(table, columns, row):
+                success_count += 1
+                
+        return success_count, len(rows) - success_count
+        
     def insert_records(self, table: str, records: List[Dict[str, Any]]) -> int:
         """
         Insert multiple records into table.
@@ -102,22 +272,290 @@ class DatabaseManager:
             logger.warning(f"No records to insert into {table}")
             return 0
             
+        return self.insert_record_batches(table, [records])
+        
+    def insert_record_batches(self, table: str, batches: Iterable[List[Dict[str, Any]]]) -> int:
+        """
+        Insert batches of records as they are produced.
+        
+        Batches are consumed lazily (e.g. mapped API pages), so only one batch
+        has to be held in memory. Consecutive records with the same keys are
+        written with a single executemany; all batches are committed together.
+        If producing a batch fails (e.g. a later page cannot be fetched), the
+        rows inserted so far are rolled back and the error is re-raised, so a
+        table never keeps a partial endpoint.
+        
+        Args:
+            table: Table name
+            batches: Iterable of record lists
+            
+        Returns:
+            Number of records successfully inserted
+        """
         self.connect()
         
         success_count = 0
         error_count = 0
         
-        for record in records:
-            if self.insert_record(table, record):
-                success_count += 1
-            else:
-                error_count += 1
+        # Keep all batches in one transaction; savepoints nest inside it
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+            
+        try:
+            for records in batches:
+                for columns, group in _group_by_columns(records):
+                    if not columns:
+                        error_count += len(group)
+                        continue
+                        
+                    inserted, failed = self._insert_group(table, columns, group)
+                    success_count += inserted
+                    error_count += failed
+                    
+            # Commit after all batches
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+            
+        if success_count or error_count:
+            logger.info(f"Inserted {success_count} records into {table} (errors: {error_count})")
+        return success_count
+        
+    def insert_row_batches(
+        self,
+        table: str,
+        columns: Tuple[str, ...],
+        batches: Iterable[List[Tuple[Any, ...]]]
+    ) -> int:
+        """
+        Insert batches of rows produced by a row mapper.
+        
+        Like insert_record_batches, but every row holds the values of
+        `columns` in order, so each batch goes to executemany as it is. A
+        failing batch iterable rolls back all rows of the call.
+        
+        Args:
+            table: Table name
+            columns: Column names in value order
+            batches: Iterable of row lists
+            
+        Returns:
+            Number of rows successfully inserted
+        """
+        self.connect()
+        
+        success_count = 0
+        error_count = 0
+        
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+            
+        try:
+            for rows in batches:
+                if not rows:
+                    continue
+                inserted, failed = self._insert_rows(table, columns, rows)
+                success_count += inserted
+                error_count += failed
                 
-        # Commit after batch
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+            
+        if success_count or error_count:
+            logger.info(f"Inserted {success_count} records into {table} (errors: {error_count})")
+        return success_count
+        
+    def attach_row_hashes(self, path: str):
+        """
+        Attach the sidecar database holding the per-row content hashes.
+        
+        Args:
+            path: Path to the sidecar SQLite file (created if missing)
+        """
+        self.connect()
+        
+        attached = [row['name'] for row in self.conn.execute("PRAGMA database_list")]
+        if 'rowhash' not in attached:
+            self.conn.execute("ATTACH DATABASE ? AS rowhash", (path,))
+        self.conn.execute(ROW_HASH_SCHEMA)
         self.conn.commit()
+        logger.info(f"Using row hashes from {path}")
         
-        logger.info(f"Inserted {success_count} records into {table} (errors: {error_count})")
-        return success_count
+    def get_primary_key(self, table: str) -> List[str]:
+        """
+        Get the primary key columns of a table.
+        
+        Args:
+            table: Table name
+            
+        Returns:
+            Column names in key order (empty if the table has no primary key)
+        """
+        self.connect()
+        rows = self.conn.execute(f"PRAGMA table_info({table})").fetchall()
+        return [row['name'] for row in sorted(rows, key=lambda row: row['pk']) if row['pk']]
+        
+    def sync_record_batches(
+        self,
+        table: str,
+        key_columns: List[str],
+        batches: Iterable[List[Dict[str, Any]]]
+    ) -> Dict[str, int]:
+        """
+        Update a table in place so it matches the fetched records.
+        
+        Each record is hashed and compared with the hash stored for its key in
+        the sidecar attached by attach_row_hashes(). Only new or changed rows
+        are written; rows whose key was not fetched are deleted afterwards.
+        If no records are fetched at all, nothing is deleted.
+        
+        On the first sync of a table that was filled by a full build (no
+        stored hashes yet), a record without a stored hash is compared with
+        the row already in the table, so existing rows are reported as
+        unchanged or updated rather than inserted.
+        
+        Args:
+            table: Table name
+            key_columns: Columns identifying a row
+            batches: Iterable of record lists
+            
+        Returns:
+            Dictionary with inserted, updated, unchanged, deleted and error counts
+        """
+        self.connect()
+        
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'errors': 0}
+        stored_hashes = dict(self.conn.execute(
+            "SELECT row_key, row_hash FROM rowhash.row_hash WHERE table_name = ?",
+            (table,)
+        ).fetchall())
+        seen_keys = set()
+        seed = not stored_hashes and self.get_table_count(table) > 0
+        
+        # Keys are collected in a temp table with the same column types, so
+        # they compare equal to the stored values after type affinity
+        column_types = {
+            row['name']: row['type']
+            for row in self.conn.execute(f"PRAGMA table_info({table})").fetchall()
+        }
+        key_defs = ', '.join(f"{column} {column_types.get(column, '')}" for column in key_columns)
+        self.conn.execute("DROP TABLE IF EXISTS temp.sync_keys")
+        self.conn.execute(f"CREATE TEMP TABLE sync_keys ({key_defs})")
+        self.conn.execute(f"CREATE INDEX temp.sync_keys_idx ON sync_keys ({', '.join(key_columns)})")
+        key_sql = f"INSERT INTO temp.sync_keys VALUES ({', '.join('?' for _ in key_columns)})"
+        
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+            
+        try:
+            for records in batches:
+                changed = []
+                key_rows = []
+                hashes = []
+                
+                for record in records:
+                    key_values = [record.get(column) for column in key_columns]
+                    row_key = _row_key(key_values)
+                    row_hash = _row_hash(record)
+                    seen_keys.add(row_key)
+                    key_rows.append(key_values)
+                    
+                    previous = stored_hashes.get(row_key)
+                    if previous is None and seed:
+                        previous = self._existing_row_hash(table, key_columns, key_values, list(record))
+                        if previous == row_hash:
+                            hashes.append((table, row_key, row_hash))
+                            stored_hashes[row_key] = row_hash
+                            
+                    if previous == row_hash:
+                        counts['unchanged'] += 1
+                        continue
+                        
+                    counts['updated' if previous else 'inserted'] += 1
+                    changed.append((record, row_key, row_hash))
+                    
+                self.conn.executemany(key_sql, key_rows)
+                
+                for columns, group in _group_by_columns([record for record, _, _ in changed]):
+                    entries = changed[:len(group)]
+                    changed = changed[len(group):]
+                    
+                    if not columns:
+                        counts['errors'] += len(group)
+                        continue
+                        
+                    _, failed = self._insert_group(table, columns, group)
+                    counts['errors'] += failed
+                    
+                    # Only remember hashes of written rows, failed rows are retried next run
+                    if not failed:
+                        hashes.extend((table, row_key, row_hash) for _, row_key, row_hash in entries)
+                        stored_hashes.update((row_key, row_hash) for _, row_key, row_hash in entries)
+                        
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO rowhash.row_hash (table_name, row_key, row_hash) VALUES (?, ?, ?)",
+                    hashes
+                )
+                
+            # Remove withdrawn rows, unless the fetch came back empty
+            if seen_keys:
+                match = ' AND '.join(f"k.{column} IS {table}.{column}" for column in key_columns)
+                cursor = self.conn.execute(
+                    f"DELETE FROM {table} WHERE NOT EXISTS "
+                    f"(SELECT 1 FROM temp.sync_keys k WHERE {match})"
+                )
+                counts['deleted'] = max(cursor.rowcount, 0)
+                self.conn.executemany(
+                    "DELETE FROM rowhash.row_hash WHERE table_name = ? AND row_key = ?",
+                    [(table, row_key) for row_key in stored_hashes.keys() - seen_keys]
+                )
+            else:
+                logger.warning(f"No records fetched for {table}, keeping existing rows")
+                
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.execute("DROP TABLE IF EXISTS temp.sync_keys")
+            
+        logger.info(
+            f"Synced {table}: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['deleted']} deleted, {counts['unchanged']} unchanged (errors: {counts['errors']})"
+        )
+        return counts
+        
+    def _existing_row_hash(
+        self,
+        table: str,
+        key_columns: List[str],
+        key_values: List[Any],
+        columns: List[str]
+    ) -> Optional[str]:
+        """
+        Hash the stored row of a key like a mapped record.
+        
+        Args:
+            table: Table name
+            key_columns: Columns identifying a row
+            key_values: Values of the key columns
+            columns: Columns of the mapped record
+            
+        Returns:
+            Hash over the row's values of the given columns, or None if the
+            table has no row with that key
+        """
+        match = ' AND '.join(f"{column} IS ?" for column in key_columns)
+        row = self.conn.execute(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE {match}",
+            key_values
+        ).fetchone()
+        if row is None:
+            return None
+        return _row_hash(dict(zip(columns, tuple(row))))
         
     def execute_query(self, sql: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
         """
@@ -230,12 +668,238 @@ class DatabaseManager:
         results = self.execute_query("SELECT value FROM bvl_meta WHERE key=?", (key,))
         return results[0]["value"] if results else None
         
+    def write_sync_log(
+        self,
+        sync: Dict[str, Any],
+        stages: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Record a sync in bvl_sync_log and its stages in bvl_sync_stage.
+        
+        Stage fields without a column of their own are kept in details_json.
+        
+        Args:
+            sync: Values of the bvl_sync_log columns (sync_start, sync_end,
+                duration_seconds, status, error_message, records_processed)
+            stages: Stage records of StageProfiler
+            
+        Returns:
+            id of the bvl_sync_log row
+        """
+        self.connect()
+        
+        columns = ('sync_start', 'sync_end', 'duration_seconds', 'status', 'error_message', 'records_processed')
+        with self.conn:
+            cursor = self.conn.execute(
+                f"INSERT INTO bvl_sync_log ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                tuple(sync.get(column) for column in columns)
+            )
+            sync_id = cursor.lastrowid
+            
+            stage_columns = (
+                'stage', 'start_seconds', 'duration_seconds', 'status', 'rows', 'rows_per_second',
+                'requests', 'retries', 'bytes', 'peak_rss_mb'
+            )
+            rows = []
+            for seq, stage in enumerate(stages):
+                details = {key: value for key, value in stage.items() if key not in stage_columns}
+                rows.append(
+                    (sync_id, seq)
+                    + tuple(stage.get(column) for column in stage_columns)
+                    + (json.dumps(details, sort_keys=True) if details else None,)
+                )
+            self.conn.executemany(
+                f"INSERT INTO bvl_sync_stage (sync_id, seq, {', '.join(stage_columns)}, details_json) "
+                f"VALUES ({', '.join('?' for _ in range(len(stage_columns) + 3))})",
+                rows
+            )
+            
+        return sync_id
+        
+    def get_column_affinities(self, table: str) -> Dict[str, str]:
+        """
+        Get the type affinity of each column of a table.
+        
+        Args:
+            table: Table name
+            
+        Returns:
+            Column name -> affinity (TEXT, INTEGER, REAL, NUMERIC or BLOB)
+        """
+        self.connect()
+        return {
+            row['name']: column_affinity(row['type'])
+            for row in self.conn.execute(f"PRAGMA table_info({table})")
+        }
+        
+    def iter_payloads(self, source: str) -> Iterator[str]:
+        """
+        Iterate over the non-NULL payload_json values of a table or view.
+        
+        Args:
+            source: Table or view name
+            
+        Yields:
+            payload_json values
+        """
+        self.connect()
+        for row in self.conn.execute(f"SELECT payload_json FROM {source} WHERE payload_json IS NOT NULL"):
+            yield row[0]
+            
+    def create_payload_views(self, promoted: Dict[str, List[str]]) -> Dict[str, Tuple[int, int]]:
+        """
+        Create <table>_payload views that rebuild the full payload_json.
+        
+        Each view has the columns of its table, with the fields promoted to
+        columns merged back into payload_json. A field is only restored in
+        rows whose payload lacks it and whose column is not NULL, as
+        slim_payload() promotes per row and never promotes nulls: values a
+        column would convert, and fields the API left out, stay as they
+        were. Views reading payload_json from a slimmed table are redirected
+        to its payload view.
+        
+        Args:
+            promoted: Table name -> fields left out of payload_json
+            
+        Returns:
+            Table name -> (stored payload bytes, rebuilt payload bytes)
+        """
+        self.connect()
+        
+        sizes = {}
+        views = {}
+        
+        for table, fields in sorted(promoted.items()):
+            if not self.table_exists(table):
+                continue
+                
+            columns = [row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+            fields = [field for field in fields if field in columns]
+            if 'payload_json' not in columns or not fields:
+                continue
+                
+            selected = ', '.join(column for column in columns if column != 'payload_json')
+            # json_insert() keeps fields the payload already has; NULL columns
+            # get the path '$', which always exists and so inserts nothing
+            paths = ', '.join(
+                f"CASE WHEN {field} IS NULL THEN '$' ELSE '$.{field}' END, {field}"
+                for field in fields
+            )
+            view = f"{table}_payload"
+            
+            self.conn.execute(f"DROP VIEW IF EXISTS {view}")
+            self.conn.execute(
+                f"CREATE VIEW {view} AS SELECT {selected}, "
+                f"CASE WHEN payload_json IS NULL THEN NULL ELSE json_insert(payload_json, {paths}) END "
+                f"AS payload_json FROM {table}"
+            )
+            views[table] = view
+            sizes[table] = (
+                self.conn.execute(f"SELECT COALESCE(SUM(LENGTH(payload_json)), 0) FROM {table}").fetchone()[0],
+                self.conn.execute(f"SELECT COALESCE(SUM(LENGTH(payload_json)), 0) FROM {view}").fetchone()[0]
+            )
+            
+        # Point views that expose payload_json (e.g. bvl_mittel_app) at the
+        # payload views
+        for row in self.conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'view' AND sql LIKE '%payload_json%'"
+        ).fetchall():
+            if row['name'] in views.values():
+                continue
+            sql = row['sql']
+            for table, view in views.items():
+                sql = re.sub(rf'\bFROM\s+{table}\b', f'FROM {view}', sql)
+            if sql != row['sql']:
+                self.conn.execute(f"DROP VIEW {row['name']}")
+                self.conn.execute(sql)
+                
+        self.conn.commit()
+        logger.info(f"Created {len(views)} payload views")
+        return sizes
+        
     def vacuum(self):
         """Vacuum database to optimize size."""
         self.connect()
         logger.info("Running VACUUM to optimize database")
         self.conn.execute("VACUUM")
         
+    def vacuum_into(self, path: str):
+        """
+        Write a compacted copy of the database to a new file.
+        
+        Unlike an in-place VACUUM the copy does not carry over header
+        counters from earlier write transactions.
+        
+        Args:
+            path: Path of the new database file (must not exist)
+        """
+        self.connect()
+        self.conn.commit()
+        logger.info(f"Running VACUUM INTO {path}")
+        self.conn.execute("VACUUM INTO ?", (path,))
+        
+    def normalize_column(self, column: str, value: str) -> int:
+        """
+        Set a column to the same value in every table that has it.
+        
+        Used to replace wall-clock defaults such as updated_at.
+        
+        Args:
+            column: Column name
+            value: New value
+            
+        Returns:
+            Number of updated rows
+        """
+        self.connect()
+        
+        count = 0
+        for table in self._user_tables():
+            columns = [row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+            if column in columns:
+                count += self.conn.execute(f"UPDATE {table} SET {column} = ?", (value,)).rowcount
+                
+        self.conn.commit()
+        logger.info(f"Set {column} to {value!r} in {count} rows")
+        return count
+        
+    def reorder_tables(self):
+        """
+        Rewrite tables so their rows are stored in primary key order.
+        
+        Rowid tables store rows in insertion order, which depends on the
+        order the API pages arrived in. Tables keyed by INTEGER PRIMARY KEY
+        are already stored in key order and are skipped.
+        """
+        self.connect()
+        
+        reordered = 0
+        
+        for table in self._user_tables():
+            info = self.conn.execute(f"PRAGMA table_info({table})").fetchall()
+            key = [row['name'] for row in sorted(info, key=lambda row: row['pk']) if row['pk']]
+            key_types = [row['type'].upper() for row in info if row['pk']]
+            
+            if key_types == ['INTEGER']:
+                continue
+                
+            order = ', '.join(key or [row['name'] for row in info])
+            self.conn.execute("DROP TABLE IF EXISTS temp.reorder")
+            self.conn.execute(f"CREATE TEMP TABLE reorder AS SELECT * FROM {table} ORDER BY {order}")
+            self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute(f"INSERT INTO {table} SELECT * FROM temp.reorder ORDER BY {order}")
+            self.conn.execute("DROP TABLE temp.reorder")
+            reordered += 1
+            
+        self.conn.commit()
+        logger.info(f"Reordered {reordered} tables by primary key")
+        
+    def _user_tables(self) -> List[str]:
+        """Get the names of all user tables in creation order."""
+        return [row['name'] for row in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+        )]
+        
     def __enter__(self):
         """Context manager entry."""
         self.connect()
@@ -244,3 +908,108 @@ class DatabaseManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         self.disconnect()
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """
+    Split an SQL script into complete statements.
+    
+    Args:
+        sql: SQL script
+        
+    Returns:
+        Statements including their leading comments
+    """
+    statements = []
+    buffer = ''
+    
+    for line in sql.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ''
+            
+    if buffer.strip():
+        statements.append(buffer.strip())
+        
+    return statements
+
+
+def _group_by_columns(records: List[Dict[str, Any]]) -> Iterator[Tuple[Tuple[str, ...], List[Dict[str, Any]]]]:
+    """
+    Split records into runs of consecutive records with identical keys.
+    
+    Runs keep the input order, so INSERT OR REPLACE resolves duplicate keys
+    exactly like row-by-row inserts.
+    
+    Args:
+        records: Record dictionaries
+        
+    Yields:
+        (column names, records) per run
+    """
+    columns = None
+    group: List[Dict[str, Any]] = []
+    
+    for record in records:
+        record_columns = tuple(record)
+        if record_columns != columns and group:
+            yield columns, group
+            group = []
+        columns = record_columns
+        group.append(record)
+        
+    if group:
+        yield columns, group
+
+
+def column_affinity(declared_type: str) -> str:
+    """
+    Determine the affinity of a column from its declared type.
+    
+    Follows the rules of https://www.sqlite.org/datatype3.html#determination_of_column_affinity
+    
+    Args:
+        declared_type: Declared column type (may be empty)
+        
+    Returns:
+        TEXT, INTEGER, REAL, NUMERIC or BLOB
+    """
+    declared = (declared_type or '').upper()
+    
+    if 'INT' in declared:
+        return 'INTEGER'
+    if any(name in declared for name in ('CHAR', 'CLOB', 'TEXT')):
+        return 'TEXT'
+    if not declared or 'BLOB' in declared:
+        return 'BLOB'
+    if any(name in declared for name in ('REAL', 'FLOA', 'DOUB')):
+        return 'REAL'
+    return 'NUMERIC'
+
+
+def _row_key(key_values: List[Any]) -> str:
+    """
+    Serialize primary key values for the row hash table.
+    
+    Args:
+        key_values: Key column values in key order
+        
+    Returns:
+        JSON array of the values
+    """
+    return json.dumps(key_values, ensure_ascii=False, default=str)
+
+
+def _row_hash(record: Dict[str, Any]) -> str:
+    """
+    Compute the content hash of a mapped record.
+    
+    Args:
+        record: Record dictionary
+        
+    Returns:
+        Hex digest over the record's columns and values
+    """
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
@@ -0,0 +1,229 @@
+"""
+Delta utilities for database builds.
+Creates SQL changesets that turn the previous published database into the new one.
+"""
+
+import brotli
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Columns that change on every build without a change in content
+IGNORED_COLUMNS = ('updated_at',)
+
+# Rows that change on every build without a change in content, as
+# table -> (key column, key values): the run metadata fetch_bvl_data.py
+# leaves out of reproducible builds
+VOLATILE_ROWS = {
+    'bvl_meta': ('key', ('lastSyncIso', 'lastSyncChanges'))
+}
+
+# Tables only holding the log and timings of the build itself
+IGNORED_TABLES = ('bvl_sync_log', 'bvl_sync_stage')
+
+# Read size for streaming decompression
+CHUNK_SIZE = 1024 * 1024
+
+
+def decompress_brotli(input_file: str, output_file: str) -> Optional[str]:
+    """
+    Decompress a Brotli file in chunks.
+    
+    Args:
+        input_file: Path to .br file
+        output_file: Path to decompressed file
+        
+    Returns:
+        Path to decompressed file, or None if the input is not valid Brotli
+        (e.g. a Git LFS pointer)
+    """
+    decompressor = brotli.Decompressor()
+    
+    try:
+        with open(input_file, 'rb') as f_in, open(output_file, 'wb') as f_out:
+            for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+                f_out.write(decompressor.process(chunk))
+            if not decompressor.is_finished():
+                raise brotli.error("truncated stream")
+    except brotli.error as e:
+        logger.warning(f"Could not decompress {input_file}: {e}")
+        Path(output_file).unlink(missing_ok=True)
+        return None
+        
+    return output_file
+
+
+def build_sql_delta(
+    old_db_path: str,
+    new_db_path: str,
+    ignored_columns: Iterable[str] = IGNORED_COLUMNS,
+    volatile_rows: Dict[str, Tuple[str, Tuple[str, ...]]] = VOLATILE_ROWS,
+    ignored_tables: Iterable[str] = IGNORED_TABLES
+) -> Optional[str]:
+    """
+    Build an SQL changeset from the old database to the new one.
+    
+    Rows are matched by primary key. Rows missing from the new database are
+    deleted, rows that are new or differ in any column except
+    ignored_columns are written with INSERT OR REPLACE. Tables without a
+    primary key are replaced entirely if they differ. Volatile rows and
+    ignored tables are left out, so a client applying the delta keeps its
+    own values there.
+    
+    Args:
+        old_db_path: Path to previous database
+        new_db_path: Path to new database
+        ignored_columns: Columns not compared (still written for changed rows)
+        volatile_rows: Rows left out, as table -> (key column, key values)
+        ignored_tables: Tables left out
+        
+    Returns:
+        SQL script, or None if the schemas differ and no delta is possible
+    """
+    conn = sqlite3.connect(new_db_path)
+    
+    try:
+        conn.execute("ATTACH DATABASE ? AS old", (old_db_path,))
+        
+        if _schema(conn, 'main') != _schema(conn, 'old'):
+            logger.info("Schema changed since previous build, no delta possible")
+            return None
+            
+        statements = ['BEGIN;']
+        changed_tables = 0
+        
+        ignored_tables = set(ignored_tables)
+        for table in _tables(conn):
+            if table in ignored_tables:
+                continue
+            count = len(statements)
+            statements.extend(_table_delta(conn, table, set(ignored_columns), volatile_rows.get(table)))
+            if len(statements) > count:
+                changed_tables += 1
+                
+        statements.append('COMMIT;')
+        
+        logger.info(f"Delta: {len(statements) - 2} statements in {changed_tables} tables")
+        return '\n'.join(statements) + '\n'
+    finally:
+        conn.close()
+
+
+def create_delta(
+    old_db_path: str,
+    new_db_path: str,
+    output_file: str,
+    quality: int = 11
+) -> Optional[Dict[str, Any]]:
+    """
+    Write the Brotli-compressed SQL changeset between two databases.
+    
+    Args:
+        old_db_path: Path to previous database
+        new_db_path: Path to new database
+        output_file: Path to .sql.br output file
+        quality: Brotli compression quality (0-11, default 11)
+        
+    Returns:
+        Dictionary with path and sizes, or None if no delta was written
+    """
+    sql = build_sql_delta(old_db_path, new_db_path)
+    
+    if sql is None:
+        return None
+        
+    data = sql.encode('utf-8')
+    compressed = brotli.compress(data, quality=quality, mode=brotli.MODE_TEXT)
+    
+    with open(output_file, 'wb') as f_out:
+        f_out.write(compressed)
+        
+    logger.info(f"Delta written to {output_file}: {len(data):,} -> {len(compressed):,} bytes")
+    
+    return {
+        'path': output_file,
+        'sql_size': len(data),
+        'size': len(compressed)
+    }
+
+
+def _schema(conn: sqlite3.Connection, schema: str) -> set:
+    """Get the user-defined schema objects of an attached database."""
+    return set(conn.execute(
+        f"SELECT type, name, sql FROM {schema}.sqlite_master WHERE name NOT LIKE 'sqlite_%'"
+    ).fetchall())
+
+
+def _tables(conn: sqlite3.Connection) -> List[str]:
+    """Get the user tables of the main database in name order."""
+    return [row[0] for row in conn.execute(
+        "SELECT name FROM main.sqlite_master WHERE type = 'table' "
+        "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+
+
+def _table_delta(
+    conn: sqlite3.Connection,
+    table: str,
+    ignored_columns: set,
+    volatile: Optional[Tuple[str, Tuple[str, ...]]] = None
+) -> Iterator[str]:
+    """
+    Generate the statements for one table.
+    
+    Args:
+        conn: Connection to the new database with the old one attached as `old`
+        table: Table name
+        ignored_columns: Columns not compared
+        volatile: Rows left out, as (key column, key values)
+        
+    Yields:
+        SQL statements
+    """
+    info = conn.execute(f"PRAGMA main.table_info({table})").fetchall()
+    columns = [row[1] for row in info]
+    key = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5]]
+    compared = [column for column in columns if column not in ignored_columns]
+    
+    values = " || ',' || ".join(f"quote(n.{column})" for column in columns)
+    insert = f"'INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES (' || {values} || ');'"
+    
+    # Condition selecting the rows the delta covers; the volatile key values
+    # are quoted by SQLite and inlined, as in the generated statements
+    kept = 'TRUE'
+    if volatile:
+        column, keys = volatile
+        literals = ', '.join(conn.execute("SELECT quote(?)", (value,)).fetchone()[0] for value in keys)
+        kept = f"{column} NOT IN ({literals})"
+        
+    if not key:
+        # Without a key rows cannot be matched; replace the table if it differs
+        differs = conn.execute(
+            f"SELECT EXISTS (SELECT {', '.join(compared)} FROM main.{table} WHERE {kept} "
+            f"EXCEPT SELECT {', '.join(compared)} FROM old.{table} WHERE {kept}) "
+            f"OR EXISTS (SELECT {', '.join(compared)} FROM old.{table} WHERE {kept} "
+            f"EXCEPT SELECT {', '.join(compared)} FROM main.{table} WHERE {kept})"
+        ).fetchone()[0]
+        if differs:
+            yield f"DELETE FROM {table};" if not volatile else f"DELETE FROM {table} WHERE {kept};"
+            for (statement,) in conn.execute(f"SELECT {insert} FROM main.{table} n WHERE {kept}"):
+                yield statement
+        return
+        
+    same_key = ' AND '.join(f"n.{column} IS o.{column}" for column in key)
+    where = " || ' AND ' || ".join(f"'{column} IS ' || quote(o.{column})" for column in key)
+    for (statement,) in conn.execute(
+        f"SELECT 'DELETE FROM {table} WHERE ' || {where} || ';' FROM old.{table} o "
+        f"WHERE {kept} AND NOT EXISTS (SELECT 1 FROM main.{table} n WHERE {same_key})"
+    ):
+        yield statement
+        
+    same_row = ' AND '.join(f"o.{column} IS n.{column}" for column in compared)
+    for (statement,) in conn.execute(
+        f"SELECT {insert} FROM main.{table} n "
+        f"WHERE {kept} AND NOT EXISTS (SELECT 1 FROM old.{table} o WHERE {same_row})"
+    ):
+        yield statement
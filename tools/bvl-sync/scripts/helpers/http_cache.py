@@ -0,0 +1,259 @@
+"""
+HTTP Response Cache
+Persistent on-disk cache for API responses with ETag/Last-Modified revalidation.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Mapping
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """Cached response body with its validators."""
+    
+    def __init__(self, key: str, body: bytes, etag: Optional[str], last_modified: Optional[str], expires: Optional[float]):
+        """
+        Initialize cached response.
+        
+        Args:
+            key: Cache key
+            body: Decompressed response body
+            etag: ETag validator
+            last_modified: Last-Modified validator
+            expires: Unix timestamp until which the body is fresh
+        """
+        self.key = key
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+        
+    def is_fresh(self) -> bool:
+        """Check whether the response may be reused without revalidation."""
+        return self.expires is not None and self.expires > time.time()
+        
+    def conditional_headers(self) -> Dict[str, str]:
+        """Build If-None-Match/If-Modified-Since headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Conditional-request cache stored in a SQLite file.
+    
+    Bodies are stored zlib-compressed. Entries are evicted in least recently
+    used order once the compressed size exceeds max_bytes.
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize response cache.
+        
+        Args:
+            cache_dir: Directory holding the cache database
+            max_bytes: Maximum total size of compressed bodies
+        """
+        self.path = Path(cache_dir) / 'responses.sqlite'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'revalidated': 0,
+            'stored': 0,
+            'evicted': 0
+        }
+        
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                expires REAL,
+                body BLOB,
+                size INTEGER,
+                last_access REAL
+            )
+        """)
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        
+        logger.info(f"Using HTTP cache {self.path} ({self.total_bytes:,} bytes)")
+        
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build cache key from URL and query parameters (limit/offset).
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+            
+        Returns:
+            Cache key
+        """
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+        
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        """
+        Look up a cached response.
+        
+        A fresh entry counts as hit; the caller revalidates stale entries.
+        Misses are counted by store() when a body has to be downloaded.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached response or None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, expires FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            
+            if row is None:
+                return None
+                
+            entry = CachedResponse(key, zlib.decompress(row[0]), row[1], row[2], row[3])
+            
+            if entry.is_fresh():
+                self.stats['hits'] += 1
+                self._touch(key)
+                
+        return entry
+        
+    def revalidated(self, entry: CachedResponse, headers: Mapping[str, str]) -> bytes:
+        """
+        Record a 304 Not Modified answer for a cached entry.
+        
+        Args:
+            entry: Revalidated entry
+            headers: Response headers of the 304 answer
+            
+        Returns:
+            Cached body
+        """
+        with self.lock:
+            self.stats['revalidated'] += 1
+            self.conn.execute(
+                "UPDATE responses SET expires = ?, last_access = ? WHERE key = ?",
+                (_expires_at(headers), time.time(), entry.key)
+            )
+            self.conn.commit()
+        return entry.body
+        
+    def store(self, key: str, headers: Mapping[str, str], body: bytes):
+        """
+        Record a downloaded 200 response and store it if it can be
+        revalidated or reused later.
+        
+        Args:
+            key: Cache key
+            headers: Response headers
+            body: Raw response body
+        """
+        with self.lock:
+            self.stats['misses'] += 1
+            
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        expires = _expires_at(headers)
+        
+        if 'no-store' in headers.get('Cache-Control', ''):
+            return
+        if not etag and not last_modified and expires is None:
+            return
+            
+        compressed = zlib.compress(body, 6)
+        
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if previous:
+                self.total_bytes -= previous[0]
+                
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, etag, last_modified, expires, body, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, expires, compressed, len(compressed), time.time())
+            )
+            self.total_bytes += len(compressed)
+            self.stats['stored'] += 1
+            
+            self._evict()
+            self.conn.commit()
+            
+    def _touch(self, key: str):
+        """Mark entry as recently used (caller holds the lock)."""
+        self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        
+    def _evict(self):
+        """Evict least recently used entries above max_bytes (caller holds the lock)."""
+        while self.total_bytes > self.max_bytes:
+            row = self.conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.total_bytes = 0
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self.total_bytes -= row[1]
+            self.stats['evicted'] += 1
+            
+    def close(self):
+        """Close the cache database."""
+        with self.lock:
+            self.conn.close()
+        logger.info(
+            f"HTTP cache: {self.stats['hits']} hits, {self.stats['revalidated']} revalidated, "
+            f"{self.stats['misses']} misses, {self.stats['evicted']} evicted"
+        )
+
+
+def _expires_at(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Compute expiry timestamp from Cache-Control max-age or Expires.
+    
+    Args:
+        headers: Response headers
+        
+    Returns:
+        Unix timestamp, or None if the response carries no freshness info
+    """
+    cache_control = headers.get('Cache-Control', '')
+    
+    for directive in cache_control.split(','):
+        name, _, value = directive.strip().partition('=')
+        if name.lower() in ('no-cache', 'no-store'):
+            return None
+        if name.lower() == 'max-age' and value.isdigit():
+            return time.time() + int(value)
+            
+    expires = headers.get('Expires')
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return None
+            
+    return None
@@ -3,14 +3,115 @@ HTTP Client for BVL API
 Handles API requests with proper URL building, pagination, retry logic, and error handling.
 """
 
+import bisect
 import logging
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 import requests
 
+from .http_cache import ResponseCache
+from .json_codec import loads
+from .tracing import Tracer
+
 logger = logging.getLogger(__name__)
 
 
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestStats:
+    """Thread-safe request counters, response statuses and latencies per endpoint path."""
+    
+    FIELDS = ('requests', 'retries', 'errors', 'cache_hits', 'not_modified', 'bytes')
+    
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._statuses: Dict[str, Dict[Optional[int], int]] = {}
+        self._latencies: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        
+    def add(self, path: str, **counts: int):
+        """
+        Add to the counters of a path.
+        
+        Args:
+            path: Endpoint path
+            **counts: Field name -> increment
+        """
+        with self._lock:
+            entry = self._counts.setdefault(path, dict.fromkeys(self.FIELDS, 0))
+            for field, value in counts.items():
+                entry[field] += value
+                
+    def observe(self, path: str, seconds: float, status: Optional[int]):
+        """
+        Record the latency and status of one request.
+        
+        Args:
+            path: Endpoint path
+            seconds: Time until the response arrived (or the request failed)
+            status: HTTP status code, or None if no response was received
+        """
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            statuses = self._statuses.setdefault(path, {})
+            statuses[status] = statuses.get(status, 0) + 1
+            
+            latency = self._latencies.setdefault(path, {'counts': [0] * (len(LATENCY_BUCKETS) + 1), 'sum': 0.0})
+            latency['counts'][bucket] += 1
+            latency['sum'] += seconds
+            
+    def for_path(self, path: str) -> Dict[str, int]:
+        """
+        Get the counters of a path.
+        
+        Args:
+            path: Endpoint path
+            
+        Returns:
+            Field name -> count (zeros if the path was never requested)
+        """
+        with self._lock:
+            return dict(self._counts.get(path) or dict.fromkeys(self.FIELDS, 0))
+            
+    def totals(self) -> Dict[str, int]:
+        """
+        Get the counters summed over all paths.
+        
+        Returns:
+            Field name -> count
+        """
+        with self._lock:
+            return {field: sum(entry[field] for entry in self._counts.values()) for field in self.FIELDS}
+            
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get everything recorded, per path.
+        
+        Returns:
+            Path -> dictionary with 'counts' (field -> count), 'statuses'
+            (status code or None -> count) and 'latency' ('counts' per
+            LATENCY_BUCKETS bucket plus +Inf, not cumulative, and 'sum';
+            None if no request was sent)
+        """
+        with self._lock:
+            return {
+                path: {
+                    'counts': dict(self._counts.get(path) or dict.fromkeys(self.FIELDS, 0)),
+                    'statuses': dict(self._statuses.get(path, {})),
+                    'latency': {
+                        'counts': list(self._latencies[path]['counts']),
+                        'sum': self._latencies[path]['sum']
+                    } if path in self._latencies else None
+                }
+                for path in sorted(set(self._counts) | set(self._latencies))
+            }
+
+
 class HTTPClient:
     """HTTP client for fetching data from BVL API with pagination support."""
     
@@ -19,7 +120,11 @@ class HTTPClient:
         base_url: str,
         timeout: int = 30,
         max_retries: int = 3,
-        retry_delay: int = 2
+        retry_delay: int = 2,
+        max_in_flight: int = 1,
+        cache: Optional[ResponseCache] = None,
+        request_stats: Optional[RequestStats] = None,
+        tracer: Optional[Tracer] = None
     ):
         """
         Initialize HTTP client.
@@ -29,13 +134,50 @@ class HTTPClient:
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
             retry_delay: Delay between retries in seconds
+            max_in_flight: Default number of page requests kept in flight
+                by fetch_paginated (1 = strictly sequential)
+            cache: Optional persistent response cache
+            request_stats: Counters to record requests in (default: new)
+            tracer: Tracer recording a span per request (default: disabled)
         """
         self.base_url = base_url.rstrip('/') + '/'
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.session = requests.Session()
+        self.max_in_flight = max(1, max_in_flight)
+        self.cache = cache
+        self.request_stats = request_stats or RequestStats()
+        self.tracer = tracer or Tracer(enabled=False)
+        self._sessions: List[requests.Session] = []
+        self._idle_sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+        
+    def _acquire_session(self) -> requests.Session:
+        """
+        Take an idle session from the pool or create a new one.
+        requests.Session is not thread-safe, so concurrent requests each use
+        their own session; sessions are reused to keep connections alive.
         
+        Returns:
+            Session reserved for the caller
+        """
+        with self._sessions_lock:
+            if self._idle_sessions:
+                return self._idle_sessions.pop()
+            session = requests.Session()
+            self._sessions.append(session)
+            return session
+            
+    def _release_session(self, session: requests.Session):
+        """
+        Return a session to the pool.
+        
+        Args:
+            session: Session obtained from _acquire_session
+        """
+        with self._sessions_lock:
+            self._idle_sessions.append(session)
+            
     def _build_url(self, path: str) -> str:
         """
         Build full URL from base URL and path.
@@ -58,7 +200,8 @@ class HTTPClient:
         self,
         path: str,
         params: Optional[Dict[str, Any]] = None,
-        retry_count: int = 0
+        retry_count: int = 0,
+        revalidate: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
         Send GET request to API endpoint.
@@ -67,26 +210,65 @@ class HTTPClient:
             path: Endpoint path (relative, without leading slash)
             params: Query parameters
             retry_count: Current retry attempt number
-            
+            revalidate: Ask the server even if the cached response is still
+                fresh (conditional request, so an unchanged response costs
+                a 304)
+                
         Returns:
             JSON response as dictionary, or None on error
         """
         url = self._build_url(path)
         
+        # Serve from or revalidate against the response cache
+        cache_key = None
+        cached = None
+        headers = None
+        if self.cache:
+            cache_key = self.cache.make_key(url, params)
+            cached = self.cache.lookup(cache_key)
+            if cached and cached.is_fresh() and not revalidate:
+                logger.debug(f"Cache hit for {cache_key}")
+                self.request_stats.add(path, cache_hits=1)
+                return loads(cached.body)
+            if cached:
+                headers = cached.conditional_headers()
+                
         try:
             logger.debug(f"GET {url} with params: {params}")
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            session = self._acquire_session()
+            self.request_stats.add(path, requests=1)
+            response = None
+            start = time.perf_counter()
+            try:
+                response = session.get(url, params=params, headers=headers, timeout=self.timeout)
+            finally:
+                self._release_session(session)
+                self._record_request(path, url, params, retry_count, start, response)
+            self.request_stats.add(path, bytes=len(response.content or b''))
             
+            # Handle HTTP 304 Not Modified
+            if response.status_code == 304:
+                if not cached:
+                    raise requests.exceptions.HTTPError(
+                        f"304 Not Modified without a cached response for {url}",
+                        response=response
+                    )
+                logger.debug(f"Not modified: {cache_key}")
+                self.request_stats.add(path, not_modified=1)
+                return loads(self.cache.revalidated(cached, response.headers))
+                
             # Handle HTTP 204 No Content
             if response.status_code == 204:
                 logger.warning(f"No content returned from {url}")
                 return {"items": []}
-            
+                
             response.raise_for_status()
             
             # Try to parse JSON
             try:
-                data = response.json()
+                data = loads(response.content)
+                if self.cache:
+                    self.cache.store(cache_key, response.headers, response.content)
                 return data
             except ValueError as e:
                 logger.error(f"Failed to parse JSON from {url}: {e}")
@@ -94,22 +276,62 @@ class HTTPClient:
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed for {url}: {e}")
+            self.request_stats.add(path, errors=1)
             
             # Retry logic
             if retry_count < self.max_retries:
                 wait_time = self.retry_delay * (2 ** retry_count)  # Exponential backoff
                 logger.info(f"Retrying in {wait_time} seconds... (attempt {retry_count + 1}/{self.max_retries})")
+                self.request_stats.add(path, retries=1)
                 time.sleep(wait_time)
-                return self.get(path, params, retry_count + 1)
+                return self.get(path, params, retry_count + 1, revalidate)
             else:
                 logger.error(f"Max retries exceeded for {url}")
                 return None
                 
+    def _record_request(
+        self,
+        path: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        retry_count: int,
+        start: float,
+        response: Optional[requests.Response]
+    ):
+        """
+        Record latency and status of one request, and trace it as a span.
+        
+        Args:
+            path: Endpoint path
+            url: Request URL
+            params: Query parameters
+            retry_count: Retry attempt number of the request
+            start: time.perf_counter() value before the request was sent
+            response: Response, or None if the request failed
+        """
+        seconds = time.perf_counter() - start
+        status = response.status_code if response is not None else None
+        self.request_stats.observe(path, seconds, status)
+        self.tracer.add(
+            f"GET {path}",
+            'http',
+            start,
+            seconds,
+            url=url,
+            offset=(params or {}).get('offset'),
+            status=status,
+            bytes=len(response.content or b'') if response is not None else 0,
+            retries=retry_count,
+            latency_ms=round(seconds * 1000, 1)
+        )
+        
     def fetch_paginated(
         self,
         path: str,
         page_size: int = 1000,
-        max_pages: Optional[int] = None
+        max_pages: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        strict: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Fetch all records from paginated endpoint.
@@ -118,52 +340,179 @@ class HTTPClient:
             path: Endpoint path (relative, without leading slash)
             page_size: Number of records per page
             max_pages: Maximum number of pages to fetch (None for all)
-            
+            max_in_flight: Number of page requests kept in flight
+                (None uses the client default)
+            strict: Raise RuntimeError when a page cannot be fetched instead
+                of treating it as the end of the data
+                
         Returns:
             List of all records from all pages
         """
         all_records = []
-        offset = 0
+        
+        for items in self.iter_pages(path, page_size, max_pages, max_in_flight, strict):
+            all_records.extend(items)
+            
+        return all_records
+        
+    def iter_pages(
+        self,
+        path: str,
+        page_size: int = 1000,
+        max_pages: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        strict: bool = False
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the records of a paginated endpoint page by page.
+        
+        Only the pages currently in flight are held in memory, so callers can
+        process large tables without materializing them.
+        
+        Args:
+            path: Endpoint path (relative, without leading slash)
+            page_size: Number of records per page
+            max_pages: Maximum number of pages to fetch (None for all)
+            max_in_flight: Number of page requests kept in flight
+                (None uses the client default)
+            strict: Raise RuntimeError when a page cannot be fetched instead
+                of treating it as the end of the data
+                
+        Yields:
+            List of records of each non-empty page, in offset order
+        """
+        if max_in_flight is None:
+            max_in_flight = self.max_in_flight
+            
+        if max_in_flight > 1:
+            pages = self._iter_pages_windowed(path, page_size, max_pages, max_in_flight)
+        else:
+            pages = self._iter_pages_sequential(path, page_size, max_pages)
+            
+        total = 0
+        
+        try:
+            for page_num, offset, data in pages:
+                if not data:
+                    if strict:
+                        raise RuntimeError(f"Failed to fetch page {page_num + 1} of {path}")
+                    logger.warning(f"No data returned for page {page_num + 1}")
+                    break
+                    
+                # Extract items from response
+                items = data.get('items', [])
+                
+                if not items:
+                    logger.info(f"No more items found at offset {offset}")
+                    break
+                    
+                total += len(items)
+                logger.info(f"Fetched {len(items)} records (total: {total})")
+                yield items
+                
+                # Check if we've reached the end
+                if len(items) < page_size:
+                    logger.info(f"Received fewer records than page size, assuming end of data")
+                    break
+        finally:
+            # Cancels prefetched pages, also when the consumer stops early
+            pages.close()
+            
+        logger.info(f"Completed fetching {path}: {total} total records")
+        
+    def _iter_pages_sequential(
+        self,
+        path: str,
+        page_size: int,
+        max_pages: Optional[int]
+    ) -> Iterator[Tuple[int, int, Optional[Dict[str, Any]]]]:
+        """
+        Request pages strictly one after another.
+        
+        Args:
+            path: Endpoint path (relative, without leading slash)
+            page_size: Number of records per page
+            max_pages: Maximum number of pages to fetch (None for all)
+            
+        Yields:
+            (page number, offset, response) for each requested page
+        """
         page_num = 0
         
         while True:
             if max_pages and page_num >= max_pages:
                 logger.info(f"Reached max pages limit ({max_pages})")
-                break
+                return
                 
+            offset = page_num * page_size
             params = {
                 'limit': page_size,
                 'offset': offset
             }
             
             logger.info(f"Fetching page {page_num + 1} from {path} (offset={offset}, limit={page_size})")
-            data = self.get(path, params)
-            
-            if not data:
-                logger.warning(f"No data returned for page {page_num + 1}")
-                break
-                
-            # Extract items from response
-            items = data.get('items', [])
-            
-            if not items:
-                logger.info(f"No more items found at offset {offset}")
-                break
-                
-            all_records.extend(items)
-            logger.info(f"Fetched {len(items)} records (total: {len(all_records)})")
+            yield page_num, offset, self.get(path, params)
             
-            # Check if we've reached the end
-            if len(items) < page_size:
-                logger.info(f"Received fewer records than page size, assuming end of data")
-                break
-                
-            offset += page_size
             page_num += 1
             
-        logger.info(f"Completed fetching {path}: {len(all_records)} total records")
-        return all_records
+    def _iter_pages_windowed(
+        self,
+        path: str,
+        page_size: int,
+        max_pages: Optional[int],
+        max_in_flight: int
+    ) -> Iterator[Tuple[int, int, Optional[Dict[str, Any]]]]:
+        """
+        Request pages while keeping several requests in flight.
+        
+        Offsets are requested ahead of the page being consumed and yielded in
+        offset order. When the consumer stops (short or empty page), no new
+        offsets are issued and requests not yet started are cancelled.
+        
+        Args:
+            path: Endpoint path (relative, without leading slash)
+            page_size: Number of records per page
+            max_pages: Maximum number of pages to fetch (None for all)
+            max_in_flight: Maximum number of concurrent page requests
+            
+        Yields:
+            (page number, offset, response) for each requested page
+        """
+        pending = deque()
+        next_page = 0
         
+        with ThreadPoolExecutor(
+            max_workers=max_in_flight,
+            thread_name_prefix='bvl-page'
+        ) as executor:
+            try:
+                while True:
+                    # Top up the window
+                    while len(pending) < max_in_flight and not (max_pages and next_page >= max_pages):
+                        offset = next_page * page_size
+                        params = {
+                            'limit': page_size,
+                            'offset': offset
+                        }
+                        logger.info(f"Fetching page {next_page + 1} from {path} (offset={offset}, limit={page_size})")
+                        pending.append((next_page, offset, executor.submit(self.get, path, params)))
+                        next_page += 1
+                        
+                    if not pending:
+                        logger.info(f"Reached max pages limit ({max_pages})")
+                        return
+                        
+                    page_num, offset, future = pending.popleft()
+                    yield page_num, offset, future.result()
+            finally:
+                # Drop prefetched offsets beyond the end of the data
+                for _, _, future in pending:
+                    future.cancel()
+                    
     def close(self):
-        """Close the HTTP session."""
-        self.session.close()
+        """Close all HTTP sessions."""
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+            self._idle_sessions = []
@@ -0,0 +1,87 @@
+"""
+JSON Codec
+Decodes API responses with orjson when it is installed, and with the
+standard library json module otherwise. Both backends produce the same
+values, so a build does not depend on which one is available. Payloads are
+always encoded with the json module, in the format payload_json has always
+had.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Name of the active backend
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+# orjson decodes integers beyond 64 bits as float (the json module keeps
+# them int). Such integers need at least 19 digits; documents with a digit
+# run that long are found by mapping digits to '0' and everything else to
+# ' ' (bytes.translate is much faster than a regular expression here).
+_DIGIT_MASK = bytes(ord('0') if i in b'0123456789' else ord(' ') for i in range(256))
+_LONG_DIGITS = b'0' * 19
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode a JSON document.
+    
+    Input orjson rejects but the json module accepts (NaN, Infinity, lone
+    surrogates), and documents with a run of 19 or more digits (a possible
+    integer beyond 64 bits), are decoded with the json module.
+    
+    Args:
+        data: UTF-8 encoded JSON document
+        
+    Returns:
+        Decoded value
+        
+    Raises:
+        ValueError: If data is not valid JSON
+    """
+    if orjson is not None and not _has_long_digits(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _has_long_digits(data: Union[bytes, str]) -> bool:
+    """
+    Check if a document has a run of digits that may be an integer beyond
+    64 bits.
+    
+    Args:
+        data: UTF-8 encoded JSON document
+        
+    Returns:
+        True if 19 or more ASCII digits follow each other
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    return _LONG_DIGITS in data.translate(_DIGIT_MASK)
+
+
+def dumps(obj: Dict[str, Any], sort_keys: bool = False) -> str:
+    """
+    Encode a dictionary like json.dumps(obj, ensure_ascii=False).
+    
+    orjson is not used, as it only writes compact separators, which would
+    change every stored payload.
+    
+    Args:
+        obj: Dictionary to encode
+        sort_keys: Write keys in sorted order instead of insertion order
+        
+    Returns:
+        JSON string
+    """
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys)
@@ -6,7 +6,9 @@ Loads reference data from CSV files into database tables.
 import csv
 import logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from .tracing import Tracer
 
 logger = logging.getLogger(__name__)
 
@@ -84,13 +86,35 @@ def load_static_lookups(db_manager, config: Dict[str, Any]) -> Dict[str, int]:
     return counts
 
 
-def enrich_tables_with_lookups(db_manager):
+def _execute_enrichment(db_manager, tracer: Optional[Tracer], target: str, sql: str) -> int:
+    """
+    Run one enrichment statement, traced as a span.
+    
+    Args:
+        db_manager: DatabaseManager instance
+        tracer: Tracer, or None
+        target: Table (and column) the statement fills in
+        sql: SQL statement
+        
+    Returns:
+        Number of rows changed
+    """
+    if tracer is None:
+        return db_manager.execute_update(sql)
+        
+    with tracer.span(f"enrich {target}", 'sql', sql=' '.join(sql.split())) as span:
+        span['rows'] = db_manager.execute_update(sql)
+    return span['rows']
+
+
+def enrich_tables_with_lookups(db_manager, tracer: Optional[Tracer] = None):
     """
     Enrich tables with lookup data after main data load.
     Fills in wirkstoff_name, hinweis_text, website, etc.
     
     Args:
         db_manager: DatabaseManager instance
+        tracer: Optional tracer recording a span per SQL statement
     """
     logger.info("Enriching tables with lookup data")
     
@@ -104,7 +128,7 @@ def enrich_tables_with_lookups(db_manager):
     )
     WHERE wirkstoff_kode IS NOT NULL
     """
-    count = db_manager.execute_update(sql)
+    count = _execute_enrichment(db_manager, tracer, 'bvl_mittel_wirkstoff.wirkstoff_name', sql)
     logger.info(f"Updated {count} wirkstoff names in bvl_mittel_wirkstoff")
     
     # Enrich mittel_ghs_gefahrenhinweis with hinweis_text
@@ -117,7 +141,7 @@ def enrich_tables_with_lookups(db_manager):
     )
     WHERE hinweis_kode IS NOT NULL
     """
-    count = db_manager.execute_update(sql)
+    count = _execute_enrichment(db_manager, tracer, 'bvl_mittel_ghs_gefahrenhinweis.hinweis_text', sql)
     logger.info(f"Updated {count} hinweis texts in bvl_mittel_ghs_gefahrenhinweis")
     
     # Enrich mittel_vertrieb with website
@@ -130,7 +154,7 @@ def enrich_tables_with_lookups(db_manager):
     )
     WHERE hersteller_name IS NOT NULL
     """
-    count = db_manager.execute_update(sql)
+    count = _execute_enrichment(db_manager, tracer, 'bvl_mittel_vertrieb.website', sql)
     logger.info(f"Updated {count} websites in bvl_mittel_vertrieb")
     
     # Populate bvl_lookup_kultur from bvl_kode (kodeliste 51 = KLTGR/Kulturen)
@@ -140,7 +164,7 @@ def enrich_tables_with_lookups(db_manager):
     FROM bvl_kode
     WHERE kodeliste = 51 AND sprache = 'DE'
     """
-    count = db_manager.execute_update(sql)
+    count = _execute_enrichment(db_manager, tracer, 'bvl_lookup_kultur', sql)
     logger.info(f"Populated {count} kultur lookups from bvl_kode")
     
     # Populate bvl_lookup_schadorg from bvl_kode (kodeliste 52 = SOORCD/Schadorganismen)
@@ -150,7 +174,7 @@ def enrich_tables_with_lookups(db_manager):
     FROM bvl_kode
     WHERE kodeliste = 52 AND sprache = 'DE'
     """
-    count = db_manager.execute_update(sql)
+    count = _execute_enrichment(db_manager, tracer, 'bvl_lookup_schadorg', sql)
     logger.info(f"Populated {count} schadorg lookups from bvl_kode")
     
     logger.info("Enrichment completed")
@@ -5,12 +5,20 @@ Manifest generation utilities.
 import json
 import hashlib
 import logging
+import sqlite3
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Tuple
 import sys
 
+from .compression import CHUNK_DIR
+from .delta import IGNORED_COLUMNS
+
 logger = logging.getLogger(__name__)
 
+# Tables describing the build rather than the data
+CONTENT_HASH_EXCLUDED_TABLES = ('bvl_meta', 'bvl_sync_log', 'bvl_sync_stage')
+
 
 def calculate_sha256(file_path: str) -> str:
     """Calculate SHA256 hash of file."""
@@ -21,38 +29,127 @@ def calculate_sha256(file_path: str) -> str:
     return sha256_hash.hexdigest()
 
 
+def calculate_content_hashes(db_path: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Calculate a hash of the logical database contents.
+    
+    Each table is hashed over its column names and its rows in primary key
+    order, so the result does not depend on the SQLite page layout. Build
+    metadata tables and updated_at columns are left out.
+    
+    Args:
+        db_path: Path to SQLite database
+        
+    Returns:
+        Tuple of (combined hash, hash per table)
+    """
+    conn = sqlite3.connect(db_path)
+    table_hashes = {}
+    
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        
+        for table in tables:
+            if table in CONTENT_HASH_EXCLUDED_TABLES:
+                continue
+                
+            info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+            columns = [row[1] for row in info if row[1] not in IGNORED_COLUMNS]
+            key = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5]]
+            
+            table_hash = hashlib.sha256()
+            table_hash.update(json.dumps(columns).encode('utf-8'))
+            
+            cursor = conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} ORDER BY {', '.join(key or columns)}"
+            )
+            for row in cursor:
+                line = json.dumps(row, ensure_ascii=False, separators=(',', ':'), default=_encode_value)
+                table_hash.update(b'\n' + line.encode('utf-8'))
+                
+            table_hashes[table] = table_hash.hexdigest()
+    finally:
+        conn.close()
+        
+    combined = hashlib.sha256()
+    for table, table_hash in table_hashes.items():
+        combined.update(f"{table}:{table_hash}\n".encode('utf-8'))
+        
+    return combined.hexdigest(), table_hashes
+
+
+def _encode_value(value):
+    """Encode BLOB values for the content hash."""
+    if isinstance(value, bytes):
+        return {'blob': value.hex()}
+    raise TypeError(f"Cannot hash value of type {type(value).__name__}")
+
+
 def generate_manifest(
     db_path: str,
     output_dir: str,
     compression_results: dict,
     table_counts: dict,
     build_info: dict,
-    base_url: str = "https://abbas-hoseiny.github.io/pflanzenschutz-db"
+    base_url: str = "https://abbas-hoseiny.github.io/pflanzenschutz-db",
+    deltas: list = None,
+    content_hashes: Tuple[str, Dict[str, str]] = None,
+    chunks: dict = None,
+    packages: list = None
 ) -> str:
     """
     Generate manifest.json with metadata about the build.
     
-    Note: Only compressed files (.sqlite.br, .sqlite.zip) are included in manifest
+    Note: Only compressed files (.sqlite.br, .sqlite.zip, .sqlite.zst) are included in manifest
     because uncompressed .sqlite exceeds GitHub's 100MB file limit.
+    
+    Deltas are SQL changesets from an earlier build (identified by its
+    content hash) to this one.
+    
+    Chunks are the uncompressed database split into fixed-size pieces, each
+    Brotli-compressed and named by the SHA256 of its content and the
+    encoder settings. Concatenating
+    the decompressed chunks in order yields the database.
+    
+    Packages are separate databases per table group, each with its own
+    content hash, so clients can load and refresh groups independently.
+    
+    build_info may list the build stages (StageProfiler records), which are
+    published as build.stages.
     """
     logger.info("Generating manifest.json")
     
+    if content_hashes is None:
+        content_hashes = calculate_content_hashes(db_path)
+    content_hash, table_hashes = content_hashes
+    
     manifest = {
         "$schema": "https://json-schema.org/draft/2020-12/schema",
         "version": "1.0.0",
         "api_version": build_info.get('api_version', 'v1'),
+        "api_stand": build_info.get('api_stand'),
+        "hash": content_hash,
         "generated_at": datetime.utcnow().isoformat() + 'Z',
         "files": [],
         "tables": table_counts,
+        "table_hashes": table_hashes,
         "build": {
             "start_time": build_info.get('start_time', ''),
             "end_time": build_info.get('end_time', ''),
             "duration_seconds": build_info.get('duration_seconds', 0),
             "python_version": sys.version.split()[0],
+            "compression_profile": build_info.get('compression_profile', 'default'),
             "runner": build_info.get('runner', 'local')
         }
     }
     
+    # Per-stage timings, rows, request counters and peak memory
+    if build_info.get('stages'):
+        manifest['build']['stages'] = build_info['stages']
+        
     # Skip uncompressed .sqlite file - exceeds GitHub 100MB limit
     # App will use .sqlite.br (preferred) or .sqlite.zip (fallback)
     
@@ -62,24 +159,102 @@ def generate_manifest(
         manifest['files'].append({
             "name": brotli_path.name,
             "url": f"{base_url}/{brotli_path.name}",
-            "size": brotli_path.stat().st_size,
-            "sha256": calculate_sha256(str(brotli_path)),
+            "size": compression_results.get('brotli_size') or brotli_path.stat().st_size,
+            "sha256": compression_results.get('brotli_sha256') or calculate_sha256(str(brotli_path)),
             "encoding": "brotli",
             "type": "sqlite"
         })
-    
+        
     # Add ZIP file (fallback format)
     if 'zip' in compression_results:
         zip_path = Path(compression_results['zip'])
         manifest['files'].append({
             "name": zip_path.name,
             "url": f"{base_url}/{zip_path.name}",
-            "size": zip_path.stat().st_size,
-            "sha256": calculate_sha256(str(zip_path)),
+            "size": compression_results.get('zip_size') or zip_path.stat().st_size,
+            "sha256": compression_results.get('zip_sha256') or calculate_sha256(str(zip_path)),
             "encoding": "zip",
             "type": "sqlite"
         })
-    
+        
+    # Add zstd file (fastest to decode), with the dictionary needed to decode it
+    if 'zstd' in compression_results:
+        zstd_path = Path(compression_results['zstd'])
+        entry = {
+            "name": zstd_path.name,
+            "url": f"{base_url}/{zstd_path.name}",
+            "size": compression_results.get('zstd_size') or zstd_path.stat().st_size,
+            "sha256": compression_results.get('zstd_sha256') or calculate_sha256(str(zstd_path)),
+            "encoding": "zstd",
+            "type": "sqlite"
+        }
+        if 'zstd_window_log' in compression_results:
+            entry['window_log'] = compression_results['zstd_window_log']
+        if 'zstd_dict' in compression_results:
+            dict_path = Path(compression_results['zstd_dict'])
+            entry['dictionary'] = {
+                "name": dict_path.name,
+                "url": f"{base_url}/{dict_path.name}",
+                "size": compression_results['zstd_dict_size'],
+                "sha256": compression_results['zstd_dict_sha256']
+            }
+        manifest['files'].append(entry)
+        
+    # Add delta patches from previous builds
+    if deltas:
+        manifest['deltas'] = []
+        for delta in deltas:
+            delta_path = Path(delta['path'])
+            manifest['deltas'].append({
+                "name": delta_path.name,
+                "url": f"{base_url}/{delta_path.name}",
+                "from_hash": delta['from_hash'],
+                "to_hash": delta['to_hash'],
+                "size": delta_path.stat().st_size,
+                "sha256": calculate_sha256(str(delta_path)),
+                "encoding": "brotli",
+                "type": "sql"
+            })
+            
+    # Add table group packages
+    if packages:
+        manifest['packages'] = []
+        for package in packages:
+            package_path = Path(package['brotli']['path'])
+            manifest['packages'].append({
+                "group": package['group'],
+                "hash": package['hash'],
+                "tables": package['tables'],
+                "name": package_path.name,
+                "url": f"{base_url}/{package_path.name}",
+                "size": package['brotli']['size'],
+                "sha256": package['brotli']['sha256'],
+                "raw_size": package['raw_size'],
+                "encoding": "brotli",
+                "type": "sqlite"
+            })
+            
+    # Add content-addressed chunks
+    if chunks:
+        manifest['chunks'] = {
+            "chunk_size": chunks['chunk_size'],
+            "size": chunks['size'],
+            "sha256": chunks['sha256'],
+            "encoding": "brotli",
+            "type": "sqlite",
+            "files": [
+                {
+                    "name": chunk['name'],
+                    "url": f"{base_url}/{CHUNK_DIR}/{chunk['name']}",
+                    "offset": chunk['offset'],
+                    "size": chunk['size'],
+                    "sha256": chunk['sha256'],
+                    "compressed_size": chunk['compressed_size']
+                }
+                for chunk in chunks['chunks']
+            ]
+        }
+        
     # Write manifest
     manifest_path = Path(output_dir) / "manifest.json"
     with open(manifest_path, 'w', encoding='utf-8') as f:
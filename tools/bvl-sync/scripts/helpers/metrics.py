@@ -0,0 +1,226 @@
+"""
+Prometheus Textfile Export
+Renders sync metrics in the Prometheus text exposition format (0.0.4), the
+format the node-exporter textfile collector reads, and writes them
+atomically.
+"""
+
+import logging
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Metric types with the sample suffixes they may use
+METRIC_TYPES = {
+    'counter': ('',),
+    'gauge': ('',),
+    'histogram': ('_bucket', '_sum', '_count')
+}
+
+# Suffix appended to counter names, which the 0.0.4 format carries in the
+# TYPE line as well as in the samples
+COUNTER_SUFFIX = '_total'
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value (integers without a fraction, +Inf/-Inf/NaN)."""
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def _escape_label(value: Any) -> str:
+    """Escape a label value."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    """Escape a HELP text."""
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+class MetricFamily:
+    """One metric with its type, help text and samples."""
+    
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        """
+        Initialize metric family.
+        
+        Args:
+            name: Metric name (counters without _total, which is added)
+            metric_type: 'counter', 'gauge' or 'histogram'
+            help_text: Description for the HELP line
+            
+        Raises:
+            ValueError: If the metric type is not supported
+        """
+        if metric_type not in METRIC_TYPES:
+            raise ValueError(f"Unsupported metric type: {metric_type}")
+            
+        self.name = name + COUNTER_SUFFIX if metric_type == 'counter' else name
+        self.type = metric_type
+        self.help = help_text
+        self.samples: List[Tuple[str, Dict[str, Any], float]] = []
+        
+    def add(self, value: float, **labels: Any):
+        """
+        Add a counter or gauge sample.
+        
+        Args:
+            value: Sample value
+            **labels: Label name -> value
+        """
+        self.samples.append((METRIC_TYPES[self.type][0], labels, value))
+        
+    def add_histogram(
+        self,
+        buckets: Sequence[float],
+        counts: Sequence[int],
+        total: float,
+        **labels: Any
+    ):
+        """
+        Add the samples of one histogram.
+        
+        Args:
+            buckets: Upper bounds of the finite buckets, ascending
+            counts: Observations per bucket (not cumulative), with one more
+                entry than buckets for the +Inf bucket
+            total: Sum of all observations
+            **labels: Label name -> value
+        """
+        cumulative = 0
+        for bound, count in zip(list(buckets) + [math.inf], counts):
+            cumulative += count
+            self.samples.append(('_bucket', dict(labels, le=_format_value(float(bound))), cumulative))
+        self.samples.append(('_count', labels, cumulative))
+        self.samples.append(('_sum', labels, total))
+        
+    def render(self) -> List[str]:
+        """
+        Render the family.
+        
+        Returns:
+            HELP and TYPE lines followed by the samples
+        """
+        lines = [f"# HELP {self.name} {_escape_help(self.help)}", f"# TYPE {self.name} {self.type}"]
+        
+        for suffix, labels, value in self.samples:
+            label_text = ''
+            if labels:
+                label_text = '{' + ','.join(f'{key}="{_escape_label(val)}"' for key, val in labels.items()) + '}'
+            lines.append(f"{self.name}{suffix}{label_text} {_format_value(value)}")
+            
+        return lines
+
+
+def render_metrics(families: List[MetricFamily]) -> str:
+    """
+    Render metric families in the Prometheus text format (0.0.4).
+    
+    Families without samples are left out.
+    
+    Args:
+        families: Metric families
+        
+    Returns:
+        Exposition text ending with a newline
+    """
+    lines = []
+    for family in families:
+        if family.samples:
+            lines.extend(family.render())
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(path: str, families: List[MetricFamily]):
+    """
+    Write metric families to a textfile, atomically replacing it.
+    
+    The text is written to <path>.tmp first, which the textfile collector
+    ignores as it only reads *.prom files.
+    
+    Args:
+        path: Textfile path (should end with .prom)
+        families: Metric families
+    """
+    path_obj = Path(path)
+    path_obj.parent.mkdir(parents=True, exist_ok=True)
+    
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(render_metrics(families))
+    os.replace(tmp_file, path)
+
+
+def read_sample(path: str, name: str) -> Optional[float]:
+    """
+    Read an unlabelled sample from an existing textfile.
+    
+    Used to carry values such as the last success timestamp over runs that
+    did not succeed.
+    
+    Args:
+        path: Textfile path
+        name: Sample name
+        
+    Returns:
+        Sample value, or None if the file or sample does not exist
+    """
+    if not os.path.exists(path):
+        return None
+        
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[0] == name:
+                    return float(parts[1])
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read {name} from {path}: {e}")
+    return None
+
+
+class PeriodicWriter:
+    """Calls a write function at a fixed interval on a daemon thread."""
+    
+    def __init__(self, interval: float, write: Callable[[], None]):
+        """
+        Initialize writer.
+        
+        Args:
+            interval: Seconds between two writes
+            write: Function writing the textfile
+        """
+        self.interval = interval
+        self.write = write
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='bvl-metrics', daemon=True)
+        
+    def start(self):
+        """Start writing."""
+        self._thread.start()
+        
+    def stop(self):
+        """Stop writing and wait for a running write to finish."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+            
+    def _run(self):
+        """Write until stopped; failed writes are logged and retried."""
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write()
+            except Exception as e:
+                logger.warning(f"Writing metrics failed: {e}")
@@ -0,0 +1,188 @@
+"""
+Table group packages.
+Splits the built database into one SQLite file per table group so clients
+can load the core tables first and fetch the rest on demand.
+"""
+
+import logging
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .compression import compress_brotli
+from .manifest import calculate_content_hashes
+
+logger = logging.getLogger(__name__)
+
+# Group receiving every table that is not listed in the configuration
+OTHER_GROUP = 'other'
+
+
+def assign_table_groups(tables: List[str], groups: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Assign every table of the database to exactly one group.
+    
+    Listed tables missing from the database are skipped. Tables not listed
+    in any group go to OTHER_GROUP.
+    
+    Args:
+        tables: Tables of the database
+        groups: Configured group name -> table names
+        
+    Returns:
+        Group name -> tables in the database, in configuration order
+        (empty groups are left out)
+        
+    Raises:
+        ValueError: If a table is listed in more than one group
+    """
+    assigned = {}
+    for group, group_tables in groups.items():
+        for table in group_tables:
+            if table in assigned:
+                raise ValueError(f"Table {table} is listed in groups {assigned[table]} and {group}")
+            assigned[table] = group
+            
+    result = {group: [] for group in groups}
+    for table in tables:
+        result.setdefault(assigned.get(table, OTHER_GROUP), []).append(table)
+        
+    missing = sorted(set(assigned) - set(tables))
+    if missing:
+        logger.warning(f"Tables of table groups not in database: {', '.join(missing)}")
+        
+    return {group: group_tables for group, group_tables in result.items() if group_tables}
+
+
+def build_package(db_path: str, output_path: str, tables: List[str]) -> Dict[str, int]:
+    """
+    Copy tables with their indexes, triggers and views into a new database.
+    
+    A view is only copied if every table it reads is part of the package.
+    The package is written from an empty file in a fixed order, so the same
+    data gives a byte-identical package.
+    
+    Args:
+        db_path: Path to the full database
+        output_path: Path to the package database (replaced if it exists)
+        tables: Tables to copy
+        
+    Returns:
+        Table name -> row count
+    """
+    Path(output_path).unlink(missing_ok=True)
+    
+    conn = sqlite3.connect(output_path)
+    counts = {}
+    
+    try:
+        conn.execute("ATTACH DATABASE ? AS src", (db_path,))
+        page_size = conn.execute("PRAGMA src.page_size").fetchone()[0]
+        conn.execute(f"PRAGMA main.page_size = {page_size}")
+        
+        placeholders = ', '.join('?' * len(tables))
+        objects = conn.execute(
+            f"SELECT type, name, tbl_name, sql FROM src.sqlite_master "
+            f"WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+            f"AND (type = 'view' OR tbl_name IN ({placeholders})) "
+            f"ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 "
+            f"WHEN 'trigger' THEN 2 ELSE 3 END, name",
+            tables
+        ).fetchall()
+        
+        with conn:
+            for kind, name, table, sql in objects:
+                if kind == 'table':
+                    conn.execute(sql)
+                    conn.execute(f"INSERT INTO main.{name} SELECT * FROM src.{name}")
+                    counts[name] = conn.execute(f"SELECT COUNT(*) FROM main.{name}").fetchone()[0]
+                elif kind != 'view':
+                    conn.execute(sql)
+                    
+        conn.execute("DETACH DATABASE src")
+        
+        # Views are checked once the source is gone, so a view reading a
+        # table of another group cannot resolve against it
+        for kind, name, table, sql in objects:
+            if kind != 'view':
+                continue
+            conn.execute(sql)
+            try:
+                conn.execute(f"SELECT * FROM {name} LIMIT 0")
+            except sqlite3.OperationalError:
+                conn.execute(f"DROP VIEW {name}")
+                
+        conn.commit()
+    finally:
+        conn.close()
+        
+    return counts
+
+
+def create_packages(
+    db_path: str,
+    output_dir: str,
+    groups: Dict[str, List[str]],
+    quality: int = 11,
+    lgwin: int = 22,
+    processes: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Write one Brotli-compressed database per table group.
+    
+    Packages are named <db stem>-<group>.sqlite.br. The uncompressed
+    package files are removed after compression.
+    
+    Args:
+        db_path: Path to the full database
+        output_dir: Output directory
+        groups: Configured group name -> table names
+        quality: Brotli compression quality
+        lgwin: Brotli window size (log2)
+        processes: Number of worker processes (None = CPU count,
+            1 = compress serially in this process)
+            
+    Returns:
+        Package descriptions (group, tables, row counts, content hash and
+        compression result) in group order
+    """
+    db_path_obj = Path(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+    finally:
+        conn.close()
+        
+    packages = []
+    for group, group_tables in assign_table_groups(tables, groups).items():
+        package_path = Path(output_dir) / f"{db_path_obj.stem}-{group}{db_path_obj.suffix}"
+        counts = build_package(db_path, str(package_path), group_tables)
+        packages.append({
+            'group': group,
+            'path': str(package_path),
+            'tables': counts,
+            'hash': calculate_content_hashes(str(package_path))[0],
+            'raw_size': package_path.stat().st_size
+        })
+        
+    jobs = [(package['path'], f"{package['path']}.br", quality, lgwin) for package in packages]
+    
+    if processes == 1 or len(jobs) <= 1:
+        results = [compress_brotli(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(compress_brotli, *zip(*jobs)))
+            
+    for package, result in zip(packages, results):
+        Path(package['path']).unlink()
+        package['brotli'] = result
+        logger.info(
+            f"Package {package['group']}: {len(package['tables'])} tables, "
+            f"{package['raw_size']:,} -> {result['size']:,} bytes"
+        )
+        
+    return packages
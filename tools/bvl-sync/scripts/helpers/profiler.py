@@ -0,0 +1,142 @@
+"""
+Stage Profiler
+Times the stages of a build and records rows, request counters and peak
+memory per stage for bvl_sync_stage and the manifest.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .tracing import Tracer
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """
+    Get the peak resident set size.
+    
+    Args:
+        children: Report the largest terminated child process (compression
+            workers) instead of this process
+            
+    Returns:
+        Peak RSS in MB, or None where the resource module is unavailable
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in KiB on Linux
+    return round(usage.ru_maxrss / 1024, 1)
+
+
+class StageProfiler:
+    """
+    Collects one record per build stage.
+    
+    Each record has the stage name, its start relative to the profiler's
+    creation, duration, status, any details the stage adds (rows, requests,
+    retries, bytes, ...), rows per second and the peak RSS so far. Stages
+    are also traced as spans if a tracer is given.
+    """
+    
+    def __init__(self, tracer: Optional[Tracer] = None):
+        self.stages: List[Dict[str, Any]] = []
+        self.tracer = tracer or Tracer(enabled=False)
+        self._origin = time.perf_counter()
+        
+    @contextmanager
+    def stage(self, name: str, **details: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a stage.
+        
+        The yielded dictionary takes further details. A stage left by an
+        exception gets status 'error' unless it set a status itself.
+        
+        Args:
+            name: Stage name
+            **details: Initial details
+            
+        Yields:
+            Details of the stage
+        """
+        start = time.perf_counter()
+        status = 'success'
+        
+        try:
+            yield details
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            details.setdefault('status', status)
+            self.add(name, time.perf_counter() - start, start=start, **details)
+            
+    def add(
+        self,
+        name: str,
+        seconds: float,
+        start: Optional[float] = None,
+        track: Optional[str] = None,
+        **details: Any
+    ) -> Dict[str, Any]:
+        """
+        Record a stage timed elsewhere.
+        
+        Args:
+            name: Stage name
+            seconds: Duration in seconds
+            start: time.perf_counter() value at the stage start (default:
+                `seconds` before now)
+            track: Trace track for a stage that did not run on the calling
+                thread
+            **details: Details of the stage
+            
+        Returns:
+            The stage record
+        """
+        if start is None:
+            start = time.perf_counter() - seconds
+            
+        record = {
+            'stage': name,
+            'start_seconds': round(start - self._origin, 3),
+            'duration_seconds': round(seconds, 3),
+            'status': details.pop('status', 'success')
+        }
+        record.update(details)
+        
+        if record.get('rows') and seconds > 0:
+            record['rows_per_second'] = round(record['rows'] / seconds)
+        record['peak_rss_mb'] = peak_rss_mb()
+        
+        self.stages.append(record)
+        self.tracer.add(
+            name,
+            'stage',
+            start,
+            seconds,
+            track=track,
+            **{key: value for key, value in record.items() if key not in ('stage', 'start_seconds', 'duration_seconds')}
+        )
+        logger.debug(f"Stage {name}: {seconds:.3f}s")
+        return record
+        
+    def summary(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Get the slowest stages.
+        
+        Args:
+            limit: Number of stages
+            
+        Returns:
+            Stage records ordered by duration, slowest first
+        """
+        return sorted(self.stages, key=lambda record: record['duration_seconds'], reverse=True)[:limit]
@@ -0,0 +1,312 @@
+"""
+Staged ETL Runner
+Connects fetcher threads, a mapper thread and the consuming writer with
+bounded queues, so downloading, mapping and SQLite writes overlap.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default number of pages buffered between two stages (per endpoint for
+# the fetcher queues)
+DEFAULT_QUEUE_SIZE = 4
+
+# Seconds between checks for cancellation while blocked on a full queue
+_POLL_SECONDS = 0.1
+
+# Stage names in pipeline order
+STAGES = ('fetch', 'map', 'write')
+
+# Marks the end of the pages of one key
+_END = object()
+
+
+class StageFailure:
+    """Exception raised in a stage, passed down to the writer."""
+    
+    def __init__(self, stage: str, error: BaseException):
+        self.stage = stage
+        self.error = error
+
+
+class StageCancelled(Exception):
+    """Raised in a producer when the consumer has stopped the pipeline."""
+
+
+class StageCounter:
+    """Thread-safe throughput counters of one stage."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.pages = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.idle_seconds = 0.0
+        self._lock = threading.Lock()
+        
+    def add(self, rows: int, busy: float):
+        """Count one processed page."""
+        with self._lock:
+            self.pages += 1
+            self.rows += rows
+            self.busy_seconds += busy
+            
+    def add_blocked(self, seconds: float):
+        """Count time spent waiting for room in the next queue."""
+        with self._lock:
+            self.blocked_seconds += seconds
+            
+    def add_idle(self, seconds: float):
+        """Count time spent waiting for input."""
+        with self._lock:
+            self.idle_seconds += seconds
+            
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the counters.
+        
+        Returns:
+            Dictionary with pages, rows, busy/blocked/idle seconds and rows
+            per busy second
+        """
+        with self._lock:
+            return {
+                'pages': self.pages,
+                'rows': self.rows,
+                'busy_seconds': round(self.busy_seconds, 3),
+                'blocked_seconds': round(self.blocked_seconds, 3),
+                'idle_seconds': round(self.idle_seconds, 3),
+                'rows_per_second': round(self.rows / self.busy_seconds) if self.busy_seconds else None
+            }
+
+
+class StagedRunner:
+    """
+    Run fetch → map → write with bounded queues between the stages.
+    
+    Keys (endpoints) are fetched by `workers` threads in key order, each
+    into its own bounded queue. A single mapper thread maps the pages of one
+    key after the other into the writer queue, and the consumer iterating
+    the runner is the writer. Full queues block the producing stage
+    (back-pressure), so at most about queue_size pages per stage are held in
+    memory. Exceptions of the fetch and map stages are re-raised from the
+    writer's page iterator of the affected key.
+    
+    The writer runs on the thread iterating the runner, which therefore
+    stays the only thread touching the database.
+    """
+    
+    def __init__(
+        self,
+        keys: List[Hashable],
+        fetch: Callable[[Hashable], Iterable[List[Any]]],
+        map_page: Callable[[Hashable, List[Any]], List[Any]],
+        workers: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE
+    ):
+        """
+        Initialize runner.
+        
+        Args:
+            keys: Keys in the order the writer consumes them
+            fetch: Callable returning the raw pages of a key
+            map_page: Callable mapping one raw page of a key
+            workers: Number of fetcher threads
+            queue_size: Maximum number of pages per queue
+        """
+        self.keys = list(keys)
+        self.fetch = fetch
+        self.map_page = map_page
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.counters = {name: StageCounter(name) for name in STAGES}
+        self.key_counters = {key: {name: StageCounter(name) for name in STAGES} for key in self.keys}
+        self._fetch_queues = {key: queue.Queue(maxsize=self.queue_size) for key in self.keys}
+        self._write_queue = queue.Queue(maxsize=self.queue_size)
+        self._closed = threading.Event()
+        
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the throughput counters of all stages.
+        
+        Returns:
+            Stage name -> counters
+        """
+        return {name: counter.as_dict() for name, counter in self.counters.items()}
+        
+    def key_stats(self, key: Hashable) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the throughput counters of all stages for one key.
+        
+        Args:
+            key: Key passed to the runner
+            
+        Returns:
+            Stage name -> counters
+        """
+        return {name: counter.as_dict() for name, counter in self.key_counters[key].items()}
+        
+    def _count(self, stage: str, key: Hashable, rows: int, busy: float):
+        """Count one page of a key in a stage."""
+        self.counters[stage].add(rows, busy)
+        self.key_counters[key][stage].add(rows, busy)
+        
+    def __iter__(self) -> Iterator[Tuple[Hashable, Iterator[List[Any]]]]:
+        """
+        Start the stages and hand the mapped pages to the writer.
+        
+        Each key's page iterator must be consumed before the next key is
+        requested; pages left unconsumed are discarded.
+        
+        Yields:
+            (key, iterator over the mapped pages of the key) in key order
+        """
+        mapper = threading.Thread(target=self._run_mapper, name='bvl-map', daemon=True)
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bvl-fetch') as executor:
+            try:
+                for key in self.keys:
+                    executor.submit(self._run_fetcher, key)
+                mapper.start()
+                
+                for key in self.keys:
+                    pages = self._iter_key(key)
+                    yield key, pages
+                    # Skip what the writer left, so the next key lines up
+                    for _ in pages:
+                        pass
+            finally:
+                self._closed.set()
+                
+        if mapper.is_alive():
+            mapper.join()
+            
+    def _iter_key(self, key: Hashable) -> Iterator[List[Any]]:
+        """
+        Yield the mapped pages of one key from the writer queue.
+        
+        Raises:
+            Exception: The error of the fetch or map stage for this key
+        """
+        counter = self.counters['write']
+        
+        while True:
+            start = time.perf_counter()
+            item_key, item = self._write_queue.get()
+            counter.add_idle(time.perf_counter() - start)
+            
+            if item is _END:
+                return
+            if isinstance(item, StageFailure):
+                # Drain up to the end marker, then fail the key
+                while self._write_queue.get()[1] is not _END:
+                    pass
+                raise item.error
+                
+            start = time.perf_counter()
+            yield item
+            self._count('write', key, len(item), time.perf_counter() - start)
+            
+    def _put(self, target: queue.Queue, item: Any, counter: StageCounter):
+        """
+        Put an item into a bounded queue, waiting while it is full.
+        
+        Raises:
+            StageCancelled: If the runner was closed while waiting
+        """
+        start = time.perf_counter()
+        while True:
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                if self._closed.is_set():
+                    raise StageCancelled()
+        counter.add_blocked(time.perf_counter() - start)
+        
+    def _run_fetcher(self, key: Hashable):
+        """Fetch the pages of one key into its queue."""
+        target = self._fetch_queues[key]
+        counter = self.counters['fetch']
+        
+        try:
+            if self._closed.is_set():
+                return
+            pages = iter(self.fetch(key))
+            while True:
+                start = time.perf_counter()
+                page = next(pages, _END)
+                if page is _END:
+                    break
+                self._count('fetch', key, len(page), time.perf_counter() - start)
+                self._put(target, page, counter)
+        except StageCancelled:
+            return
+        except Exception as e:
+            logger.error(f"Fetch stage failed for {key}: {e}")
+            try:
+                self._put(target, StageFailure('fetch', e), counter)
+            except StageCancelled:
+                return
+                
+        try:
+            self._put(target, _END, counter)
+        except StageCancelled:
+            pass
+            
+    def _run_mapper(self):
+        """Map the pages of all keys in key order into the writer queue."""
+        counter = self.counters['map']
+        
+        try:
+            for key in self.keys:
+                source = self._fetch_queues[key]
+                failed = False
+                
+                while True:
+                    start = time.perf_counter()
+                    page = self._get(source)
+                    counter.add_idle(time.perf_counter() - start)
+                    
+                    if page is _END or isinstance(page, StageFailure):
+                        self._put(self._write_queue, (key, page), counter)
+                        if page is _END:
+                            break
+                        failed = True
+                        continue
+                    if failed:
+                        continue
+                        
+                    start = time.perf_counter()
+                    try:
+                        mapped = self.map_page(key, page)
+                    except Exception as e:
+                        logger.error(f"Map stage failed for {key}: {e}")
+                        self._put(self._write_queue, (key, StageFailure('map', e)), counter)
+                        failed = True
+                        continue
+                    self._count('map', key, len(mapped), time.perf_counter() - start)
+                    self._put(self._write_queue, (key, mapped), counter)
+        except StageCancelled:
+            pass
+            
+    def _get(self, source: queue.Queue) -> Any:
+        """
+        Get an item from a queue, waiting while it is empty.
+        
+        Raises:
+            StageCancelled: If the runner was closed while waiting
+        """
+        while True:
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if self._closed.is_set():
+                    raise StageCancelled()
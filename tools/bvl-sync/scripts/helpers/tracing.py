@@ -0,0 +1,152 @@
+"""
+Timeline Tracing
+Records spans (HTTP requests, mapping, inserts, SQL statements, build
+stages) and writes them as a Chrome trace JSON file for chrome://tracing
+or https://ui.perfetto.dev.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """
+    Collects complete events ("ph": "X") per thread.
+    
+    Spans of one thread must nest, as the trace viewers draw each thread as
+    one stack. Work timed elsewhere that overlaps (e.g. compression in
+    worker processes) is put on a named track of its own instead.
+    
+    A disabled tracer records nothing, so callers can trace unconditionally.
+    """
+    
+    def __init__(self, enabled: bool = True, process_name: str = 'bvl-sync'):
+        """
+        Initialize tracer.
+        
+        Args:
+            enabled: Record spans
+            process_name: Process name shown in the viewer
+        """
+        self.enabled = enabled
+        self.process_name = process_name
+        self.events: List[Dict[str, Any]] = []
+        self._tids: Dict[Hashable, int] = {}
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Trace a span on the calling thread.
+        
+        The yielded dictionary takes further arguments shown with the span.
+        A span left by an exception gets an 'error' argument.
+        
+        Args:
+            name: Span name
+            category: Category (http, etl, db, sql, stage, ...)
+            **args: Initial arguments
+            
+        Yields:
+            Arguments of the span
+        """
+        if not self.enabled:
+            yield args
+            return
+            
+        start = time.perf_counter()
+        try:
+            yield args
+        except Exception as e:
+            args['error'] = str(e)
+            raise
+        finally:
+            self.add(name, category, start, time.perf_counter() - start, **args)
+            
+    def add(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        seconds: float,
+        track: Optional[str] = None,
+        **args: Any
+    ):
+        """
+        Record a span timed elsewhere.
+        
+        Args:
+            name: Span name
+            category: Category
+            start: time.perf_counter() value at the span start
+            seconds: Duration in seconds
+            track: Track to put the span on (default: the calling thread)
+            **args: Arguments shown with the span
+        """
+        if not self.enabled:
+            return
+            
+        if track is None:
+            thread = threading.current_thread()
+            key, label = ('thread', thread.ident), thread.name
+        else:
+            key, label = ('track', track), track
+            
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((start - self._origin) * 1e6, 1),
+            'dur': round(seconds * 1e6, 1),
+            'pid': self._pid,
+            'args': args
+        }
+        
+        with self._lock:
+            if key not in self._tids:
+                self._tids[key] = len(self._tids) + 1
+                self.events.append({
+                    'name': 'thread_name',
+                    'ph': 'M',
+                    'pid': self._pid,
+                    'tid': self._tids[key],
+                    'args': {'name': label}
+                })
+            event['tid'] = self._tids[key]
+            self.events.append(event)
+            
+    def write(self, path: str) -> int:
+        """
+        Write the trace as Chrome trace JSON (JSON object format).
+        
+        Args:
+            path: Output file
+            
+        Returns:
+            Number of spans written
+        """
+        with self._lock:
+            events = list(self.events)
+            
+        process = {'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'tid': 0, 'args': {'name': self.process_name}}
+        
+        path_obj = Path(path)
+        path_obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': [process] + events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False, default=str)
+        os.replace(tmp_file, path)
+        
+        spans = sum(1 for event in events if event['ph'] == 'X')
+        logger.info(f"Trace with {spans} spans written to {path}")
+        return spans
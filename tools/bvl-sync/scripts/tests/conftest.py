@@ -0,0 +1,51 @@
+"""
+Shared fixtures for the HTTP client and response cache tests.
+"""
+
+import json
+import pytest
+import requests
+from scripts.helpers.http_cache import ResponseCache
+
+
+BASE_URL = "https://psm-api.bvl.bund.de/ords/psm/api-v1/"
+
+
+class FakeSession:
+    """Fake requests session answering conditional requests with 304."""
+    
+    def __init__(self, body, etag='"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+        
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        response = requests.Response()
+        if self.etag:
+            response.headers['ETag'] = self.etag
+        if self.etag is None or (headers and headers.get('If-None-Match') == self.etag):
+            response.status_code = 304
+        else:
+            response.status_code = 200
+            response._content = json.dumps(self.body).encode('utf-8')
+        return response
+        
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    """Make every HTTPClient send its requests to one FakeSession."""
+    session = FakeSession({'items': []})
+    monkeypatch.setattr(requests, 'Session', lambda: session)
+    return session
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create response cache in a temporary directory."""
+    cache = ResponseCache(str(tmp_path / 'cache'))
+    yield cache
+    cache.close()
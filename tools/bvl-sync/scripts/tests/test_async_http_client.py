@@ -0,0 +1,118 @@
+"""
+Unit tests for async HTTP client.
+"""
+
+import asyncio
+import threading
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from scripts.helpers.async_http_client import AsyncHTTPClient, ThreadedAsyncHTTPClient
+
+
+BASE_URL = "https://psm-api.bvl.bund.de/ords/psm/api-v1/"
+
+
+def make_client(total, **kwargs):
+    """Create client backed by a mock transport serving `total` records."""
+    requested = []
+    
+    def handler(request):
+        offset = int(request.url.params['offset'])
+        limit = int(request.url.params['limit'])
+        requested.append(offset)
+        items = [{"nr": i} for i in range(offset, min(offset + limit, total))]
+        return httpx.Response(200, json={"items": items})
+        
+    client = AsyncHTTPClient(BASE_URL, transport=httpx.MockTransport(handler), **kwargs)
+    return client, requested
+
+
+def test_build_url():
+    """Test URL building matches HTTPClient."""
+    client, _ = make_client(0)
+    assert client._build_url("/mittel") == BASE_URL + "mittel"
+    asyncio.run(client.aclose())
+
+
+def test_fetch_paginated_sequential():
+    """Test sequential pagination stops at the first short page."""
+    async def run():
+        client, requested = make_client(25)
+        async with client:
+            records = await client.fetch_paginated("awg", page_size=10)
+        return records, requested
+        
+    records, requested = asyncio.run(run())
+    assert [r["nr"] for r in records] == list(range(25))
+    assert requested == [0, 10, 20]
+
+
+def test_fetch_paginated_windowed():
+    """Test windowed prefetch returns records in offset order."""
+    async def run():
+        client, requested = make_client(95, max_in_flight=4)
+        async with client:
+            records = await client.fetch_paginated("awg", page_size=10)
+        return records, requested
+        
+    records, requested = asyncio.run(run())
+    assert [r["nr"] for r in records] == list(range(95))
+    assert len(requested) <= 10 + 3
+
+
+def test_get_returns_none_after_retries():
+    """Test failed requests are retried and then reported as None."""
+    calls = []
+    
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+        
+    async def run():
+        async with AsyncHTTPClient(
+            BASE_URL,
+            max_retries=2,
+            retry_delay=0,
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            return await client.get("stand")
+            
+    assert asyncio.run(run()) is None
+    assert len(calls) == 3
+
+
+def test_threaded_client_streams_pages_on_demand():
+    """Test pages are fetched as the caller iterates, from several threads."""
+    requested = []
+    
+    def handler(request):
+        offset = int(request.url.params.get('offset', 0))
+        requested.append((request.url.path.rsplit('/', 1)[-1], offset))
+        items = [{"nr": i} for i in range(offset, min(offset + 10, 25))]
+        return httpx.Response(200, json={"items": items})
+        
+    client = ThreadedAsyncHTTPClient(BASE_URL, transport=httpx.MockTransport(handler))
+    try:
+        pages = client.iter_pages("mittel", page_size=10)
+        assert [r["nr"] for r in next(pages)] == list(range(10))
+        assert requested == [("mittel", 0)]
+        
+        results = {}
+        threads = [
+            threading.Thread(target=lambda path=path: results.update({path: client.fetch_paginated(path, page_size=10)}))
+            for path in ("awg", "wirkstoff")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+            
+        assert [len(results[path]) for path in ("awg", "wirkstoff")] == [25, 25]
+        assert [len(page) for page in pages] == [10, 5]
+        assert client.get("stand") == {"items": [{"nr": i} for i in range(10)]}
+    finally:
+        client.close()
+        
+    assert not [thread for thread in threading.enumerate() if thread.name == 'bvl-httpx']
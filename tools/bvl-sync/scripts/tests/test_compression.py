@@ -0,0 +1,282 @@
+"""
+Unit tests for compression utilities.
+"""
+
+import hashlib
+import os
+import random
+import sqlite3
+import tracemalloc
+import zipfile
+import brotli
+import pytest
+from scripts.helpers.compression import (
+    CHUNK_SIZE, compress_brotli, compress_zip, compress_database, compress_chunks,
+    compress_zstd, train_zstd_dictionary, zstandard
+)
+
+requires_zstd = pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    """Create a compressible file spanning several chunks."""
+    rng = random.Random(42)
+    words = [os.urandom(4).hex() for _ in range(2000)]
+    data = ' '.join(rng.choice(words) for _ in range(400000)).encode('utf-8')
+    path = tmp_path / 'sample.sqlite'
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def sample_db(tmp_path):
+    """Create a small SQLite database with two tables."""
+    path = tmp_path / 'sample_db.sqlite'
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE mittel (kennr TEXT PRIMARY KEY, name TEXT, payload_json TEXT)")
+    conn.execute("CREATE TABLE awg (awg_id TEXT PRIMARY KEY, kennr TEXT, kultur TEXT)")
+    conn.executemany("INSERT INTO mittel VALUES (?, ?, ?)", [
+        (f'0241{i:04d}-00', f'Produkt {i}', f'{{"kennr": "0241{i:04d}-00", "formulierung": "EC"}}')
+        for i in range(3000)
+    ])
+    conn.executemany("INSERT INTO awg VALUES (?, ?, ?)", [
+        (f'0241{i:04d}-00/00-001', f'0241{i:04d}-00', 'Winterweizen')
+        for i in range(3000)
+    ])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_compress_brotli_matches_one_shot(sample_file):
+    """Test streaming output is identical to brotli.compress and hashes are correct."""
+    data = sample_file.read_bytes()
+    assert len(data) > 2 * CHUNK_SIZE
+    
+    result = compress_brotli(str(sample_file), quality=5)
+    compressed = (sample_file.parent / 'sample.sqlite.br').read_bytes()
+    
+    assert compressed == brotli.compress(data, quality=5)
+    assert result['size'] == len(compressed)
+    assert result['sha256'] == hashlib.sha256(compressed).hexdigest()
+    assert result['input_size'] == len(data)
+    assert result['input_sha256'] == hashlib.sha256(data).hexdigest()
+
+
+def test_compress_brotli_bounded_memory(sample_file, tmp_path):
+    """Test memory use is bounded by the chunk size, not the file size."""
+    large_file = tmp_path / 'large.sqlite'
+    large_file.write_bytes(sample_file.read_bytes() * 4)
+    
+    tracemalloc.start()
+    try:
+        compress_brotli(str(large_file), quality=1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        
+    assert large_file.stat().st_size > 10 * CHUNK_SIZE
+    assert peak < 3 * CHUNK_SIZE
+
+
+def test_compress_zip_matches_zipfile(sample_file, tmp_path):
+    """Test the archive is the one ZipFile.write() produces at level 9."""
+    result = compress_zip(str(sample_file), str(tmp_path / 'a.zip'))
+    
+    with zipfile.ZipFile(tmp_path / 'b.zip', 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        zf.write(sample_file, 'sample.sqlite')
+        
+    archive = (tmp_path / 'a.zip').read_bytes()
+    assert archive == (tmp_path / 'b.zip').read_bytes()
+    assert result['sha256'] == hashlib.sha256(archive).hexdigest()
+    assert result['size'] == len(archive)
+
+
+def test_compress_zip_fixed_date_time(sample_file, tmp_path):
+    """Test a fixed timestamp gives the same archive as writestr at level 9."""
+    result = compress_zip(str(sample_file), str(tmp_path / 'a.zip'), date_time=(1980, 1, 1, 0, 0, 0))
+    
+    info = zipfile.ZipInfo('sample.sqlite', date_time=(1980, 1, 1, 0, 0, 0))
+    info.external_attr = 0o644 << 16
+    with zipfile.ZipFile(tmp_path / 'b.zip', 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        zf.writestr(info, sample_file.read_bytes(), zipfile.ZIP_DEFLATED, 9)
+        
+    archive = (tmp_path / 'a.zip').read_bytes()
+    assert archive == (tmp_path / 'b.zip').read_bytes()
+    assert result['sha256'] == hashlib.sha256(archive).hexdigest()
+    assert result['size'] == len(archive)
+
+
+@pytest.mark.parametrize('processes', [None, 1])
+def test_compress_database_results(sample_file, tmp_path, processes):
+    """Test parallel and serial compression report sizes and hashes of all outputs."""
+    small_file = tmp_path / 'small.sqlite'
+    small_file.write_bytes(sample_file.read_bytes()[:100000])
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    
+    results = compress_database(str(small_file), str(out_dir), processes=processes)
+    
+    for encoding in ('brotli', 'zip'):
+        data = open(results[encoding], 'rb').read()
+        assert results[f'{encoding}_size'] == len(data)
+        assert results[f'{encoding}_sha256'] == hashlib.sha256(data).hexdigest()
+    assert results['original_sha256'] == hashlib.sha256(small_file.read_bytes()).hexdigest()
+
+
+def test_compress_database_reports_failed_encoding(tmp_path):
+    """Test a failing encoder does not abort the others."""
+    db_file = tmp_path / 'db.sqlite'
+    db_file.write_bytes(b'SQLite format 3\x00' * 100)
+    
+    results = compress_database(str(db_file), str(tmp_path / 'missing'))
+    
+    assert 'brotli' not in results
+    assert 'zip' not in results
+    assert results['original_size'] == 1600
+
+
+@pytest.mark.parametrize('processes', [None, 1])
+def test_compress_chunks_round_trip(sample_file, tmp_path, processes):
+    """Test chunks are content-addressed and concatenate to the original."""
+    data = sample_file.read_bytes()
+    chunk_dir = tmp_path / 'chunks'
+    
+    result = compress_chunks(str(sample_file), str(chunk_dir), chunk_size=CHUNK_SIZE, quality=1, processes=processes)
+    
+    assert result['size'] == len(data)
+    assert result['sha256'] == hashlib.sha256(data).hexdigest()
+    assert len(result['chunks']) == -(-len(data) // CHUNK_SIZE)
+    
+    restored = b''
+    for chunk in result['chunks']:
+        raw = brotli.decompress((chunk_dir / chunk['name']).read_bytes())
+        assert chunk['name'] == f"{hashlib.sha256(raw).hexdigest()}-q1w22.br"
+        assert chunk['offset'] == len(restored)
+        assert chunk['size'] == len(raw)
+        assert chunk['compressed_size'] == (chunk_dir / chunk['name']).stat().st_size
+        restored += raw
+        
+    assert restored == data
+    assert not list(chunk_dir.glob('*.tmp'))
+
+
+def test_compress_chunks_reuses_unchanged(sample_file, tmp_path):
+    """Test only chunks with changed content are compressed again."""
+    chunk_dir = tmp_path / 'chunks'
+    first = compress_chunks(str(sample_file), str(chunk_dir), chunk_size=CHUNK_SIZE, quality=1, processes=1)
+    assert first['reused'] == 0
+    
+    data = bytearray(sample_file.read_bytes())
+    data[-10:] = b'0123456789'
+    sample_file.write_bytes(bytes(data))
+    
+    second = compress_chunks(str(sample_file), str(chunk_dir), chunk_size=CHUNK_SIZE, quality=1, processes=1)
+    
+    assert second['reused'] == len(second['chunks']) - 1
+    assert [c['name'] for c in second['chunks'][:-1]] == [c['name'] for c in first['chunks'][:-1]]
+    assert second['chunks'][-1]['name'] != first['chunks'][-1]['name']
+
+
+def test_compress_chunks_not_reused_across_settings(sample_file, tmp_path):
+    """Test chunks made with other encoder settings are compressed again."""
+    chunk_dir = tmp_path / 'chunks'
+    first = compress_chunks(str(sample_file), str(chunk_dir), chunk_size=CHUNK_SIZE, quality=1, processes=1)
+    
+    second = compress_chunks(str(sample_file), str(chunk_dir), chunk_size=CHUNK_SIZE, quality=2, processes=1)
+    third = compress_chunks(str(sample_file), str(chunk_dir), chunk_size=CHUNK_SIZE, quality=1, lgwin=20, processes=1)
+    
+    assert second['reused'] == third['reused'] == 0
+    names = [{c['name'] for c in result['chunks']} for result in (first, second, third)]
+    assert not names[0] & names[1] and not names[0] & names[2]
+
+
+@requires_zstd
+@pytest.mark.parametrize('long_distance', [False, True])
+def test_compress_zstd_round_trip(sample_file, tmp_path, long_distance):
+    """Test zstd output decodes to the input and records size and hash."""
+    data = sample_file.read_bytes()
+    
+    result = compress_zstd(str(sample_file), str(tmp_path / 'a.zst'), level=3, long_distance=long_distance)
+    compressed = (tmp_path / 'a.zst').read_bytes()
+    
+    assert result['size'] == len(compressed)
+    assert result['sha256'] == hashlib.sha256(compressed).hexdigest()
+    assert zstandard.ZstdDecompressor().decompress(compressed) == data
+
+
+@requires_zstd
+@pytest.mark.parametrize('source', ['pages', 'tables'])
+def test_train_zstd_dictionary_is_deterministic(sample_db, tmp_path, source):
+    """Test dictionaries are reproducible and needed to decode the output."""
+    dictionary = train_zstd_dictionary(str(sample_db), source, dict_size=4096, level=3)
+    
+    assert dictionary == train_zstd_dictionary(str(sample_db), source, dict_size=4096, level=3)
+    
+    compress_zstd(str(sample_db), str(tmp_path / 'db.zst'), level=3, dictionary=dictionary)
+    compressed = (tmp_path / 'db.zst').read_bytes()
+    decompressor = zstandard.ZstdDecompressor(dict_data=zstandard.ZstdCompressionDict(dictionary))
+    assert decompressor.decompress(compressed) == sample_db.read_bytes()
+    with pytest.raises(zstandard.ZstdError):
+        zstandard.ZstdDecompressor().decompress(compressed)
+
+
+@requires_zstd
+def test_compress_database_with_zstd(sample_db, tmp_path):
+    """Test zstd results and the dictionary file are reported."""
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    
+    results = compress_database(
+        str(sample_db),
+        str(out_dir),
+        processes=1,
+        zstd_options={'level': 3, 'long_distance': True, 'dictionary': 'tables'}
+    )
+    
+    data = open(results['zstd'], 'rb').read()
+    assert results['zstd_size'] == len(data)
+    assert results['zstd_sha256'] == hashlib.sha256(data).hexdigest()
+    assert results['zstd_window_log'] == 27
+    dictionary = open(results['zstd_dict'], 'rb').read()
+    assert results['zstd_dict_sha256'] == hashlib.sha256(dictionary).hexdigest()
+
+
+def test_compress_database_profiles(sample_file, tmp_path):
+    """Test profiles select the encoder settings and unknown names are rejected."""
+    small_file = tmp_path / 'small.sqlite'
+    small_file.write_bytes(sample_file.read_bytes()[:100000])
+    data = small_file.read_bytes()
+    sizes = {}
+    
+    for profile in ('dev', 'release'):
+        out_dir = tmp_path / profile
+        out_dir.mkdir()
+        results = compress_database(str(small_file), str(out_dir), processes=1, profile=profile)
+        assert brotli.decompress(open(results['brotli'], 'rb').read()) == data
+        with zipfile.ZipFile(results['zip']) as zf:
+            assert zf.read('small.sqlite') == data
+        sizes[profile] = (results['brotli_size'], results['zip_size'])
+        
+    assert sizes['release'][0] < sizes['dev'][0]
+    assert sizes['release'][1] < sizes['dev'][1]
+    
+    with pytest.raises(ValueError):
+        compress_database(str(small_file), str(tmp_path), profile='fastest')
+
+
+@requires_zstd
+def test_compress_database_zstd_options_override_profile(sample_db, tmp_path):
+    """Test zstd settings not given explicitly come from the profile."""
+    results = compress_database(
+        str(sample_db),
+        str(tmp_path),
+        processes=1,
+        zstd_options={'level': 3, 'long_distance': None},
+        profile='release'
+    )
+    
+    assert results['zstd_window_log'] == 27
+    data = open(results['zstd'], 'rb').read()
+    assert zstandard.ZstdDecompressor().decompress(data) == sample_db.read_bytes()
@@ -3,10 +3,12 @@ Unit tests for database operations.
 All table names have bvl_ prefix to match pflanzenschutz-db schema.
 """
 
+import json
 import pytest
 import tempfile
 from pathlib import Path
 from scripts.helpers.database import DatabaseManager
+from scripts.helpers.transformers import map_awg_record, map_mittel_record, slim_payload
 
 
 @pytest.fixture
@@ -176,3 +178,263 @@ def test_awg_wartezeit_official_fields(db_manager):
     
     results = db_manager.execute_query("SELECT gesetzt_wartezeit FROM bvl_awg_wartezeit WHERE awg_wartezeit_nr = 99999")
     assert results[0]['gesetzt_wartezeit'] == 35
+
+
+def test_insert_records_mixed_columns(db_manager):
+    """Test records with different column sets are grouped and all inserted."""
+    records = [
+        {'kennr': '024123-00', 'mittelname': 'Product 1'},
+        {'kennr': '024123-01', 'mittelname': 'Product 2'},
+        {'kennr': '024123-02', 'mittelname': 'Product 3', 'zul_ende': '2030-12-31'},
+        {'kennr': '024123-00', 'mittelname': 'Product 1 (updated)'}
+    ]
+    
+    count = db_manager.insert_records('bvl_mittel', records)
+    assert count == 4
+    assert db_manager.get_table_count('bvl_mittel') == 3
+    
+    # Later duplicates win, as with row-by-row INSERT OR REPLACE
+    results = db_manager.execute_query("SELECT mittelname FROM bvl_mittel WHERE kennr = '024123-00'")
+    assert results[0]['mittelname'] == 'Product 1 (updated)'
+
+
+def test_insert_records_failed_batch_falls_back_per_row(db_manager):
+    """Test a failing batch is retried row by row and only bad rows are lost."""
+    records = [
+        {'id': 1, 'kennr': '024123-00', 'wirkstoff_kode': 'A'},
+        {'id': 'not-a-rowid', 'kennr': '024123-01', 'wirkstoff_kode': 'B'},
+        {'id': 3, 'kennr': '024123-02', 'wirkstoff_kode': 'C'}
+    ]
+    
+    count = db_manager.insert_records('bvl_mittel_wirkstoff', records)
+    assert count == 2
+    assert db_manager.get_table_count('bvl_mittel_wirkstoff') == 2
+
+
+def test_insert_records_unknown_column_counts_errors(db_manager):
+    """Test a batch that cannot be prepared counts every row as error."""
+    records = [
+        {'kennr': '024123-00', 'no_such_column': 1},
+        {'kennr': '024123-01', 'no_such_column': 2}
+    ]
+    
+    assert db_manager.insert_records('bvl_mittel', records) == 0
+    assert db_manager.get_table_count('bvl_mittel') == 0
+
+
+def test_insert_row_batches(db_manager):
+    """Test rows from a row mapper are inserted with a bad row retried alone."""
+    columns = ('id', 'kennr', 'wirkstoff_kode')
+    batches = [
+        [(1, '024123-00', 'A'), ('not-a-rowid', '024123-01', 'B')],
+        [],
+        [(3, '024123-02', 'C')]
+    ]
+    
+    assert db_manager.insert_row_batches('bvl_mittel_wirkstoff', columns, batches) == 2
+    results = db_manager.execute_query("SELECT id, wirkstoff_kode FROM bvl_mittel_wirkstoff ORDER BY id")
+    assert [(row['id'], row['wirkstoff_kode']) for row in results] == [(1, 'A'), (3, 'C')]
+
+
+def _failing_batches(batches, fail_at):
+    """Yield batches, raising like a failed page fetch at index fail_at."""
+    for index, batch in enumerate(batches):
+        if index == fail_at:
+            raise RuntimeError(f"Failed to fetch page {index + 1}")
+        yield batch
+
+
+def test_insert_record_batches_rolls_back_failed_stream(db_manager):
+    """Test a stream failing on a later page leaves no rows behind."""
+    batches = [[{'kennr': f'02412{page}-0{i}', 'mittelname': 'Produkt'} for i in range(10)] for page in range(3)]
+    
+    with pytest.raises(RuntimeError):
+        db_manager.insert_record_batches('bvl_mittel', _failing_batches(batches, 2))
+        
+    # A later write commits without the partial rows
+    assert db_manager.insert_records('bvl_awg', [{'awg_id': '024123-00/00-001', 'kennr': '024123-00'}]) == 1
+    assert db_manager.get_table_count('bvl_mittel') == 0
+    assert db_manager.get_table_count('bvl_awg') == 1
+
+
+def test_insert_row_batches_rolls_back_failed_stream(db_manager):
+    """Test a row stream failing on a later page leaves no rows behind."""
+    columns = ('id', 'kennr', 'wirkstoff_kode')
+    batches = [[(page * 10 + i, '024123-00', 'A') for i in range(10)] for page in range(3)]
+    
+    with pytest.raises(RuntimeError):
+        db_manager.insert_row_batches('bvl_mittel_wirkstoff', columns, _failing_batches(batches, 2))
+        
+    db_manager.conn.commit()
+    assert db_manager.get_table_count('bvl_mittel_wirkstoff') == 0
+
+
+def _schema_objects(manager):
+    """Return user schema objects of a database."""
+    return manager.execute_query(
+        "SELECT type, name, tbl_name, sql FROM sqlite_master "
+        "WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+    )
+
+
+def test_deferred_schema_matches_regular_schema(db_manager, tmp_path):
+    """Test bulk build mode produces the same schema objects."""
+    manager = DatabaseManager(str(tmp_path / 'bulk.sqlite'))
+    manager.init_schema('utils/sqlite_schema.sql', defer_indexes=True)
+    
+    assert manager.table_exists('bvl_mittel')
+    assert not manager.view_exists('bvl_mittel_extras')
+    
+    manager.enable_bulk_load()
+    manager.insert_records('bvl_mittel', [{'kennr': '024123-00', 'mittelname': 'Test'}])
+    manager.create_deferred_schema()
+    manager.disable_bulk_load()
+    manager.optimize()
+    
+    assert manager.view_exists('bvl_mittel_extras')
+    assert _schema_objects(manager) == _schema_objects(db_manager)
+    manager.disconnect()
+
+
+def test_sync_record_batches_writes_only_changes(db_manager, tmp_path):
+    """Test incremental sync reports and applies inserts, updates and deletes."""
+    db_manager.attach_row_hashes(str(tmp_path / 'rowhash.sqlite'))
+    records = [
+        {'kennr': f'0241{i:02d}-00', 'mittelname': f'Produkt {i}'}
+        for i in range(5)
+    ]
+    
+    first = db_manager.sync_record_batches('bvl_mittel', ['kennr'], [records[:3], records[3:]])
+    assert first == {'inserted': 5, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'errors': 0}
+    
+    db_manager.execute_update("UPDATE bvl_mittel SET updated_at = 'old'")
+    changed = [dict(record) for record in records[1:]]
+    changed[0]['mittelname'] = 'Neu'
+    changed.append({'kennr': '024199-00', 'mittelname': 'Produkt 99'})
+    
+    second = db_manager.sync_record_batches('bvl_mittel', ['kennr'], [changed])
+    assert second == {'inserted': 1, 'updated': 1, 'unchanged': 3, 'deleted': 1, 'errors': 0}
+    
+    rows = db_manager.execute_query("SELECT kennr, mittelname, updated_at FROM bvl_mittel ORDER BY kennr")
+    assert [row['kennr'] for row in rows] == ['024101-00', '024102-00', '024103-00', '024104-00', '024199-00']
+    assert rows[0]['mittelname'] == 'Neu'
+    # Unchanged rows are not rewritten
+    assert [row['updated_at'] for row in rows[1:4]] == ['old', 'old', 'old']
+
+
+def test_sync_record_batches_first_run_compares_existing_rows(db_manager, tmp_path):
+    """Test the first sync after a full build does not report existing rows as inserted."""
+    records = [
+        {'kennr': f'0241{i:02d}-00', 'mittelname': f'Produkt {i}'}
+        for i in range(4)
+    ]
+    db_manager.insert_record_batches('bvl_mittel', [records])
+    db_manager.attach_row_hashes(str(tmp_path / 'rowhash.sqlite'))
+    
+    changed = [dict(record) for record in records[:3]]
+    changed[0]['mittelname'] = 'Neu'
+    changed.append({'kennr': '024199-00', 'mittelname': 'Produkt 99'})
+    
+    first = db_manager.sync_record_batches('bvl_mittel', ['kennr'], [changed])
+    assert first == {'inserted': 1, 'updated': 1, 'unchanged': 2, 'deleted': 1, 'errors': 0}
+    
+    # Hashes of unchanged rows were stored, so the next run skips them
+    second = db_manager.sync_record_batches('bvl_mittel', ['kennr'], [changed])
+    assert second == {'inserted': 0, 'updated': 0, 'unchanged': 4, 'deleted': 0, 'errors': 0}
+
+
+def test_sync_record_batches_empty_fetch_keeps_rows(db_manager, tmp_path):
+    """Test an empty fetch never wipes a table."""
+    db_manager.attach_row_hashes(str(tmp_path / 'rowhash.sqlite'))
+    db_manager.sync_record_batches('bvl_awg_wartezeit', ['awg_wartezeit_nr'], [[
+        {'awg_wartezeit_nr': 1, 'awg_id': 'A'},
+        {'awg_wartezeit_nr': '2', 'awg_id': 'B'}
+    ]])
+    
+    result = db_manager.sync_record_batches('bvl_awg_wartezeit', ['awg_wartezeit_nr'], [[]])
+    
+    assert result['deleted'] == 0
+    assert db_manager.get_table_count('bvl_awg_wartezeit') == 2
+    
+    # Integer keys delivered as text still match the stored rows
+    result = db_manager.sync_record_batches('bvl_awg_wartezeit', ['awg_wartezeit_nr'], [[
+        {'awg_wartezeit_nr': '2', 'awg_id': 'B'}
+    ]])
+    assert result == {'inserted': 0, 'updated': 0, 'unchanged': 1, 'deleted': 1, 'errors': 0}
+    assert db_manager.get_table_count('bvl_awg_wartezeit') == 1
+
+
+def test_create_payload_views_rebuild_full_payload(db_manager):
+    """Test payload views and dependent views return the full payload."""
+    db_manager.insert_record('bvl_mittel', {
+        'kennr': '024100-00',
+        'mittelname': 'Produkt',
+        'zul_ende': None,
+        'payload_json': '{"zul_ende":null,"mittelname_kurz":"P"}'
+    })
+    
+    sizes = db_manager.create_payload_views({'bvl_mittel': ['kennr', 'mittelname', 'zul_ende']})
+    
+    expected = {'kennr': '024100-00', 'mittelname': 'Produkt', 'zul_ende': None, 'mittelname_kurz': 'P'}
+    rows = db_manager.execute_query("SELECT payload_json FROM bvl_mittel_payload")
+    assert json.loads(rows[0]['payload_json']) == expected
+    rows = db_manager.execute_query("SELECT name, payload_json FROM bvl_mittel_app")
+    assert rows[0]['name'] == 'Produkt'
+    assert json.loads(rows[0]['payload_json']) == expected
+    assert sizes['bvl_mittel'][0] < sizes['bvl_mittel'][1]
+
+
+def test_create_payload_views_restore_only_stripped_fields(db_manager):
+    """Test fields a row kept, or never had, are not taken from the columns."""
+    records = [
+        {'kennr': '024100-00', 'mittelname': 12345, 'zul_ende': None},
+        {'kennr': '024101-00', 'mittelname': 'Produkt'},
+    ]
+    affinities = db_manager.get_column_affinities('bvl_mittel')
+    promoted = set()
+    for raw in records:
+        mapped = map_mittel_record(raw)
+        promoted.update(slim_payload(mapped, raw, affinities))
+        db_manager.insert_record('bvl_mittel', mapped)
+        
+    raw = {'awg_id': '024100-00/00-001', 'kennr': '024100-00', 'aw_abstand_von': 5, 'aw_abstand_bis': 7.5}
+    mapped = map_awg_record(raw)
+    slim_payload(mapped, raw, db_manager.get_column_affinities('bvl_awg'))
+    db_manager.insert_record('bvl_awg', mapped)
+    
+    db_manager.create_payload_views({'bvl_mittel': sorted(promoted), 'bvl_awg': ['awg_id', 'aw_abstand_bis', 'aw_abstand_von', 'kennr']})
+    
+    rows = db_manager.execute_query("SELECT payload_json FROM bvl_mittel_payload ORDER BY kennr")
+    assert [json.loads(row['payload_json']) for row in rows] == records
+    assert '"mittelname":12345' in rows[0]['payload_json']
+    rows = db_manager.execute_query("SELECT payload_json FROM bvl_awg_payload")
+    assert json.loads(rows[0]['payload_json']) == raw
+    assert '"aw_abstand_von":5,' in rows[0]['payload_json']
+
+
+def test_write_sync_log(db_manager):
+    """Test a sync and its stages are recorded with extra fields as JSON."""
+    sync_id = db_manager.write_sync_log(
+        {
+            'sync_start': '2024-01-15T00:00:00Z',
+            'sync_end': '2024-01-15T00:05:00Z',
+            'duration_seconds': 300.0,
+            'status': 'success',
+            'records_processed': 25
+        },
+        [
+            {'stage': 'init', 'start_seconds': 0.0, 'duration_seconds': 0.1, 'status': 'success'},
+            {'stage': 'fetch', 'start_seconds': 0.1, 'duration_seconds': 2.0, 'status': 'success',
+             'rows': 25, 'requests': 3, 'cache_hits': 1}
+        ]
+    )
+    
+    cursor = db_manager.conn.cursor()
+    cursor.execute("SELECT status, records_processed FROM bvl_sync_log WHERE id = ?", (sync_id,))
+    assert tuple(cursor.fetchone()) == ('success', 25)
+    
+    cursor.execute("SELECT seq, stage, rows, requests, details_json FROM bvl_sync_stage ORDER BY seq")
+    rows = [tuple(row) for row in cursor.fetchall()]
+    assert rows[0] == (0, 'init', None, None, None)
+    assert rows[1][:4] == (1, 'fetch', 25, 3)
+    assert json.loads(rows[1][4]) == {'cache_hits': 1}
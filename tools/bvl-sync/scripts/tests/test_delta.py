@@ -0,0 +1,129 @@
+"""
+Unit tests for delta patches between database builds.
+"""
+
+import sqlite3
+import brotli
+import pytest
+from scripts.helpers.delta import build_sql_delta, create_delta, decompress_brotli
+
+
+SCHEMA = """
+CREATE TABLE bvl_mittel (
+    kennr TEXT PRIMARY KEY,
+    mittelname TEXT,
+    updated_at TEXT
+);
+CREATE TABLE bvl_awg_kultur (
+    awg_id TEXT,
+    kultur TEXT,
+    ausgenommen INTEGER,
+    PRIMARY KEY (awg_id, kultur)
+);
+"""
+
+
+def make_db(path, mittel, kulturen):
+    """Create a database with the given rows."""
+    conn = sqlite3.connect(str(path))
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO bvl_mittel VALUES (?, ?, ?)", mittel)
+    conn.executemany("INSERT INTO bvl_awg_kultur VALUES (?, ?, ?)", kulturen)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def dump(path):
+    """Read all rows except updated_at."""
+    conn = sqlite3.connect(path)
+    rows = (
+        conn.execute("SELECT kennr, mittelname FROM bvl_mittel ORDER BY kennr").fetchall(),
+        conn.execute("SELECT * FROM bvl_awg_kultur ORDER BY awg_id, kultur").fetchall()
+    )
+    conn.close()
+    return rows
+
+
+@pytest.fixture
+def builds(tmp_path):
+    """Create an old and a new build."""
+    old = make_db(
+        tmp_path / 'old.sqlite',
+        [('024101-00', 'Alt', '2024-01-01'), ('024102-00', "O'Brien", '2024-01-01'), ('024103-00', 'Weg', '2024-01-01')],
+        [('A', 'WEIZEN', 0), ('A', 'GERSTE', None)]
+    )
+    new = make_db(
+        tmp_path / 'new.sqlite',
+        [('024101-00', 'Neu', '2024-02-01'), ('024102-00', "O'Brien", '2024-02-01'), ('024104-00', 'Dazu', '2024-02-01')],
+        [('A', 'WEIZEN', 0), ('A', 'GERSTE', 1)]
+    )
+    return old, new
+
+
+def test_build_sql_delta_only_contains_changes(builds):
+    """Test unchanged rows (apart from updated_at) are not in the delta."""
+    old, new = builds
+    sql = build_sql_delta(old, new)
+    
+    assert "DELETE FROM bvl_mittel WHERE kennr IS '024103-00';" in sql
+    assert "'Neu'" in sql
+    assert "'Dazu'" in sql
+    assert "O''Brien" not in sql
+    assert "WEIZEN" not in sql
+
+
+def test_applied_delta_reproduces_new_build(builds):
+    """Test applying the delta to the old build yields the new rows."""
+    old, new = builds
+    sql = build_sql_delta(old, new)
+    
+    conn = sqlite3.connect(old)
+    conn.executescript(sql)
+    conn.close()
+    
+    assert dump(old) == dump(new)
+
+
+def test_build_sql_delta_skips_volatile_rows(builds):
+    """Test run metadata and the sync log are left out, other meta rows are not."""
+    old, new = builds
+    for path, sync_iso, counts in ((old, '2024-01-01T03:00:00Z', '{"bvl_mittel": 3}'), (new, '2024-02-01T03:00:00Z', '{"bvl_mittel": 4}')):
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE bvl_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE bvl_sync_log (id INTEGER PRIMARY KEY, sync_start TEXT)")
+        conn.executemany("INSERT INTO bvl_meta VALUES (?, ?)", [('lastSyncIso', sync_iso), ('lastSyncCounts', counts)])
+        conn.execute("INSERT INTO bvl_sync_log VALUES (1, ?)", (sync_iso,))
+        conn.commit()
+        conn.close()
+        
+    sql = build_sql_delta(old, new)
+    
+    assert "lastSyncCounts" in sql
+    assert "lastSyncIso" not in sql
+    assert "bvl_sync_log" not in sql
+
+
+def test_build_sql_delta_schema_change(builds, tmp_path):
+    """Test no delta is produced when the schema changed."""
+    old, new = builds
+    conn = sqlite3.connect(new)
+    conn.execute("CREATE INDEX idx_mittel_name ON bvl_mittel(mittelname)")
+    conn.close()
+    
+    assert build_sql_delta(old, new) is None
+
+
+def test_create_delta_and_decompress(builds, tmp_path):
+    """Test the delta file is Brotli-compressed SQL."""
+    old, new = builds
+    result = create_delta(old, new, str(tmp_path / 'delta.sql.br'))
+    
+    with open(result['path'], 'rb') as f:
+        assert brotli.decompress(f.read()).decode('utf-8') == build_sql_delta(old, new)
+        
+    # Git LFS pointers and other non-Brotli files are rejected
+    pointer = tmp_path / 'pointer.br'
+    pointer.write_text('version https://git-lfs.github.com/spec/v1\n')
+    assert decompress_brotli(str(pointer), str(tmp_path / 'out')) is None
+    assert not (tmp_path / 'out').exists()
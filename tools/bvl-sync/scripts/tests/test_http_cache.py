@@ -0,0 +1,113 @@
+"""
+Unit tests for the HTTP response cache.
+"""
+
+import os
+from scripts.helpers.http_cache import ResponseCache
+from scripts.helpers.http_client import HTTPClient
+from scripts.tests.conftest import BASE_URL
+
+
+def test_make_key_sorts_params():
+    """Test cache key does not depend on parameter order."""
+    assert ResponseCache.make_key('https://x/mittel', {'offset': 0, 'limit': 10}) == \
+        ResponseCache.make_key('https://x/mittel', {'limit': 10, 'offset': 0})
+    assert ResponseCache.make_key('https://x/mittel') == 'https://x/mittel'
+
+
+def test_store_and_lookup(cache):
+    """Test stored responses are returned with their validators."""
+    cache.store('key', {'ETag': '"abc"', 'Last-Modified': 'Mon, 15 Jan 2024 00:00:00 GMT'}, b'{"items": []}')
+    
+    entry = cache.lookup('key')
+    
+    assert entry.body == b'{"items": []}'
+    assert not entry.is_fresh()
+    assert entry.conditional_headers() == {
+        'If-None-Match': '"abc"',
+        'If-Modified-Since': 'Mon, 15 Jan 2024 00:00:00 GMT'
+    }
+
+
+def test_store_skips_uncacheable(cache):
+    """Test responses without validators or with no-store are not stored."""
+    cache.store('plain', {}, b'{}')
+    cache.store('private', {'ETag': '"x"', 'Cache-Control': 'no-store'}, b'{}')
+    
+    assert cache.lookup('plain') is None
+    assert cache.lookup('private') is None
+    assert cache.stats['misses'] == 2
+    assert cache.stats['stored'] == 0
+
+
+def test_fresh_entry_counts_as_hit(cache):
+    """Test max-age makes an entry fresh."""
+    cache.store('key', {'Cache-Control': 'max-age=3600'}, b'{}')
+    
+    assert cache.lookup('key').is_fresh()
+    assert cache.stats['hits'] == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Test entries are evicted once the size cap is exceeded."""
+    cache = ResponseCache(str(tmp_path), max_bytes=600)
+    body = os.urandom(400)
+    
+    cache.store('first', {'ETag': '"1"'}, body)
+    cache.store('second', {'ETag': '"2"'}, body)
+    
+    assert cache.lookup('first') is None
+    assert cache.lookup('second') is not None
+    assert cache.stats['evicted'] == 1
+    cache.close()
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """Test entries survive closing and reopening the cache."""
+    first = ResponseCache(str(tmp_path))
+    first.store('key', {'ETag': '"1"'}, b'{"a": 1}')
+    first.close()
+    
+    second = ResponseCache(str(tmp_path))
+    assert second.lookup('key').body == b'{"a": 1}'
+    second.close()
+
+
+def test_http_client_revalidates_with_etag(cache, fake_session):
+    """Test second request sends If-None-Match and reuses the cached body on 304."""
+    client = HTTPClient(BASE_URL, cache=cache)
+    fake_session.body = {'items': [{'kennr': '024123-00'}]}
+    
+    first = client.get('mittel', {'limit': 10, 'offset': 0})
+    second = client.get('mittel', {'limit': 10, 'offset': 0})
+    
+    assert first == second == {'items': [{'kennr': '024123-00'}]}
+    assert fake_session.requests[1] == {'If-None-Match': '"v1"'}
+    assert cache.stats['misses'] == 1
+    assert cache.stats['revalidated'] == 1
+
+
+def test_http_client_revalidate_skips_fresh_entry(cache, fake_session):
+    """Test revalidate=True sends a conditional request despite a fresh entry."""
+    client = HTTPClient(BASE_URL, cache=cache)
+    cache.store(
+        ResponseCache.make_key(client._build_url('stand')),
+        {'ETag': '"v1"', 'Cache-Control': 'max-age=3600'},
+        b'{"items": [{"datum": "2024-01-15"}]}'
+    )
+    
+    assert client.get('stand') == {'items': [{'datum': '2024-01-15'}]}
+    assert fake_session.requests == []
+    
+    assert client.get('stand', revalidate=True) == {'items': [{'datum': '2024-01-15'}]}
+    assert fake_session.requests == [{'If-None-Match': '"v1"'}]
+
+
+def test_http_client_rejects_304_without_cache_entry(fake_session):
+    """Test a 304 without a cached body is an error, not an empty JSON body."""
+    client = HTTPClient(BASE_URL, max_retries=1, retry_delay=0)
+    fake_session.etag = None  # answers every request with 304
+    
+    assert client.get('stand') is None
+    assert len(fake_session.requests) == 2
+    assert client.request_stats.for_path('stand')['errors'] == 2
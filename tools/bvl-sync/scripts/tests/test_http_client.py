@@ -4,6 +4,8 @@ Unit tests for HTTP client.
 
 import pytest
 from scripts.helpers.http_client import HTTPClient
+from scripts.helpers.tracing import Tracer
+from scripts.tests.conftest import BASE_URL
 
 
 def test_build_url_without_slash():
@@ -32,3 +34,108 @@ def test_build_url_complex_path():
     client = HTTPClient("https://psm-api.bvl.bund.de/ords/psm/api-v1/")
     url = client._build_url("mittel/123/details")
     assert url == "https://psm-api.bvl.bund.de/ords/psm/api-v1/mittel/123/details"
+
+
+def make_paged_client(total, max_in_flight=1):
+    """Create client whose get() serves `total` numbered records."""
+    client = HTTPClient("https://psm-api.bvl.bund.de/ords/psm/api-v1/", max_in_flight=max_in_flight)
+    client.requested_offsets = []
+    
+    def fake_get(path, params=None, retry_count=0):
+        client.requested_offsets.append(params['offset'])
+        start = params['offset']
+        end = min(start + params['limit'], total)
+        return {"items": [{"nr": i} for i in range(start, end)]}
+        
+    client.get = fake_get
+    return client
+
+
+def test_fetch_paginated_sequential():
+    """Test sequential pagination stops at the first short page."""
+    client = make_paged_client(25)
+    records = client.fetch_paginated("awg", page_size=10)
+    
+    assert [r["nr"] for r in records] == list(range(25))
+    assert client.requested_offsets == [0, 10, 20]
+
+
+def test_fetch_paginated_windowed_keeps_offset_order():
+    """Test windowed prefetch returns records in offset order."""
+    client = make_paged_client(95, max_in_flight=4)
+    records = client.fetch_paginated("awg", page_size=10)
+    
+    assert [r["nr"] for r in records] == list(range(95))
+    # At most one window of offsets is requested past the end
+    assert len(client.requested_offsets) <= 10 + 3
+
+
+def test_fetch_paginated_windowed_empty_last_page():
+    """Test windowed prefetch when the total is a multiple of the page size."""
+    client = make_paged_client(30)
+    records = client.fetch_paginated("awg", page_size=10, max_in_flight=3)
+    
+    assert len(records) == 30
+
+
+def test_fetch_paginated_windowed_max_pages():
+    """Test windowed prefetch honours max_pages."""
+    client = make_paged_client(100, max_in_flight=4)
+    records = client.fetch_paginated("awg", page_size=10, max_pages=2)
+    
+    assert len(records) == 20
+    assert sorted(client.requested_offsets) == [0, 10]
+
+
+def test_iter_pages_yields_pages():
+    """Test iter_pages yields one list per non-empty page."""
+    client = make_paged_client(25)
+    pages = list(client.iter_pages("awg", page_size=10))
+    
+    assert [len(page) for page in pages] == [10, 10, 5]
+
+
+def test_iter_pages_strict_raises_on_failed_page():
+    """Test strict mode does not mistake a failed page for the end of the data."""
+    client = make_paged_client(25)
+    paged_get = client.get
+    client.get = lambda path, params=None, retry_count=0: None if params['offset'] == 10 else paged_get(path, params)
+    
+    assert len(client.fetch_paginated("awg", page_size=10)) == 10
+    with pytest.raises(RuntimeError):
+        client.fetch_paginated("awg", page_size=10, strict=True)
+
+
+def test_counts_requests(cache, fake_session):
+    """Test request counters distinguish sent requests, 304s and bytes."""
+    client = HTTPClient(BASE_URL, cache=cache)
+    
+    client.get('mittel', {'limit': 10, 'offset': 0})
+    client.get('mittel', {'limit': 10, 'offset': 0})
+    
+    stats = client.request_stats.for_path('mittel')
+    assert stats['requests'] == 2
+    assert stats['not_modified'] == 1
+    assert stats['bytes'] == len(b'{"items": []}')
+    assert client.request_stats.totals()['errors'] == 0
+    assert client.request_stats.for_path('awg')['requests'] == 0
+    
+    recorded = client.request_stats.snapshot()['mittel']
+    assert recorded['statuses'] == {200: 1, 304: 1}
+    assert sum(recorded['latency']['counts']) == 2
+
+
+def test_traces_requests(cache, fake_session):
+    """Test every sent request becomes a span with offset, status and bytes."""
+    tracer = Tracer()
+    client = HTTPClient(BASE_URL, cache=cache, tracer=tracer)
+    
+    client.get('mittel', {'limit': 10, 'offset': 20})
+    client.get('mittel', {'limit': 10, 'offset': 20})
+    
+    spans = [event for event in tracer.events if event['ph'] == 'X']
+    assert [span['name'] for span in spans] == ['GET mittel', 'GET mittel']
+    assert spans[0]['args']['offset'] == 20
+    assert spans[0]['args']['bytes'] == len(b'{"items": []}')
+    assert spans[0]['args']['retries'] == 0
+    assert [span['args']['status'] for span in spans] == [200, 304]
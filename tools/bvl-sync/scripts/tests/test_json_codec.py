@@ -0,0 +1,58 @@
+"""
+Unit tests for the JSON codec.
+"""
+
+import json
+import math
+import pytest
+from scripts.helpers import json_codec
+from scripts.helpers.json_codec import dumps, loads
+
+
+requires_orjson = pytest.mark.skipif(json_codec.orjson is None, reason="orjson not installed")
+
+RECORDS = [
+    {"kennr": "024123-00", "mittelname": "Pflanzenschutz Ölemulsion", "zul_ende": None},
+    {"awg_id": 12345, "m_aufwand": 0.75, "genehmigt": True, "ausgenommen": False, "b": -0.0},
+    {"text": "Zeile 1\nZeile 2\t\"zitiert\" \\ \x7f €😀", "Z": 1, "a": 2, "ä": 3},
+    {"small": 2.5e-05, "large": 1e16, "big_int": 2 ** 70, "nan": float("nan")},
+    {"nested": {"b": [1.5, 1e22], "a": None}},
+]
+
+
+@pytest.mark.parametrize("sort_keys", [False, True])
+@pytest.mark.parametrize("record", RECORDS)
+def test_dumps_matches_json_module(record, sort_keys):
+    """Test output equals the json module with default separators and unescaped UTF-8."""
+    expected = json.dumps(record, ensure_ascii=False, sort_keys=sort_keys)
+    
+    assert dumps(record, sort_keys=sort_keys) == expected
+
+
+@requires_orjson
+@pytest.mark.parametrize("data", [
+    b'{"awg_id": 18446744073709551616, "m": 2.5}',
+    '{"awg_id": -9223372036854775809}',
+    b'{"kennr": "12345678901234567890", "n": 1}',
+    b'{"items": [{"kennr": "024123-00", "m_aufwand": 0.75}]}',
+])
+def test_loads_backends_agree(data, monkeypatch):
+    """Test decoding gives the same values with and without orjson, also for big integers."""
+    fast = loads(data)
+    monkeypatch.setattr(json_codec, "orjson", None)
+    
+    slow = loads(data)
+    assert fast == slow
+    assert [type(value) for value in fast.values()] == [type(value) for value in slow.values()]
+
+
+def test_loads_accepts_bytes_and_json_module_extensions():
+    """Test documents orjson rejects are still decoded."""
+    assert loads(b'{"items": [{"kennr": "024123-00"}], "hasMore": false}') == {
+        "items": [{"kennr": "024123-00"}],
+        "hasMore": False
+    }
+    assert math.isnan(loads('{"value": NaN}')["value"])
+    
+    with pytest.raises(ValueError):
+        loads(b'{"items": [')
@@ -0,0 +1,92 @@
+"""
+Unit tests for manifest generation.
+"""
+
+import json
+import sqlite3
+from scripts.helpers.manifest import calculate_content_hashes, generate_manifest
+
+
+SCHEMA = """
+CREATE TABLE bvl_mittel (kennr TEXT PRIMARY KEY, mittelname TEXT, updated_at TEXT);
+CREATE TABLE bvl_awg (awg_id TEXT PRIMARY KEY, kennr TEXT);
+CREATE TABLE bvl_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+MITTEL = [(f'0241{i:02d}-00', f'Produkt {i}', '2024-01-01') for i in range(50)]
+
+
+def make_db(path, mittel, meta='a'):
+    """Create a database with the given bvl_mittel rows."""
+    conn = sqlite3.connect(str(path))
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO bvl_mittel VALUES (?, ?, ?)", mittel)
+    conn.execute("INSERT INTO bvl_awg VALUES ('A', '024100-00')")
+    conn.execute("INSERT INTO bvl_meta VALUES ('lastSyncIso', ?)", (meta,))
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_content_hash_ignores_layout_and_build_metadata(tmp_path):
+    """Test row order, updated_at and bvl_meta do not change the hash."""
+    first = make_db(tmp_path / 'first.sqlite', MITTEL)
+    second = make_db(
+        tmp_path / 'second.sqlite',
+        [(kennr, name, '2024-02-01') for kennr, name, _ in reversed(MITTEL)],
+        meta='b'
+    )
+    
+    assert calculate_content_hashes(first) == calculate_content_hashes(second)
+
+
+def test_content_hash_changes_with_data(tmp_path):
+    """Test a changed row changes the combined hash and only its table hash."""
+    first_hash, first_tables = calculate_content_hashes(make_db(tmp_path / 'first.sqlite', MITTEL))
+    changed = [('024100-00', 'Umbenannt', '2024-01-01')] + MITTEL[1:]
+    second_hash, second_tables = calculate_content_hashes(make_db(tmp_path / 'second.sqlite', changed))
+    
+    assert first_hash != second_hash
+    assert first_tables['bvl_mittel'] != second_tables['bvl_mittel']
+    assert first_tables['bvl_awg'] == second_tables['bvl_awg']
+    assert 'bvl_meta' not in first_tables
+
+
+def test_generate_manifest_includes_hashes(tmp_path):
+    """Test manifest.json carries the content hash and table hashes."""
+    db_path = make_db(tmp_path / 'pflanzenschutz.sqlite', MITTEL)
+    
+    manifest_path = generate_manifest(db_path, str(tmp_path), {}, {'bvl_mittel': 50}, {})
+    
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    content_hash, table_hashes = calculate_content_hashes(db_path)
+    assert manifest['hash'] == content_hash
+    assert manifest['table_hashes'] == table_hashes
+
+
+def test_generate_manifest_lists_zstd_dictionary(tmp_path):
+    """Test the zstd file entry carries its window size and dictionary."""
+    db_path = make_db(tmp_path / 'pflanzenschutz.sqlite', MITTEL)
+    results = {
+        'zstd': str(tmp_path / 'pflanzenschutz.sqlite.zst'),
+        'zstd_size': 100,
+        'zstd_sha256': 'a' * 64,
+        'zstd_window_log': 27,
+        'zstd_dict': str(tmp_path / 'pflanzenschutz.sqlite.zst-dict'),
+        'zstd_dict_size': 10,
+        'zstd_dict_sha256': 'b' * 64
+    }
+    
+    manifest_path = generate_manifest(db_path, str(tmp_path), results, {}, {}, base_url='https://example.org')
+    
+    with open(manifest_path, encoding='utf-8') as f:
+        entry = json.load(f)['files'][0]
+    assert entry['encoding'] == 'zstd'
+    assert entry['window_log'] == 27
+    assert entry['dictionary'] == {
+        'name': 'pflanzenschutz.sqlite.zst-dict',
+        'url': 'https://example.org/pflanzenschutz.sqlite.zst-dict',
+        'size': 10,
+        'sha256': 'b' * 64
+    }
@@ -0,0 +1,74 @@
+"""
+Unit tests for the Prometheus textfile export.
+"""
+
+import time
+import pytest
+from scripts.helpers.metrics import MetricFamily, PeriodicWriter, read_sample, render_metrics, write_textfile
+
+
+def test_render_counter_and_gauge():
+    """Test counters are typed under their _total name and label values are escaped."""
+    rows = MetricFamily('bvl_sync_rows_inserted', 'counter', 'Rows inserted per endpoint')
+    rows.add(25, endpoint='mittel')
+    ratio = MetricFamily('bvl_sync_compression_ratio', 'gauge', 'Compression ratio')
+    ratio.add(0.125, encoding='br"otli\\')
+    empty = MetricFamily('bvl_sync_errors', 'gauge', 'Errors')
+    
+    assert render_metrics([rows, ratio, empty]) == (
+        '# HELP bvl_sync_rows_inserted_total Rows inserted per endpoint\n'
+        '# TYPE bvl_sync_rows_inserted_total counter\n'
+        'bvl_sync_rows_inserted_total{endpoint="mittel"} 25\n'
+        '# HELP bvl_sync_compression_ratio Compression ratio\n'
+        '# TYPE bvl_sync_compression_ratio gauge\n'
+        'bvl_sync_compression_ratio{encoding="br\\"otli\\\\"} 0.125\n'
+    )
+
+
+def test_render_histogram_is_cumulative():
+    """Test bucket counts are cumulative and end with +Inf and the count."""
+    latency = MetricFamily('bvl_sync_fetch_latency_seconds', 'histogram', 'Latency')
+    latency.add_histogram((0.1, 1.0), [2, 1, 1], 3.5, endpoint='awg')
+    
+    assert latency.render()[2:] == [
+        'bvl_sync_fetch_latency_seconds_bucket{endpoint="awg",le="0.1"} 2',
+        'bvl_sync_fetch_latency_seconds_bucket{endpoint="awg",le="1.0"} 3',
+        'bvl_sync_fetch_latency_seconds_bucket{endpoint="awg",le="+Inf"} 4',
+        'bvl_sync_fetch_latency_seconds_count{endpoint="awg"} 4',
+        'bvl_sync_fetch_latency_seconds_sum{endpoint="awg"} 3.5'
+    ]
+
+
+def test_unknown_type_is_rejected():
+    """Test only counter, gauge and histogram families can be created."""
+    with pytest.raises(ValueError):
+        MetricFamily('bvl_sync_info', 'summary', 'Info')
+
+
+def test_write_textfile_replaces_file(tmp_path):
+    """Test the textfile is replaced and no temporary file is left."""
+    path = tmp_path / 'metrics' / 'bvl.prom'
+    gauge = MetricFamily('bvl_sync_last_success_timestamp_seconds', 'gauge', 'Last success')
+    gauge.add(1700000000.5)
+    
+    write_textfile(str(path), [gauge])
+    write_textfile(str(path), [gauge])
+    
+    assert [p.name for p in path.parent.iterdir()] == ['bvl.prom']
+    assert read_sample(str(path), 'bvl_sync_last_success_timestamp_seconds') == 1700000000.5
+    assert read_sample(str(path), 'bvl_sync_running') is None
+    assert read_sample(str(tmp_path / 'missing.prom'), 'bvl_sync_running') is None
+
+
+def test_periodic_writer_writes_until_stopped():
+    """Test the write function runs repeatedly and not after stop()."""
+    calls = []
+    writer = PeriodicWriter(0.02, lambda: calls.append(1))
+    writer.start()
+    time.sleep(0.15)
+    writer.stop()
+    written = len(calls)
+    time.sleep(0.05)
+    
+    assert written >= 2
+    assert len(calls) == written
@@ -0,0 +1,86 @@
+"""
+Unit tests for table group packages.
+"""
+
+import sqlite3
+import brotli
+import pytest
+from scripts.helpers.packages import OTHER_GROUP, assign_table_groups, build_package, create_packages
+from scripts.helpers.manifest import calculate_content_hashes
+
+
+SCHEMA = """
+CREATE TABLE bvl_mittel (kennr TEXT PRIMARY KEY, mittelname TEXT);
+CREATE TABLE bvl_awg (awg_id TEXT PRIMARY KEY, kennr TEXT);
+CREATE TABLE bvl_kode (kode TEXT PRIMARY KEY, kodetext TEXT);
+CREATE TABLE bvl_antrag (kennr TEXT, antragnr INTEGER);
+CREATE INDEX idx_bvl_awg_kennr ON bvl_awg(kennr);
+CREATE VIEW bvl_mittel_awg AS SELECT m.kennr, a.awg_id FROM bvl_mittel m JOIN bvl_awg a ON a.kennr = m.kennr;
+CREATE VIEW bvl_mittel_kode AS SELECT m.kennr, k.kodetext FROM bvl_mittel m, bvl_kode k;
+"""
+
+GROUPS = {'core': ['bvl_mittel', 'bvl_awg', 'bvl_missing'], 'codes': ['bvl_kode']}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Create a database with tables of two groups and an unlisted table."""
+    path = tmp_path / 'pflanzenschutz.sqlite'
+    conn = sqlite3.connect(str(path))
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO bvl_mittel VALUES (?, ?)", [(f'{i:06d}-00', f'Produkt {i}') for i in range(100)])
+    conn.executemany("INSERT INTO bvl_awg VALUES (?, ?)", [(f'{i:06d}-00/01', f'{i:06d}-00') for i in range(100)])
+    conn.execute("INSERT INTO bvl_kode VALUES ('NW', 'Nicht wasserlöslich')")
+    conn.execute("INSERT INTO bvl_antrag VALUES ('000001-00', 1)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_assign_table_groups():
+    """Test unlisted tables go to the other group and missing tables are skipped."""
+    groups = assign_table_groups(['bvl_awg', 'bvl_antrag', 'bvl_kode', 'bvl_mittel'], GROUPS)
+    
+    assert groups == {
+        'core': ['bvl_awg', 'bvl_mittel'],
+        'codes': ['bvl_kode'],
+        OTHER_GROUP: ['bvl_antrag']
+    }
+    
+    with pytest.raises(ValueError):
+        assign_table_groups(['bvl_kode'], {'a': ['bvl_kode'], 'b': ['bvl_kode']})
+
+
+def test_build_package_copies_only_resolvable_views(db_path, tmp_path):
+    """Test tables, indexes and views within the group are copied."""
+    package_path = tmp_path / 'core.sqlite'
+    
+    counts = build_package(str(db_path), str(package_path), ['bvl_awg', 'bvl_mittel'])
+    
+    assert counts == {'bvl_awg': 100, 'bvl_mittel': 100}
+    conn = sqlite3.connect(str(package_path))
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")}
+    assert names == {'bvl_awg', 'bvl_mittel', 'idx_bvl_awg_kennr', 'bvl_mittel_awg'}
+    assert conn.execute("SELECT COUNT(*) FROM bvl_mittel_awg").fetchone()[0] == 100
+    conn.close()
+
+
+def test_create_packages_is_reproducible(db_path, tmp_path):
+    """Test packages carry per-group hashes and are byte-identical on rebuild."""
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    
+    first = create_packages(str(db_path), str(tmp_path / 'a'), GROUPS, quality=5, processes=1)
+    second = create_packages(str(db_path), str(tmp_path / 'b'), GROUPS, quality=5)
+    
+    assert [package['group'] for package in first] == ['core', 'codes', OTHER_GROUP]
+    assert not (tmp_path / 'a' / 'pflanzenschutz-core.sqlite').exists()
+    
+    for a, b in zip(first, second):
+        assert a['brotli']['sha256'] == b['brotli']['sha256']
+        assert a['hash'] == b['hash']
+        
+    core = tmp_path / 'core.sqlite'
+    core.write_bytes(brotli.decompress((tmp_path / 'a' / 'pflanzenschutz-core.sqlite.br').read_bytes()))
+    assert calculate_content_hashes(str(core))[0] == first[0]['hash']
+    assert first[0]['tables'] == {'bvl_awg': 100, 'bvl_mittel': 100}
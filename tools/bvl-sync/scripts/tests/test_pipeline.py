@@ -0,0 +1,386 @@
+"""
+Unit tests for the ETL pipeline.
+The BVL API is replaced by an in-memory fake client.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import brotli
+import pytest
+from scripts.fetch_bvl_data import ETLPipeline, EXIT_NO_CHANGE
+from scripts.helpers.manifest import calculate_content_hashes
+
+
+FAKE_DATA = {
+    'stand': [{'datum': '2024-01-15', 'hinweis': 'Test'}],
+    'mittel': [
+        {'kennr': f'0241{i:02d}-00', 'mittelname': f'Produkt {i}'}
+        for i in range(25)
+    ],
+    'awg': [
+        {'awg_id': f'0241{i:02d}-00/00-001', 'kennr': f'0241{i:02d}-00'}
+        for i in range(25)
+    ],
+}
+
+
+class FakeHTTPClient:
+    """Fake HTTP client serving FAKE_DATA with a small delay per endpoint."""
+    
+    def __init__(self, data=None, delay=0.0):
+        self.data = FAKE_DATA if data is None else data
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        
+    def fetch_paginated(self, path, page_size=1000, max_pages=None, strict=False):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return [dict(record) for record in self.data.get(path, [])]
+        
+    def get(self, path, params=None, revalidate=False):
+        return {'items': self.data.get(path, [])}
+        
+    def iter_pages(self, path, page_size=10, max_pages=None, strict=False):
+        records = self.fetch_paginated(path)
+        for offset in range(0, len(records), page_size):
+            yield records[offset:offset + page_size]
+            
+    def close(self):
+        pass
+
+
+def make_pipeline(tmp_path, init_database=True, **kwargs):
+    """Create a pipeline writing into tmp_path with a fake HTTP client."""
+    pipeline = ETLPipeline(
+        'configs/endpoints.yaml',
+        'configs/enrichments.yaml',
+        'utils/sqlite_schema.sql',
+        str(tmp_path),
+        **kwargs
+    )
+    pipeline.http_client.close()
+    pipeline.http_client = FakeHTTPClient(delay=0.01)
+    if init_database:
+        pipeline.init_database()
+    return pipeline
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """Create serial pipeline."""
+    pipeline = make_pipeline(tmp_path / 'serial')
+    yield pipeline
+    pipeline.db_manager.disconnect()
+
+
+def test_fetch_all_endpoints_serial(pipeline):
+    """Test serial fetch stores records and stats."""
+    pipeline.fetch_all_endpoints()
+    
+    assert pipeline.stats['endpoints']['mittel'] == {'count': 25, 'status': 'success'}
+    assert pipeline.stats['endpoints']['adresse'] == {'count': 0, 'status': 'empty'}
+    assert pipeline.db_manager.get_table_count('bvl_awg') == 25
+    assert pipeline.http_client.max_active == 1
+
+
+def test_fetch_all_endpoints_concurrent_matches_serial(pipeline, tmp_path):
+    """Test concurrent fetch produces the same stats as serial fetch."""
+    pipeline.fetch_all_endpoints()
+    
+    concurrent = make_pipeline(tmp_path / 'concurrent', workers=8)
+    try:
+        concurrent.fetch_all_endpoints()
+        
+        assert concurrent.http_client.max_active > 1
+        assert list(concurrent.stats['endpoints'].items()) == list(pipeline.stats['endpoints'].items())
+        assert concurrent.db_manager.get_table_count('bvl_mittel') == 25
+    finally:
+        concurrent.db_manager.disconnect()
+
+
+def test_fetch_all_endpoints_records_stage_errors(pipeline):
+    """Test a failing download is recorded while other endpoints are written."""
+    pages = pipeline.http_client.iter_pages
+    
+    def iter_pages(path, page_size=10, max_pages=None, strict=False):
+        if path == 'awg':
+            raise RuntimeError("Failed to fetch page 1 of awg")
+        return pages(path, page_size, max_pages, strict)
+        
+    pipeline.http_client.iter_pages = iter_pages
+    pipeline.fetch_all_endpoints()
+    
+    assert pipeline.stats['endpoints']['awg']['status'] == 'error'
+    assert pipeline.stats['errors'] == ['awg: Failed to fetch page 1 of awg']
+    assert pipeline.db_manager.get_table_count('bvl_mittel') == 25
+    assert pipeline.stats['throughput']['write']['rows'] == 26
+
+
+def test_fetch_all_endpoints_httpx_backend_streams(tmp_path):
+    """Test the httpx backend writes pages through the staged runner."""
+    httpx = pytest.importorskip('httpx')
+    from scripts.helpers.async_http_client import ThreadedAsyncHTTPClient
+    
+    def handler(request):
+        records = FAKE_DATA.get(request.url.path.rsplit('/', 1)[-1], [])
+        offset = int(request.url.params['offset'])
+        return httpx.Response(200, json={'items': records[offset:offset + int(request.url.params['limit'])]})
+        
+    pipeline = make_pipeline(tmp_path, workers=2, http_backend='httpx')
+    pipeline.http_client = ThreadedAsyncHTTPClient(
+        'https://psm-api.bvl.bund.de/ords/psm/api-v1/',
+        transport=httpx.MockTransport(handler),
+        request_stats=pipeline.request_stats
+    )
+    try:
+        pipeline.fetch_all_endpoints()
+    finally:
+        pipeline.http_client.close()
+        
+    assert pipeline.stats['endpoints']['mittel'] == {'count': 25, 'status': 'success'}
+    assert pipeline.db_manager.get_table_count('bvl_awg') == 25
+    assert pipeline.stats['throughput']['write']['rows'] == 51
+    assert pipeline.request_stats.for_path('mittel')['requests'] == 1
+    pipeline.db_manager.disconnect()
+
+
+def test_fetch_all_endpoints_rolls_back_failed_stream(pipeline):
+    """Test an endpoint failing after some pages leaves none of its rows behind."""
+    pages = pipeline.http_client.iter_pages
+    
+    def iter_pages(path, page_size=10, max_pages=None, strict=False):
+        for number, page in enumerate(pages(path, page_size, max_pages, strict), 1):
+            if path == 'mittel' and number == 3:
+                raise RuntimeError("Failed to fetch page 3 of mittel")
+            yield page
+            
+    pipeline.http_client.iter_pages = iter_pages
+    pipeline.fetch_all_endpoints()
+    
+    assert pipeline.stats['endpoints']['mittel']['status'] == 'error'
+    assert pipeline.stats['errors'] == ['mittel: Failed to fetch page 3 of mittel']
+    assert pipeline.db_manager.get_table_count('bvl_mittel') == 0
+    assert pipeline.db_manager.get_table_count('bvl_awg') == 25
+
+
+def test_run_skips_unchanged_stand(tmp_path):
+    """Test a second run with the same stand date exits early."""
+    first = make_pipeline(tmp_path)
+    assert first.run() == 0
+    
+    db_path = tmp_path / 'pflanzenschutz.sqlite'
+    mtime = db_path.stat().st_mtime_ns
+    
+    second = make_pipeline(tmp_path, init_database=False)
+    assert second.run() == EXIT_NO_CHANGE
+    assert 'mittel' not in second.stats['endpoints']
+    assert db_path.stat().st_mtime_ns == mtime
+
+
+def test_run_rebuilds_on_new_stand_or_force(tmp_path):
+    """Test changed stand date or force_rebuild triggers a full build."""
+    assert make_pipeline(tmp_path).run() == 0
+    
+    forced = make_pipeline(tmp_path, force_rebuild=True)
+    assert forced.run() == 0
+    
+    changed = make_pipeline(tmp_path)
+    changed.http_client.data = dict(FAKE_DATA, stand=[{'datum': '2024-02-01'}])
+    assert changed.run() == 0
+    assert changed.stats['endpoints']['mittel']['count'] == 25
+
+
+def test_run_incremental_applies_changes(tmp_path):
+    """Test incremental runs only report changed rows and delete withdrawn ones."""
+    assert make_pipeline(tmp_path, incremental=True).run() == 0
+    
+    second = make_pipeline(tmp_path, incremental=True, force_rebuild=True)
+    data = dict(FAKE_DATA, mittel=[dict(record) for record in FAKE_DATA['mittel'][:20]])
+    data['mittel'][0]['mittelname'] = 'Umbenannt'
+    second.http_client.data = data
+    assert second.run() == 0
+    
+    assert second.stats['endpoints']['mittel'] == {
+        'count': 20,
+        'status': 'success',
+        'inserted': 0,
+        'updated': 1,
+        'deleted': 5
+    }
+    assert second.stats['endpoints']['awg']['updated'] == 0
+    
+    second.db_manager.connect()
+    assert second.db_manager.get_table_count('bvl_mittel') == 20
+    assert second.db_manager.get_primary_key('bvl_awg_kultur') == ['awg_id', 'kultur']
+    second.db_manager.disconnect()
+
+
+def test_run_publishes_delta_from_previous_build(tmp_path):
+    """Test a rebuild lists an SQL delta from the previous .sqlite.br."""
+    assert make_pipeline(tmp_path).run() == 0
+    with open(tmp_path / 'manifest.json', encoding='utf-8') as f:
+        previous_hash = json.load(f)['hash']
+    previous_db = tmp_path / 'previous.sqlite'
+    previous_db.write_bytes(brotli.decompress((tmp_path / 'pflanzenschutz.sqlite.br').read_bytes()))
+    
+    changed = make_pipeline(tmp_path)
+    mittel = [dict(record) for record in FAKE_DATA['mittel']]
+    mittel[0]['mittelname'] = 'Umbenannt'
+    changed.http_client.data = dict(FAKE_DATA, stand=[{'datum': '2024-02-01'}], mittel=mittel)
+    assert changed.run() == 0
+    
+    with open(tmp_path / 'manifest.json', encoding='utf-8') as f:
+        manifest = json.load(f)
+    delta = manifest['deltas'][0]
+    assert delta['from_hash'] == previous_hash
+    assert delta['to_hash'] == manifest['hash']
+    assert delta['size'] < manifest['files'][0]['size']
+    
+    conn = sqlite3.connect(str(previous_db))
+    conn.executescript(brotli.decompress((tmp_path / delta['name']).read_bytes()).decode('utf-8'))
+    assert conn.execute("SELECT mittelname FROM bvl_mittel WHERE kennr = '024100-00'").fetchone()[0] == 'Umbenannt'
+    assert conn.execute("SELECT stand FROM bvl_stand").fetchone()[0] == '2024-02-01'
+    conn.close()
+    assert not (tmp_path / 'pflanzenschutz.sqlite-previous').exists()
+    
+    # The patched database has the content of the new build
+    assert calculate_content_hashes(str(previous_db))[0] == manifest['hash']
+
+
+def test_reproducible_build_is_byte_identical(tmp_path):
+    """Test identical data gives identical artifacts regardless of page and key order."""
+    first = make_pipeline(tmp_path / 'first', reproducible=True)
+    assert first.run() == 0
+    
+    second = make_pipeline(tmp_path / 'second', reproducible=True)
+    second.http_client.data = {
+        name: [dict(reversed(list(record.items()))) for record in reversed(records)]
+        for name, records in FAKE_DATA.items()
+    }
+    assert second.run() == 0
+    
+    for name in ('pflanzenschutz.sqlite.br', 'pflanzenschutz.sqlite.zip'):
+        assert (tmp_path / 'first' / name).read_bytes() == (tmp_path / 'second' / name).read_bytes()
+        
+    conn = sqlite3.connect(str(tmp_path / 'first' / 'pflanzenschutz.sqlite'))
+    assert conn.execute("SELECT DISTINCT updated_at FROM bvl_mittel").fetchall() == [('2024-01-15',)]
+    assert conn.execute("SELECT COUNT(*) FROM bvl_meta WHERE key = 'lastSyncIso'").fetchone()[0] == 0
+    conn.close()
+
+
+def test_run_publishes_chunks_and_prunes_old_ones(tmp_path):
+    """Test chunks rebuild the database and only the previous build's chunks are kept."""
+    def build(mittelname):
+        pipeline = make_pipeline(tmp_path, force_rebuild=True, chunk_size_mb=1)
+        mittel = [dict(record) for record in FAKE_DATA['mittel']]
+        mittel[0]['mittelname'] = mittelname
+        pipeline.http_client.data = dict(FAKE_DATA, mittel=mittel)
+        assert pipeline.run() == 0
+        with open(tmp_path / 'manifest.json', encoding='utf-8') as f:
+            return json.load(f)['chunks']
+            
+    first = build('Erster')
+    restored = b''.join(
+        brotli.decompress((tmp_path / 'chunks' / chunk['name']).read_bytes())
+        for chunk in first['files']
+    )
+    assert restored == (tmp_path / 'pflanzenschutz.sqlite').read_bytes()
+    assert first['files'][0]['url'].endswith(f"/chunks/{first['files'][0]['name']}")
+    
+    build('Zweiter')
+    assert (tmp_path / 'chunks' / first['files'][0]['name']).exists()
+    
+    third = build('Dritter')
+    names = {path.name for path in (tmp_path / 'chunks').iterdir()}
+    assert first['files'][0]['name'] not in names
+    assert {chunk['name'] for chunk in third['files']} <= names
+
+
+def test_run_slim_payload_rebuilds_full_payload(tmp_path):
+    """Test slim payloads shrink payload_json and the views restore the API records."""
+    pipeline = make_pipeline(tmp_path, slim_payload=True)
+    assert pipeline.run() == 0
+    assert pipeline.stats['payload']['stored_bytes'] < pipeline.stats['payload']['full_bytes']
+    assert pipeline.stats['payload']['stored_compressed_bytes'] < pipeline.stats['payload']['full_compressed_bytes']
+    
+    conn = sqlite3.connect(str(tmp_path / 'pflanzenschutz.sqlite'))
+    payloads = {
+        kennr: json.loads(payload)
+        for kennr, payload in conn.execute("SELECT kennr, payload_json FROM bvl_mittel_payload")
+    }
+    assert conn.execute("SELECT payload_json FROM bvl_mittel LIMIT 1").fetchone()[0] == '{}'
+    conn.close()
+    
+    for record in FAKE_DATA['mittel']:
+        assert payloads[record['kennr']] == record
+
+
+def test_run_records_stage_profile(tmp_path):
+    """Test a build lists its stages in the manifest and bvl_sync_stage."""
+    pipeline = make_pipeline(tmp_path)
+    assert pipeline.run() == 0
+    
+    with open(tmp_path / 'manifest.json', encoding='utf-8') as f:
+        stages = {stage['stage']: stage for stage in json.load(f)['build']['stages']}
+    assert {'init', 'fetch', 'endpoint:mittel', 'enrich', 'vacuum', 'compress', 'compress:brotli'} <= set(stages)
+    assert stages['endpoint:mittel']['rows'] == 25
+    assert stages['compress:brotli']['ratio'] > 0
+    
+    conn = sqlite3.connect(tmp_path / 'pflanzenschutz.sqlite')
+    recorded = [row[0] for row in conn.execute("SELECT stage FROM bvl_sync_stage ORDER BY seq")]
+    conn.close()
+    assert 'endpoint:mittel' in recorded
+    assert 'vacuum' not in recorded
+
+
+def test_run_writes_metrics_textfile(tmp_path):
+    """Test the textfile lists rows, requests, stages and artifacts."""
+    metrics_path = tmp_path / 'metrics' / 'bvl.prom'
+    pipeline = make_pipeline(tmp_path, metrics_file=str(metrics_path))
+    pipeline.request_stats.add('mittel', requests=1)
+    pipeline.request_stats.observe('mittel', 0.2, 200)
+    assert pipeline.run() == 0
+    
+    text = metrics_path.read_text(encoding='utf-8')
+    assert '# EOF' not in text
+    assert '# TYPE bvl_sync_rows_inserted_total counter\n' in text
+    assert 'bvl_sync_running 0\n' in text
+    assert 'bvl_sync_rows_inserted_total{endpoint="mittel"} 25\n' in text
+    assert 'bvl_sync_fetch_latency_seconds_bucket{endpoint="mittel",le="0.25"} 1\n' in text
+    assert 'bvl_sync_http_responses_total{endpoint="mittel",status="200"} 1\n' in text
+    assert 'bvl_sync_stage_duration_seconds{stage="vacuum"}' in text
+    assert 'bvl_sync_artifact_size_bytes{file="pflanzenschutz.sqlite.br"}' in text
+    assert 'bvl_sync_compression_ratio{encoding="brotli"}' in text
+    last_success = pipeline._last_success
+    assert last_success is not None
+    
+    # A failed run keeps the previous success time
+    failed = make_pipeline(tmp_path, force_rebuild=True, metrics_file=str(metrics_path))
+    failed.http_client.iter_pages = None
+    assert failed.run() == 1
+    
+    text = metrics_path.read_text(encoding='utf-8')
+    assert 'bvl_sync_exit_code 1\n' in text
+    assert f'bvl_sync_last_success_timestamp_seconds {last_success!r}\n' in text
+
+
+def test_run_writes_trace(tmp_path):
+    """Test the trace has map, insert, enrichment SQL and stage spans."""
+    trace_path = tmp_path / 'trace.json'
+    assert make_pipeline(tmp_path, trace_file=str(trace_path)).run() == 0
+    
+    with open(trace_path, encoding='utf-8') as f:
+        events = json.load(f)['traceEvents']
+    spans = {(event['cat'], event['name']) for event in events if event['ph'] == 'X'}
+    assert {('etl', 'map'), ('db', 'insert'), ('stage', 'vacuum'), ('stage', 'compress')} <= spans
+    assert ('sql', 'enrich bvl_lookup_kultur') in spans
+    inserts = [event['args'] for event in events if event.get('cat') == 'db']
+    assert sum(args['rows'] for args in inserts if args['endpoint'] == 'mittel') == 25
@@ -0,0 +1,45 @@
+"""
+Unit tests for the stage profiler.
+"""
+
+import pytest
+from scripts.helpers.profiler import StageProfiler
+
+
+def test_stage_records_duration_and_details():
+    """Test a stage records its details, rows per second and memory."""
+    profiler = StageProfiler()
+    
+    with profiler.stage('static_load', source='csv') as stage:
+        stage['rows'] = 100
+        
+    record = profiler.stages[0]
+    assert record['stage'] == 'static_load'
+    assert record['status'] == 'success'
+    assert record['source'] == 'csv'
+    assert record['rows'] == 100
+    assert record['duration_seconds'] >= 0
+    assert 'rows_per_second' in record
+    assert 'peak_rss_mb' in record
+
+
+def test_stage_marks_errors():
+    """Test a stage left by an exception is recorded with status error."""
+    profiler = StageProfiler()
+    
+    with pytest.raises(RuntimeError):
+        with profiler.stage('enrich'):
+            raise RuntimeError('failed')
+            
+    assert profiler.stages[0]['status'] == 'error'
+
+
+def test_summary_orders_by_duration():
+    """Test the summary lists the slowest stages first."""
+    profiler = StageProfiler()
+    profiler.add('vacuum', 0.5)
+    profiler.add('fetch', 2.0, rows=1000)
+    profiler.add('hash', 0.1)
+    
+    assert [record['stage'] for record in profiler.summary(limit=2)] == ['fetch', 'vacuum']
+    assert profiler.stages[1]['rows_per_second'] == 500
@@ -0,0 +1,79 @@
+"""
+Unit tests for the staged ETL runner.
+"""
+
+import threading
+import time
+from scripts.helpers.stages import StagedRunner
+
+
+def make_fetch(pages_per_key, produced=None, fail=()):
+    """Create a fetch callable yielding numbered pages of two rows."""
+    def fetch(key):
+        for page in range(pages_per_key):
+            if key in fail and page == 1:
+                raise RuntimeError(f"page {page} of {key} failed")
+            if produced is not None:
+                produced.append(key)
+            yield [(key, page, 0), (key, page, 1)]
+            
+    return fetch
+
+
+def map_page(key, page):
+    """Map rows to strings."""
+    return [f"{key}:{page_num}:{row}" for _, page_num, row in page]
+
+
+def test_runner_delivers_pages_in_key_order():
+    """Test every key's mapped pages reach the writer in order."""
+    runner = StagedRunner(['a', 'b', 'c'], make_fetch(3), map_page, workers=3, queue_size=2)
+    
+    written = {key: [row for page in pages for row in page] for key, pages in runner}
+    
+    assert list(written) == ['a', 'b', 'c']
+    assert written['b'] == ['b:0:0', 'b:0:1', 'b:1:0', 'b:1:1', 'b:2:0', 'b:2:1']
+    stats = runner.stats()
+    assert stats['fetch']['pages'] == stats['map']['pages'] == stats['write']['pages'] == 9
+    assert stats['write']['rows'] == 18
+
+
+def test_runner_applies_back_pressure():
+    """Test a stalled writer stops the fetcher after a few buffered pages."""
+    produced = []
+    runner = StagedRunner(['a'], make_fetch(50, produced), map_page, queue_size=1)
+    
+    for _, pages in runner:
+        next(pages)
+        time.sleep(0.3)
+        # One page in each queue, one held by the mapper and one by the fetcher
+        assert len(produced) <= 5
+        assert len(list(pages)) == 49
+        
+    assert len(produced) == 50
+
+
+def test_runner_raises_stage_errors_for_the_failed_key_only():
+    """Test a fetch error is raised from the key's page iterator."""
+    runner = StagedRunner(['a', 'b', 'c'], make_fetch(3, fail={'b'}), map_page, workers=2)
+    results = {}
+    
+    for key, pages in runner:
+        try:
+            results[key] = sum(len(page) for page in pages)
+        except RuntimeError as e:
+            results[key] = str(e)
+            
+    assert results == {'a': 6, 'b': 'page 1 of b failed', 'c': 6}
+
+
+def test_runner_stops_producers_when_writer_stops():
+    """Test leaving the loop early cancels blocked fetchers."""
+    runner = StagedRunner(['a', 'b'], make_fetch(1000), map_page, workers=2, queue_size=1)
+    
+    for _, pages in runner:
+        next(pages)
+        break
+        
+    time.sleep(0.3)
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith(('bvl-fetch', 'bvl-map'))]
@@ -0,0 +1,65 @@
+"""
+Unit tests for timeline tracing.
+"""
+
+import json
+import threading
+import pytest
+from scripts.helpers.tracing import Tracer
+
+
+def test_span_records_complete_event_per_thread():
+    """Test spans become X events with arguments on their thread's track."""
+    tracer = Tracer()
+    
+    with tracer.span('map', 'etl', endpoint='mittel') as span:
+        span['rows'] = 10
+        
+    worker = threading.Thread(target=lambda: tracer.add('GET mittel', 'http', 0.0, 0.5), name='bvl-fetch_0')
+    worker.start()
+    worker.join()
+    
+    names = {event['tid']: event['args']['name'] for event in tracer.events if event['ph'] == 'M'}
+    spans = [event for event in tracer.events if event['ph'] == 'X']
+    assert spans[0]['args'] == {'endpoint': 'mittel', 'rows': 10}
+    assert spans[0]['dur'] >= 0
+    assert names[spans[1]['tid']] == 'bvl-fetch_0'
+    assert spans[0]['tid'] != spans[1]['tid']
+    assert spans[1]['dur'] == 500000.0
+
+
+def test_span_records_errors():
+    """Test a span left by an exception carries the error."""
+    tracer = Tracer()
+    
+    with pytest.raises(RuntimeError):
+        with tracer.span('insert', 'db'):
+            raise RuntimeError('disk full')
+            
+    assert tracer.events[-1]['args'] == {'error': 'disk full'}
+
+
+def test_disabled_tracer_records_nothing():
+    """Test a disabled tracer keeps no events."""
+    tracer = Tracer(enabled=False)
+    
+    with tracer.span('map', 'etl') as span:
+        span['rows'] = 1
+    tracer.add('vacuum', 'stage', 0.0, 1.0, track='compress brotli')
+    
+    assert tracer.events == []
+
+
+def test_write_chrome_trace(tmp_path):
+    """Test the trace file is Chrome trace JSON with named tracks."""
+    tracer = Tracer()
+    tracer.add('compress:brotli', 'stage', 0.0, 1.0, track='compress brotli')
+    tracer.add('compress:zip', 'stage', 0.0, 0.5, track='compress zip')
+    
+    assert tracer.write(str(tmp_path / 'trace.json')) == 2
+    
+    with open(tmp_path / 'trace.json', encoding='utf-8') as f:
+        trace = json.load(f)
+    tracks = [event['args']['name'] for event in trace['traceEvents'] if event['ph'] == 'M']
+    assert tracks == ['bvl-sync', 'compress brotli', 'compress zip']
+    assert not (tmp_path / 'trace.json.tmp').exists()
@@ -31,7 +31,11 @@ from scripts.helpers.transformers import (
     map_kultur_gruppe_record,
     map_schadorg_gruppe_record,
     get_mapper,
+    get_row_mapper,
+    RowMapper,
+    ROW_MAPPERS,
     get_all_endpoints,
+    slim_payload,
     RECORD_MAPPERS
 )
 
@@ -488,3 +492,71 @@ def test_missing_fields_handled_gracefully():
     
     result = map_awg_wartezeit_record(raw)
     assert result["gesetzt_wartezeit"] is None
+
+
+def test_slim_payload_keeps_only_unpromoted_fields():
+    """Test fields stored unchanged in a column are left out of payload_json."""
+    raw = {
+        "datum": "2024-01-15",
+        "hinweis": "Test",
+        "extra": [1, 2]
+    }
+    mapped = map_stand_record(raw)
+    
+    promoted = slim_payload(mapped, raw, {"id": "INTEGER", "stand": "TEXT", "hinweis": "TEXT"})
+    
+    # datum is renamed to stand, so it stays in the payload
+    assert promoted == ["hinweis"]
+    assert mapped["payload_json"] == '{"datum": "2024-01-15", "extra": [1, 2]}'
+
+
+def test_slim_payload_respects_column_affinity():
+    """Test values a column would convert, and nulls, stay in payload_json."""
+    raw = {"kennr": "024100-00", "mittelname": 42, "zul_ende": None}
+    mapped = map_mittel_record(raw)
+    
+    promoted = slim_payload(mapped, raw, {"kennr": "TEXT", "mittelname": "TEXT", "zul_ende": "TEXT"})
+    
+    assert promoted == ["kennr"]
+    assert json.loads(mapped["payload_json"]) == {"mittelname": 42, "zul_ende": None}
+
+
+def test_row_mappers_match_record_mappers():
+    """Test row mappers return the values of the dict mappers in column order."""
+    raw = {"datum": "2024-01-15", "kennr": "024123-00", "awg_id": 12345, "extra": "ü"}
+    
+    for endpoint_name, mapper in ROW_MAPPERS.items():
+        row = mapper(raw)
+        assert isinstance(row, tuple)
+        assert dict(zip(mapper.columns, row)) == RECORD_MAPPERS[endpoint_name](raw)
+
+
+def test_row_mapper_columns_and_constants():
+    """Test constants come first, renamed fields are read and the payload is last."""
+    mapper = get_row_mapper("stand")
+    raw = {"datum": "2024-01-15", "hinweis": "Test"}
+    
+    assert mapper.columns == ("id", "stand", "hinweis", "payload_json")
+    assert mapper(raw) == (1, "2024-01-15", "Test", '{"datum": "2024-01-15", "hinweis": "Test"}')
+    assert get_row_mapper("unknown") is None
+
+
+def test_row_mapper_missing_and_single_fields():
+    """Test missing fields map to None, also for a single-field spec."""
+    mapper = RowMapper(("kennr", "mittelname"))
+    assert mapper({"kennr": "024123-00"}) == ("024123-00", None)
+    
+    single = RowMapper(("kennr", "payload_json"))
+    assert single({}) == (None, "{}")
+    
+    with pytest.raises(ValueError):
+        RowMapper(("payload_json", "kennr"))
+
+
+def test_payload_key_order_sorted_only_on_request():
+    """Test payloads keep the API key order unless sorted keys are asked for."""
+    raw = {"mittelname": "Produkt", "kennr": "024123-00"}
+    
+    assert get_row_mapper("mittel")(raw)[-1] == '{"mittelname": "Produkt", "kennr": "024123-00"}'
+    assert get_row_mapper("mittel", sort_keys=True)(raw)[-1] == '{"kennr": "024123-00", "mittelname": "Produkt"}'
+    assert get_mapper("mittel", sort_keys=True)(raw)["payload_json"] == '{"kennr": "024123-00", "mittelname": "Produkt"}'
@@ -578,6 +578,24 @@ CREATE TABLE IF NOT EXISTS bvl_sync_log (
     records_processed INTEGER DEFAULT 0
 );
 
+-- Stage timings of a sync (one row per stage of ETLPipeline.run)
+CREATE TABLE IF NOT EXISTS bvl_sync_stage (
+    sync_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    start_seconds REAL,
+    duration_seconds REAL,
+    status TEXT,
+    rows INTEGER,
+    rows_per_second REAL,
+    requests INTEGER,
+    retries INTEGER,
+    bytes INTEGER,
+    peak_rss_mb REAL,
+    details_json TEXT,
+    PRIMARY KEY (sync_id, seq)
+);
+
 -- ==============================================================================
 -- PSM APP COMPATIBILITY VIEWS
 -- Maps pflanzenschutz-db column names to PSM App expected names